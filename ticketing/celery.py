@@ -12,3 +12,6 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Automatically discover tasks from all Django apps
 app.autodiscover_tasks()
+
+# Task telemetry (queue wait, runtime, failures) via Celery signals
+from . import telemetry  # noqa: E402,F401
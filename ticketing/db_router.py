@@ -0,0 +1,182 @@
+# ---------------------------------------------------------
+# PRIMARY / REPLICA DATABASE ROUTING
+# ---------------------------------------------------------
+# Writes always go to 'default' (the primary). Reads go to a
+# replica only inside an explicit replica scope: read-only API
+# views (ReplicaReadMixin) and reporting tasks (read_from_replica).
+# After a user writes, their reads stick to the primary for
+# DATABASE_REPLICA_PIN_SECONDS so they always see their own changes.
+# The pin lives in the cache, so replicas are only used when that
+# cache is shared by all processes (not LocMem/Dummy): otherwise a
+# write handled by one worker would not pin reads served by another.
+import contextvars
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY = 'default'
+
+# 'replica' while inside a replica scope, else None (primary)
+_read_target = contextvars.ContextVar('db_read_target', default=None)
+
+logger = logging.getLogger(__name__)
+
+# alias -> monotonic time until which the replica is considered down
+_unhealthy_until = {}
+
+# alias -> monotonic time until which the last successful check holds
+_healthy_until = {}
+
+_warned_local_cache = False
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Routes reads inside the block to a replica (if configured and healthy).
+    """
+    token = _read_target.set('replica')
+    try:
+        yield
+    finally:
+        _read_target.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Forces reads inside the block to the primary.
+    """
+    token = _read_target.set(None)
+    try:
+        yield
+    finally:
+        _read_target.reset(token)
+
+
+def _replica_is_healthy(alias):
+    """
+    Cheap health check: a failed connection marks the replica down
+    for DATABASE_REPLICA_RETRY_SECONDS, during which reads fall back
+    to the primary. A successful one is trusted for
+    DATABASE_REPLICA_HEALTH_CHECK_SECONDS.
+    """
+    now = time.monotonic()
+    if _unhealthy_until.get(alias, 0) > now:
+        return False
+    if _healthy_until.get(alias, 0) > now:
+        return True
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        _healthy_until.pop(alias, None)
+        _unhealthy_until[alias] = now + getattr(settings, 'DATABASE_REPLICA_RETRY_SECONDS', 30)
+        return False
+    _healthy_until[alias] = now + getattr(settings, 'DATABASE_REPLICA_HEALTH_CHECK_SECONDS', 5)
+    return True
+
+
+def active_replicas():
+    """
+    Configured replica aliases, or none while the cache holding the
+    read-your-writes pins is local to this process.
+    """
+    global _warned_local_cache
+
+    replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+    if replicas and isinstance(caches['default'], (LocMemCache, DummyCache)):
+        if not _warned_local_cache:
+            logger.warning('database replicas disabled: CACHES["default"] is not shared '
+                           'between processes (set CACHE_URL)')
+            _warned_local_cache = True
+        return []
+    return replicas
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router used via settings.DATABASE_ROUTERS.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_target.get() != 'replica':
+            return PRIMARY
+        replicas = active_replicas()
+        if not replicas:
+            return PRIMARY
+
+        # Inside a write transaction reads must see uncommitted rows
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+
+        healthy = [alias for alias in replicas if _replica_is_healthy(alias)]
+        return random.choice(healthy) if healthy else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Real replicas get schema through replication; local SQLite
+        # stand-ins are migrated with `migrate --database=replica`
+        return True
+
+
+# ---------------------------------------------------------
+# READ-YOUR-WRITES STICKINESS
+# ---------------------------------------------------------
+def _pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """
+    Sends this user's reads to the primary for a while after a write.
+    Stored in the shared cache so all web workers see it.
+    """
+    if user is not None and user.is_authenticated:
+        cache.set(_pin_key(user.pk), 1, getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 10))
+
+
+def is_pinned(user):
+    return bool(
+        user is not None
+        and user.is_authenticated
+        and cache.get(_pin_key(user.pk))
+    )
+
+
+class ReplicaReadMixin:
+    """
+    DRF view mixin: safe (GET/HEAD/OPTIONS) requests read from a
+    replica unless the user wrote recently; successful writes pin
+    the user to the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication happens here, so the user is known afterwards
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned(request.user):
+            self._replica_token = _read_target.set('replica')
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _read_target.reset(token)
+            self._replica_token = None
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(getattr(request, 'user', None))
+
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,479 @@
+# ---------------------------------------------------------
+# IN-PROCESS METRICS REGISTRY (PROMETHEUS TEXT FORMAT)
+# ---------------------------------------------------------
+# A deliberately small replacement for prometheus_client:
+# counters and fixed-bucket histograms keyed by label tuples,
+# rendered in the Prometheus text exposition format.
+# Recording is a dict lookup + bisect under a lock, so it is
+# cheap enough to leave on for every request in production.
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Buckets for payload sizes in bytes
+SIZE_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304
+)
+
+# Buckets for per-request SQL query counts
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def _escape(value):
+    """
+    Escapes a label value as required by the exposition format.
+    """
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\n', '\\n')
+        .replace('"', '\\"')
+    )
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """
+    Monotonically increasing counter with optional labels.
+    """
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dump(self):
+        with self._lock:
+            values = [[list(k), v] for k, v in self._values.items()]
+        return {
+            'kind': self.kind,
+            'documentation': self.documentation,
+            'labelnames': list(self.labelnames),
+            'values': values,
+        }
+
+
+class Gauge(Counter):
+    """
+    Point-in-time value, usually refreshed by a collector at scrape
+    time. Gauges are process-local and never merged across processes.
+    """
+    kind = 'gauge'
+
+    def set(self, value, labels=()):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with optional labels.
+    Each label set keeps per-bucket counts plus sum and count.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        # Index of the first bucket whose upper bound is >= value
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [
+                    [0] * (len(self.buckets) + 1), 0.0, 0
+                ]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def dump(self):
+        with self._lock:
+            values = [
+                [list(k), [list(state[0]), state[1], state[2]]]
+                for k, state in self._values.items()
+            ]
+        return {
+            'kind': self.kind,
+            'documentation': self.documentation,
+            'labelnames': list(self.labelnames),
+            'buckets': list(self.buckets),
+            'values': values,
+        }
+
+
+def _merge_dumps(dumps):
+    """
+    Merges metric dumps from several processes.
+    Counters and histograms are summed per label set.
+    """
+    merged = {}
+    for dump in dumps:
+        for name, metric in dump.items():
+            target = merged.setdefault(name, {**metric, 'values': {}})
+            for labels, value in metric['values']:
+                key = tuple(labels)
+                current = target['values'].get(key)
+                if current is None:
+                    target['values'][key] = value
+                elif metric['kind'] == 'histogram':
+                    if len(current[0]) != len(value[0]):
+                        # Bucket layout changed between deploys; keep newest
+                        continue
+                    target['values'][key] = [
+                        [a + b for a, b in zip(current[0], value[0])],
+                        current[1] + value[1],
+                        current[2] + value[2],
+                    ]
+                else:
+                    target['values'][key] = current + value
+    return merged
+
+
+def _as_dump(merged):
+    """
+    Turns _merge_dumps() output back into the per-process dump format.
+    """
+    return {
+        name: {**metric, 'values': [[list(k), v] for k, v in metric['values'].items()]}
+        for name, metric in merged.items()
+    }
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, owned by another user
+        return True
+    return True
+
+
+def _render_metric(name, metric):
+    lines = [
+        f'# HELP {name} {metric["documentation"]}',
+        f'# TYPE {name} {metric["kind"]}',
+    ]
+    labelnames = metric['labelnames']
+
+    for labels, value in metric['values'].items():
+        if metric['kind'] != 'histogram':
+            lines.append(
+                f'{name}{_format_labels(labelnames, labels)} {_format_number(value)}'
+            )
+            continue
+
+        counts, total, count = value
+        bounds = list(metric['buckets']) + [float('inf')]
+        cumulative = 0
+        for bound, bucket_count in zip(bounds, counts):
+            cumulative += bucket_count
+            le = f'le="{_format_number(bound)}"'
+            lines.append(
+                f'{name}_bucket{_format_labels(labelnames, labels, le)} {cumulative}'
+            )
+        lines.append(f'{name}_sum{_format_labels(labelnames, labels)} {_format_number(total)}')
+        lines.append(f'{name}_count{_format_labels(labelnames, labels)} {count}')
+    return lines
+
+
+class Registry:
+    """
+    Holds every metric of the process and renders them.
+
+    With a multiprocess directory configured (gunicorn workers,
+    Celery prefork children) each process periodically writes its
+    counters/histograms to <dir>/<pid>.json and the scrape endpoint
+    merges all of them, so any process can serve the full picture.
+    Files of exited processes are folded into <dir>/aggregate.json
+    (by retire() on clean shutdown, by the scrape otherwise), so
+    totals survive restarts without one file per pid ever started.
+    The directory must be shared by processes on one host only: a
+    pid that is not running here is taken to have exited.
+    """
+
+    AGGREGATE = 'aggregate.json'
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def register(self, metric):
+        with self._lock:
+            # Re-registering (e.g. on module reload) returns the original
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """
+        Registers a callable run before each render (e.g. to refresh gauges).
+        """
+        self._collectors.append(collector)
+
+    def dump(self, include_gauges=True):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            m.name: m.dump()
+            for m in metrics
+            if include_gauges or m.kind != 'gauge'
+        }
+
+    def flush(self, directory, force=False, interval=5.0):
+        """
+        Writes this process's counters/histograms to the shared
+        directory, at most once per `interval` seconds.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_flush < interval:
+            return
+        self._last_flush = now
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump(self.dump(include_gauges=False), fh)
+        os.replace(tmp_path, path)
+
+    def _fold(self, directory, pids, own_dump=None):
+        """
+        Merges the dumps of `pids` (and `own_dump`) into the aggregate
+        file and removes their per-pid files, under an exclusive lock
+        so concurrent scrapes or shutdowns never count a file twice.
+        """
+        os.makedirs(directory, exist_ok=True)
+        aggregate = os.path.join(directory, self.AGGREGATE)
+        with open(os.path.join(directory, 'aggregate.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dumps, folded = [], []
+            try:
+                with open(aggregate) as fh:
+                    dumps.append(json.load(fh))
+            except FileNotFoundError:
+                pass
+            if own_dump is not None:
+                dumps.append(own_dump)
+                own_path = os.path.join(directory, f'{os.getpid()}.json')
+                if os.path.exists(own_path):
+                    folded.append(own_path)
+            for pid in pids:
+                path = os.path.join(directory, f'{pid}.json')
+                try:
+                    with open(path) as fh:
+                        dumps.append(json.load(fh))
+                except FileNotFoundError:
+                    # Folded by someone else meanwhile
+                    continue
+                except ValueError:
+                    # Died mid-write of its first dump: nothing to keep
+                    pass
+                folded.append(path)
+            if not folded and own_dump is None:
+                return
+
+            tmp_path = aggregate + '.tmp'
+            with open(tmp_path, 'w') as fh:
+                json.dump(_as_dump(_merge_dumps(dumps)), fh)
+            os.replace(tmp_path, aggregate)
+            for path in folded:
+                os.remove(path)
+
+    def retire(self, directory):
+        """
+        Called when the process exits: moves its totals into the
+        aggregate file and removes its own dump.
+        """
+        self._fold(directory, [], own_dump=self.dump(include_gauges=False))
+
+    def sweep(self, directory):
+        """
+        Folds the dumps of processes that exited without retire()
+        (killed, crashed) into the aggregate file.
+        """
+        dead = []
+        for entry in os.scandir(directory):
+            stem = entry.name[:-len('.json')]
+            if entry.name.endswith('.json') and stem.isdigit() and not _pid_alive(int(stem)):
+                dead.append(int(stem))
+        if dead:
+            self._fold(directory, dead)
+
+    def _read_peer_dumps(self, directory):
+        own = f'{os.getpid()}.json'
+        dumps = []
+        for entry in os.scandir(directory):
+            if not entry.name.endswith('.json') or entry.name == own:
+                continue
+            try:
+                with open(entry.path) as fh:
+                    dumps.append(json.load(fh))
+            except (OSError, ValueError):
+                # File being replaced or truncated; skip this scrape
+                continue
+        return dumps
+
+    def render(self, directory=None):
+        """
+        Returns all metrics in Prometheus text format.
+        """
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception:
+                logger.exception('metrics collector failed')
+
+        dumps = [self.dump()]
+        if directory and os.path.isdir(directory):
+            try:
+                self.sweep(directory)
+            except OSError:
+                logger.warning('could not fold exited processes into %s', directory, exc_info=True)
+            dumps.extend(self._read_peer_dumps(directory))
+
+        lines = []
+        for name, metric in _merge_dumps(dumps).items():
+            lines.extend(_render_metric(name, metric))
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide default registry
+REGISTRY = Registry()
+
+
+# ---------------------------------------------------------
+# HTTP REQUEST METRICS
+# ---------------------------------------------------------
+REQUEST_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds',
+    'Time spent handling a request, per route and method.',
+    ('route', 'method', 'status'),
+)
+REQUEST_SQL_QUERIES = REGISTRY.histogram(
+    'http_request_sql_queries',
+    'Number of SQL queries executed per request.',
+    ('route', 'method'),
+    buckets=COUNT_BUCKETS,
+)
+REQUEST_SQL_SECONDS = REGISTRY.histogram(
+    'http_request_sql_duration_seconds',
+    'Time spent in SQL per request.',
+    ('route', 'method'),
+)
+REQUEST_SERIALIZER_SECONDS = REGISTRY.histogram(
+    'http_request_serializer_duration_seconds',
+    'Time spent in serializer to_representation() per request.',
+    ('route', 'method'),
+)
+RESPONSE_SIZE = REGISTRY.histogram(
+    'http_response_size_bytes',
+    'Size of the response body in bytes.',
+    ('route', 'method'),
+    buckets=SIZE_BUCKETS,
+)
+SLOW_REQUESTS = REGISTRY.counter(
+    'http_slow_requests_total',
+    'Requests slower than REQUEST_METRICS_SLOW_MS.',
+    ('route', 'method'),
+)
+THROTTLED_REQUESTS = REGISTRY.counter(
+    'http_requests_throttled_total',
+    'Requests rejected by the rate limiter.',
+    ('route', 'role'),
+)
+
+
+# ---------------------------------------------------------
+# SERIALIZER TIMING
+# ---------------------------------------------------------
+class SerializerTimer:
+    """
+    Serializer time of one request; the middleware installs one in
+    SERIALIZER_TIMER for the duration of the request.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.depth = 0
+
+
+SERIALIZER_TIMER = ContextVar('serializer_timer', default=None)
+
+
+class TimedSerializerMixin:
+    """
+    Adds the time spent in to_representation() to the current
+    request's SerializerTimer. Only the outermost call is timed, so
+    nested serializers are not counted twice; outside a request
+    (Celery tasks, commands) it does nothing.
+    """
+
+    def to_representation(self, instance):
+        timer = SERIALIZER_TIMER.get()
+        if timer is None or timer.depth:
+            return super().to_representation(instance)
+
+        timer.depth += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timer.seconds += time.perf_counter() - start
+            timer.calls += 1
+            timer.depth -= 1
@@ -0,0 +1,265 @@
+# ---------------------------------------------------------
+# REQUEST INSTRUMENTATION MIDDLEWARE
+# ---------------------------------------------------------
+import logging
+import math
+import re
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .metrics import (
+    REGISTRY,
+    REQUEST_LATENCY,
+    REQUEST_SERIALIZER_SECONDS,
+    REQUEST_SQL_QUERIES,
+    REQUEST_SQL_SECONDS,
+    RESPONSE_SIZE,
+    SERIALIZER_TIMER,
+    SLOW_REQUESTS,
+    THROTTLED_REQUESTS,
+    SerializerTimer,
+)
+from .ratelimit import take
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger('ticketing.slow_requests')
+
+
+class _QueryRecorder:
+    """
+    Execute wrapper that counts SQL queries and their total time.
+    Statements are only kept when slow-request logging is enabled.
+    """
+
+    def __init__(self, capture):
+        self.count = 0
+        self.seconds = 0.0
+        self.capture = capture
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            self.count += 1
+            self.seconds += duration
+            if self.capture:
+                self.statements.append((duration, sql))
+
+
+def _route_label(request):
+    """
+    Uses the matched URL pattern (not the raw path) so that
+    ticket IDs do not explode label cardinality.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return '/' + (match.route or match.view_name or '')
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, SQL count/time, serializer time and response
+    size for every request, labelled by route and method. Serializer
+    time comes from serializers using TimedSerializerMixin.
+
+    Requests slower than REQUEST_METRICS_SLOW_MS are written to the
+    'ticketing.slow_requests' logger together with their slowest SQL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'REQUEST_METRICS_SLOW_MS', None)
+        self.sql_log_limit = getattr(settings, 'REQUEST_METRICS_SQL_LOG_LIMIT', 20)
+        self.multiproc_dir = getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+        self.skip_paths = {'/' + getattr(settings, 'METRICS_PATH', 'metrics').strip('/')}
+
+    def __call__(self, request):
+        # Never instrument the scrape endpoint itself
+        if request.path.rstrip('/') in self.skip_paths:
+            return self.get_response(request)
+
+        recorder = _QueryRecorder(capture=bool(self.slow_ms))
+        serializer_timer = SerializerTimer()
+        start = perf_counter()
+        with ExitStack() as stack:
+            # Primary and replicas alike
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            stack.callback(SERIALIZER_TIMER.reset, SERIALIZER_TIMER.set(serializer_timer))
+            response = self.get_response(request)
+        elapsed = perf_counter() - start
+
+        route = _route_label(request)
+        method = request.method
+
+        REQUEST_LATENCY.observe(elapsed, (route, method, str(response.status_code)))
+        REQUEST_SQL_QUERIES.observe(recorder.count, (route, method))
+        REQUEST_SQL_SECONDS.observe(recorder.seconds, (route, method))
+
+        if serializer_timer.calls:
+            REQUEST_SERIALIZER_SECONDS.observe(serializer_timer.seconds, (route, method))
+
+        if not response.streaming:
+            RESPONSE_SIZE.observe(len(response.content), (route, method))
+
+        if self.slow_ms and elapsed * 1000 >= self.slow_ms:
+            SLOW_REQUESTS.inc((route, method))
+            self._log_slow_request(request, route, elapsed, recorder)
+
+        # Share this worker's numbers with the other processes (throttled)
+        if self.multiproc_dir:
+            REGISTRY.flush(self.multiproc_dir)
+
+        return response
+
+    def _log_slow_request(self, request, route, elapsed, recorder):
+        slowest = sorted(recorder.statements, reverse=True)[:self.sql_log_limit]
+        slow_logger.warning(
+            'Slow request %s %s (%s) took %.1fms with %d queries (%.1fms SQL)\n%s',
+            request.method,
+            request.get_full_path(),
+            route,
+            elapsed * 1000,
+            recorder.count,
+            recorder.seconds * 1000,
+            '\n'.join(f'  [{d * 1000:.1f}ms] {sql}' for d, sql in slowest),
+        )
+
+
+# ---------------------------------------------------------
+# RATE LIMITING MIDDLEWARE
+# ---------------------------------------------------------
+def _identify(request):
+    """
+    Returns (bucket identity, role) without touching the database:
+    the JWT is verified and decoded locally; requests without a
+    valid token are limited per client address.
+    """
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if header.startswith('Bearer '):
+        try:
+            token = AccessToken(header[len('Bearer '):])
+            return f"user:{token[jwt_settings.USER_ID_CLAIM]}", token.get('role', 'user')
+        except (TokenError, KeyError):
+            pass
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}", 'anon'
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket admission control per endpoint and user.
+
+    Endpoints listed in RATE_LIMITS (by URL name) get their own
+    per-role rates; other writes share RATE_LIMIT_DEFAULT. Rejected
+    requests get 429 with Retry-After before any view, serializer or
+    query runs. If the bucket store fails, requests are let through.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'RATE_LIMIT_ENABLED', True)
+        self.rules = getattr(settings, 'RATE_LIMITS', {})
+        self.default = getattr(settings, 'RATE_LIMIT_DEFAULT', None)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.enabled:
+            return None
+
+        url_name = request.resolver_match.url_name
+        rule = self.rules.get(url_name)
+        if rule is not None and request.method in rule['methods']:
+            scope, rates = url_name, rule['rates']
+        elif request.method not in SAFE_METHODS and self.default:
+            scope, rates = 'writes', self.default
+        else:
+            return None
+
+        identity, role = _identify(request)
+        limit = rates.get(role, rates.get('*'))
+        if limit is None:
+            return None
+
+        try:
+            allowed, wait = take(f'{scope}:{identity}', *limit)
+        except Exception:
+            logger.warning('rate limiter unavailable, admitting request', exc_info=True)
+            return None
+        if allowed:
+            return None
+
+        THROTTLED_REQUESTS.inc((_route_label(request), role))
+        retry_after = max(1, math.ceil(wait))
+        response = JsonResponse(
+            {'detail': f'Request was throttled. Expected available in {retry_after} seconds.'},
+            status=429
+        )
+        response['Retry-After'] = str(retry_after)
+        return response
+
+
+# ---------------------------------------------------------
+# RESPONSE COMPRESSION MIDDLEWARE
+# ---------------------------------------------------------
+_accepts_brotli = re.compile(r'\bbr\b')
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses JSON responses of at least COMPRESSION_MIN_BYTES:
+    brotli when the client accepts it and the brotli package is
+    installed, gzip otherwise. Files and other streamed responses
+    are left alone so Range requests and sendfile keep working.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_bytes = getattr(settings, 'COMPRESSION_MIN_BYTES', 1024)
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or not response.get('Content-Type', '').startswith('application/json')
+            or len(response.content) < self.min_bytes
+            or response.has_header('Content-Encoding')
+        ):
+            return response
+
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is None or not _accepts_brotli.search(accept):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=5)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        # Body differs byte-wise, so the ETag becomes weak (as gzip does)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
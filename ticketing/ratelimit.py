@@ -0,0 +1,69 @@
+# ---------------------------------------------------------
+# TOKEN BUCKET RATE LIMITING
+# ---------------------------------------------------------
+# Each bucket holds up to `burst` tokens and refills at `per_minute`
+# tokens per minute; a request spends one token. Buckets live in the
+# shared cache: an atomic Lua script on Redis, or a lock-protected
+# read-modify-write on the per-process locmem cache.
+import threading
+import time
+
+from django.core.cache import cache
+
+from .shared_cache import redis_client
+
+_TOKEN_BUCKET_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+_local_lock = threading.Lock()
+
+
+def _take_local(key, rate, burst, now):
+    with _local_lock:
+        tokens, ts = cache.get(key) or (burst, now)
+        tokens = min(burst, tokens + max(0.0, now - ts) * rate)
+        if tokens >= 1:
+            allowed, wait, tokens = True, 0.0, tokens - 1
+        else:
+            allowed, wait = False, (1 - tokens) / rate
+        cache.set(key, (tokens, now), int(burst / rate) + 1)
+    return allowed, wait
+
+
+def take(key, per_minute, burst):
+    """
+    Spends one token from bucket `key`.
+    Returns (allowed, seconds until a token is available).
+    """
+    if per_minute <= 0:
+        return False, 60.0
+
+    rate = per_minute / 60.0
+    now = time.time()
+    name = cache.make_key(f'ratelimit:{key}')
+
+    client = redis_client()
+    if client is not None:
+        allowed, wait = client.eval(_TOKEN_BUCKET_SCRIPT, 1, name, rate, burst, now)
+        return bool(allowed), float(wait)
+    return _take_local(name, rate, burst, now)
@@ -35,7 +35,13 @@ INSTALLED_APPS = [
 
 # Middleware configuration
 MIDDLEWARE = [
+    # Request instrumentation (kept first so it measures the full stack)
+    'ticketing.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    # Sheds excess writes before views run (see RATE_LIMITS)
+    'ticketing.middleware.RateLimitMiddleware',
+    # brotli/gzip for large JSON responses
+    'ticketing.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,14 +54,79 @@ MIDDLEWARE = [
 # Root URL configuration
 ROOT_URLCONF = 'ticketing.urls'
 
-# Database configuration (SQLite for development)
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database configuration (SQLite for development, PostgreSQL via env)
+DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.sqlite3')
+
+
+def _database(name, host=None):
+    """
+    Builds one DATABASES entry. Connections are persistent for
+    DB_CONN_MAX_AGE seconds and health-checked before reuse; with
+    DB_POOL=True PostgreSQL uses Django's native pool (psycopg 3).
+    """
+    config = {
+        'ENGINE': DB_ENGINE,
+        'NAME': name,
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
     }
+    if DB_ENGINE != 'django.db.backends.sqlite3':
+        config.update({
+            'USER': os.getenv('DB_USER', ''),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': host or os.getenv('DB_HOST', ''),
+            'PORT': os.getenv('DB_PORT', ''),
+        })
+        if os.getenv('DB_POOL') == 'True':
+            # Pooled connections replace persistent ones
+            config['CONN_MAX_AGE'] = 0
+            config['OPTIONS'] = {'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            }}
+    return config
+
+
+DATABASES = {
+    'default': _database(os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3')),
 }
 
+# Optional read replica (PostgreSQL: DB_REPLICA_HOST; SQLite stand-in:
+# DB_REPLICA_NAME=replica.sqlite3 + `migrate --database=replica`)
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = _database(
+        os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        host=os.getenv('DB_REPLICA_HOST'),
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['ticketing.db_router.PrimaryReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Reads stick to the primary this long after a user's write (seconds)
+DATABASE_REPLICA_PIN_SECONDS = 10
+# A replica that fails to connect is skipped for this long (seconds)
+DATABASE_REPLICA_RETRY_SECONDS = 30
+# A replica that connected is not re-checked for this long (seconds)
+DATABASE_REPLICA_HEALTH_CHECK_SECONDS = 5
+
+# Shared cache (Redis when CACHE_URL is set; per-process otherwise).
+# Replicas stay unused without CACHE_URL: the read-your-writes pins
+# must be visible to every web worker.
+if os.getenv('CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Django Rest Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -69,14 +140,59 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Largest page (?limit=) the ticket list endpoints return
+TICKET_LIST_MAX_LIMIT = 500
+
 # JWT configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
 }
 
+# Rate limiting (token buckets in the shared cache)
+# URL name -> methods and (requests per minute, burst) per role;
+# '*' applies to any role, 'anon' to requests without a valid token
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True') == 'True'
+RATE_LIMITS = {
+    'tickets-list': {
+        'methods': ('POST',),
+        'rates': {'user': (30, 10), 'agent': (120, 30), 'admin': (300, 60)},
+    },
+    'run-tfidf': {
+        'methods': ('POST',),
+        'rates': {'user': (2, 1), 'agent': (6, 2), 'admin': (12, 3)},
+    },
+    'auth_register': {
+        'methods': ('POST',),
+        'rates': {'*': (5, 5)},
+    },
+    'token_obtain_pair': {
+        'methods': ('POST',),
+        'rates': {'*': (20, 10)},
+    },
+}
+# Any other write, per user
+RATE_LIMIT_DEFAULT = {'*': (300, 60)}
+
+# JSON responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = 1024
+
 # CORS configuration
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Request instrumentation
+# Path of the Prometheus scrape endpoint and the scraper's bearer token
+# (without one only admins, by JWT, can read it)
+METRICS_PATH = 'metrics'
+METRICS_AUTH_TOKEN = os.getenv('METRICS_AUTH_TOKEN')
+
+# Shared directory where every web/worker process writes its samples
+# so one scrape sees all of them (unset = process-local metrics only)
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR')
+
+# Requests slower than this (ms) are logged with their SQL (0 disables)
+REQUEST_METRICS_SLOW_MS = int(os.getenv('REQUEST_METRICS_SLOW_MS', '0')) or None
+REQUEST_METRICS_SQL_LOG_LIMIT = 20
+
 # Static files
 STATIC_URL = '/static/'
 
@@ -90,6 +206,57 @@ CELERY_RESULT_BACKEND = os.getenv(
     'redis://localhost:6379/0'
 )
 
+# Run tasks inline (no broker) - used for local debugging and tests
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER') == 'True'
+CELERY_TASK_EAGER_PROPAGATES = os.getenv('CELERY_TASK_EAGER_PROPAGATES') == 'True'
+
+# Queue depth probe: minimum seconds between broker round-trips
+CELERY_QUEUE_DEPTH_PROBE_INTERVAL = 15
+
+# Queues: assignment is latency-critical and gets its own workers so
+# bulk ML jobs or an email flood can never delay it (see Procfile)
+from kombu import Queue
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_QUEUES = (
+    Queue('default'),
+    Queue('assignment'),
+    Queue('ml'),
+    Queue('notifications'),
+)
+CELERY_TASK_ROUTES = {
+    'tickets.tasks.auto_assign_agent': {'queue': 'assignment'},
+    'tickets.tasks.enqueue_priority_prediction': {'queue': 'ml'},
+    'tickets.tasks.fire_escalations': {'queue': 'assignment'},
+    'tickets.tasks.schedule_escalation_rule': {'queue': 'assignment'},
+    'tickets.tasks.run_tfidf_ranking': {'queue': 'ml'},
+    'tickets.tasks.publish_tfidf_model': {'queue': 'ml'},
+    'tickets.tasks.cluster_incidents': {'queue': 'ml'},
+    'tickets.tasks.rebuild_duplicate_index': {'queue': 'ml'},
+    'tickets.tasks.send_ticket_created_email': {'queue': 'notifications'},
+    'tickets.tasks.send_bulk_update_notification': {'queue': 'notifications'},
+}
+
+# Message priorities within a queue. On Redis 0 is served first;
+# per-ticket tasks use tickets.tasks.TICKET_TASK_PRIORITY
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+    # Unacked (acks_late) messages are redelivered after this long
+    'visibility_timeout': 3600,
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5
+
+# Lifetime of a singleton task's lease (tickets.locks); a crashed
+# run's lease expires after this long
+TASK_LEASE_SECONDS = 900
+
+# Reserve one message at a time, so a long task never holds back
+# queued work. Messages are acked when a task starts; idempotent
+# tasks opt into acks_late (tickets.tasks.REDELIVER_ON_CRASH) so a
+# crashed worker's run is redelivered without re-sending emails
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
 # Celery periodic task schedule
 from celery.schedules import crontab
 CELERY_BEAT_SCHEDULE = {
@@ -98,8 +265,110 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': crontab(minute='*/10'),
         'args': (),
     },
+    'publish-tfidf-model-nightly': {
+        'task': 'tickets.tasks.publish_tfidf_model',
+        'schedule': crontab(hour=2, minute=0),
+        'args': (),
+    },
+    'cluster-incidents-every-15-min': {
+        'task': 'tickets.tasks.cluster_incidents',
+        'schedule': crontab(minute='*/15'),
+        'args': (),
+    },
+    'archive-closed-tickets-nightly': {
+        'task': 'tickets.tasks.archive_closed_tickets',
+        'schedule': crontab(hour=3, minute=0),
+        'args': (),
+    },
+    'export-warehouse-nightly': {
+        'task': 'tickets.tasks.export_warehouse',
+        'schedule': crontab(hour=4, minute=0),
+        'args': (),
+    },
+    'fire-escalations-every-minute': {
+        'task': 'tickets.tasks.fire_escalations',
+        'schedule': crontab(),
+        'args': (),
+    },
+    'rebuild-duplicate-index-hourly': {
+        'task': 'tickets.tasks.rebuild_duplicate_index',
+        'schedule': crontab(minute=5),
+        'args': (),
+    },
 }
 
+# Near-duplicate detection on ticket creation
+DEDUP_ENABLED = os.getenv('DEDUP_ENABLED', 'True') == 'True'
+DEDUP_WINDOW_HOURS = int(os.getenv('DEDUP_WINDOW_HOURS', 72))
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv('DEDUP_SIMILARITY_THRESHOLD', 0.6))
+DEDUP_INDEX_PATH = BASE_DIR / 'var' / 'dedup_index.pkl'
+
+# Agent work queue: SLA target per priority (hours since creation)
+# and how long a claim keeps a ticket away from other agents
+WORK_QUEUE_SLA_HOURS = {'high': 4, 'medium': 24, 'low': 72}
+WORK_QUEUE_CLAIM_SECONDS = 15 * 60
+
+# Largest number of tickets a single bulk update may change
+BULK_UPDATE_MAX_TICKETS = 5000
+
+# In-memory analytics snapshot (tickets.snapshot): seconds between
+# incremental refreshes and between full reloads
+TICKET_SNAPSHOT_REFRESH_SECONDS = 5
+TICKET_SNAPSHOT_RELOAD_SECONDS = 15 * 60
+# Refreshes re-read changes this far behind the last one seen
+TICKET_SNAPSHOT_OVERLAP_SECONDS = 60
+
+# Resolved/closed tickets older than this move to the archive
+TICKET_ARCHIVE_AFTER_DAYS = int(os.getenv('TICKET_ARCHIVE_AFTER_DAYS', 180))
+
+# Parquet analytics warehouse (tickets.warehouse), rebuilt nightly,
+# and the most rows one report may return
+WAREHOUSE_DIR = Path(os.getenv('WAREHOUSE_DIR', BASE_DIR / 'var' / 'warehouse'))
+WAREHOUSE_QUERY_MAX_ROWS = 10000
+
+# Webhook delivery (tickets.webhooks, run_webhook_worker): requests in
+# flight per worker process and per endpoint, deliveries claimed per
+# batch, and how long a claim lasts before another worker may retry
+WEBHOOK_CONCURRENCY = int(os.getenv('WEBHOOK_CONCURRENCY', 2000))
+WEBHOOK_PER_ENDPOINT_CONCURRENCY = 200
+WEBHOOK_BATCH_SIZE = 1000
+WEBHOOK_LEASE_SECONDS = 120
+WEBHOOK_TIMEOUT_SECONDS = 10
+# Retries: exponential backoff from WEBHOOK_BACKOFF_SECONDS, capped;
+# a delivery fails for good after WEBHOOK_MAX_ATTEMPTS
+WEBHOOK_MAX_ATTEMPTS = 10
+WEBHOOK_BACKOFF_SECONDS = 10
+WEBHOOK_BACKOFF_MAX_SECONDS = 6 * 60 * 60
+# Circuit breaker: consecutive failures that pause an endpoint, and
+# for how long before a probe request
+WEBHOOK_CIRCUIT_FAILURES = 5
+WEBHOOK_CIRCUIT_OPEN_SECONDS = 60
+
+# Escalation rules (tickets.escalation): how often each process checks
+# for rule edits made elsewhere before recompiling
+ESCALATION_RULES_REFRESH_SECONDS = 30
+
+# Incident clustering (ticket storms)
+INCIDENT_CLUSTER_WINDOW_HOURS = 6
+INCIDENT_CLUSTER_MIN_SIZE = 5
+INCIDENT_CLUSTER_KEEP_RUNS = 96
+
+# Web worker startup (manage.py profile_imports): import time of the
+# URL conf to report against, and packages only Celery workers may load.
+# The test suite asserts the URL conf adds at most
+# WEB_IMPORT_MAX_RATIO x the time of a bare django.setup() (a ratio,
+# so the check holds on slow and fast machines alike)
+WEB_IMPORT_BUDGET_MS = 600
+WEB_IMPORT_MAX_RATIO = 1.0
+WEB_FORBIDDEN_IMPORTS = ('sklearn', 'scipy', 'pandas')
+
+# Trained model artifacts (memory-mapped by workers)
+ML_MODEL_DIR = Path(os.getenv('ML_MODEL_DIR', BASE_DIR / 'var' / 'models'))
+# How often workers re-check which model version is active (seconds)
+ML_REGISTRY_REFRESH_SECONDS = 60
+# Entries in each worker's prediction LRU (content hash -> result)
+ML_PREDICTION_CACHE_SIZE = 10000
+
 # Template configuration
 TEMPLATES = [
     {
@@ -124,6 +393,15 @@ AUTH_USER_MODEL = "users.User"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Attachment downloads (tickets.downloads): lifetime of signed links,
+# and who streams the file: Django ('') or the front proxy after
+# Django authorizes ('x-accel-redirect' for nginx, 'x-sendfile' for
+# Apache/lighttpd). nginx needs an internal location for the prefix:
+#   location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+ATTACHMENT_URL_MAX_AGE = 3600
+ATTACHMENT_SENDFILE = os.getenv('ATTACHMENT_SENDFILE', '')
+ATTACHMENT_ACCEL_PREFIX = '/protected-media/'
+
 # Email configuration (SMTP or Console based on environment)
 EMAIL_BACKEND = (
     'django.core.mail.backends.smtp.EmailBackend'
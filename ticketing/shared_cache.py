@@ -0,0 +1,18 @@
+# ---------------------------------------------------------
+# SHARED CACHE ACCESS
+# ---------------------------------------------------------
+# Rate-limit buckets and task leases need atomic Redis commands
+# (Lua scripts, SET NX EX) that the Django cache API does not offer,
+# so they talk to the cache's own Redis connection when it has one.
+from django.core.cache import cache
+
+
+def redis_client():
+    """
+    Returns a redis-py client for the shared cache, or None when the
+    cache backend is not Redis (e.g. locmem in development).
+    """
+    client = getattr(cache, '_cache', None)
+    if client is None or not hasattr(client, 'get_client'):
+        return None
+    return client.get_client(write=True)
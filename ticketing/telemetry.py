@@ -0,0 +1,209 @@
+# ---------------------------------------------------------
+# CELERY TASK TELEMETRY
+# ---------------------------------------------------------
+# Hooks into Celery signals to record, per task:
+# - queue wait (publish -> start), using a header stamped at publish
+# - runtime and outcome (success / failure / retry)
+# and probes broker queue depth at scrape time. Everything goes
+# into the same registry that backs the /metrics endpoint.
+import logging
+import time
+from datetime import datetime
+
+from celery.signals import (
+    before_task_publish,
+    task_prerun,
+    task_postrun,
+    task_failure,
+    task_retry,
+    worker_process_shutdown,
+)
+from django.conf import settings
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Header carrying the publish timestamp (wall clock, seconds)
+PUBLISHED_AT_HEADER = 'published_at'
+
+# Buckets cover fast tasks up to long batch jobs (10 minutes)
+TASK_BUCKETS = (
+    0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0
+)
+
+TASKS_PUBLISHED = REGISTRY.counter(
+    'celery_tasks_published_total',
+    'Tasks sent to the broker.',
+    ('task',),
+)
+TASK_QUEUE_WAIT = REGISTRY.histogram(
+    'celery_task_queue_wait_seconds',
+    'Time between publishing a task and a worker starting it.',
+    ('task',),
+    buckets=TASK_BUCKETS,
+)
+TASK_RUNTIME = REGISTRY.histogram(
+    'celery_task_runtime_seconds',
+    'Task execution time, per final state.',
+    ('task', 'state'),
+    buckets=TASK_BUCKETS,
+)
+TASK_OUTCOMES = REGISTRY.counter(
+    'celery_task_outcomes_total',
+    'Finished tasks per outcome.',
+    ('task', 'outcome'),
+)
+TASK_FAILURES = REGISTRY.counter(
+    'celery_task_failures_total',
+    'Failed tasks per exception type.',
+    ('task', 'exception'),
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    'celery_queue_depth',
+    'Messages waiting in each broker queue.',
+    ('queue',),
+)
+
+# task_id -> perf_counter() at start (only tasks running in this process)
+_started = {}
+
+
+# ---------------------------------------------------------
+# PUBLISHER SIDE
+# ---------------------------------------------------------
+@before_task_publish.connect
+def _stamp_publish_time(sender=None, headers=None, **kwargs):
+    """
+    Stamps the publish time into the message headers so the worker
+    can compute how long the task waited in the queue.
+    """
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+    TASKS_PUBLISHED.inc((sender or 'unknown',))
+
+
+# ---------------------------------------------------------
+# WORKER SIDE
+# ---------------------------------------------------------
+@task_prerun.connect
+def _on_task_start(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+
+    published_at = getattr(task.request, PUBLISHED_AT_HEADER, None)
+    if published_at is None:
+        # apply() keeps custom headers nested instead of on the request
+        published_at = (task.request.headers or {}).get(PUBLISHED_AT_HEADER)
+    if published_at is None:
+        # Eager calls and messages from older publishers have no stamp
+        return
+
+    # For ETA/countdown tasks only the time after the ETA counts as waiting
+    ready_at = float(published_at)
+    eta = task.request.eta
+    if eta:
+        try:
+            ready_at = max(ready_at, datetime.fromisoformat(str(eta)).timestamp())
+        except ValueError:
+            pass
+
+    TASK_QUEUE_WAIT.observe(max(time.time() - ready_at, 0.0), (task.name,))
+
+
+@task_postrun.connect
+def _on_task_end(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is not None:
+        TASK_RUNTIME.observe(time.perf_counter() - started, (task.name, state or 'UNKNOWN'))
+
+    outcome = {
+        'SUCCESS': 'success',
+        'FAILURE': 'failure',
+        'RETRY': 'retry',
+    }.get(state, (state or 'unknown').lower())
+    TASK_OUTCOMES.inc((task.name, outcome))
+
+    _flush()
+
+
+@task_failure.connect
+def _on_task_failure(sender=None, exception=None, **kwargs):
+    TASK_FAILURES.inc((
+        getattr(sender, 'name', 'unknown'),
+        type(exception).__name__ if exception else 'unknown',
+    ))
+
+
+@task_retry.connect
+def _on_task_retry(sender=None, reason=None, **kwargs):
+    TASK_FAILURES.inc((
+        getattr(sender, 'name', 'unknown'),
+        type(reason).__name__ if isinstance(reason, BaseException) else 'Retry',
+    ))
+
+
+@worker_process_shutdown.connect
+def _on_worker_shutdown(**kwargs):
+    # Hand this child's totals to the aggregate file and drop its dump
+    directory = getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+    if not directory:
+        return
+    try:
+        REGISTRY.retire(directory)
+    except OSError:
+        logger.warning('could not retire task metrics in %s', directory, exc_info=True)
+
+
+def _flush(force=False):
+    """
+    Writes this worker's samples to the shared metrics directory so
+    the web /metrics endpoint can merge them.
+    """
+    directory = getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+    if not directory:
+        return
+    try:
+        REGISTRY.flush(directory, force=force)
+    except OSError:
+        logger.warning('could not write task metrics to %s', directory, exc_info=True)
+
+
+# ---------------------------------------------------------
+# QUEUE DEPTH PROBE
+# ---------------------------------------------------------
+_last_probe = 0.0
+
+
+def probe_queue_depths():
+    """
+    Reads message counts of all known queues from the broker.
+    Throttled so frequent scrapes don't hammer the broker.
+    """
+    global _last_probe
+
+    interval = getattr(settings, 'CELERY_QUEUE_DEPTH_PROBE_INTERVAL', 15)
+    now = time.monotonic()
+    if now - _last_probe < interval or getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+        return
+    _last_probe = now
+
+    from .celery import app
+
+    queue_names = list(app.amqp.queues.keys()) or [app.conf.task_default_queue]
+    try:
+        with app.connection_for_read() as conn:
+            conn.ensure_connection(max_retries=1)
+            channel = conn.default_channel
+            for name in queue_names:
+                try:
+                    result = channel.queue_declare(queue=name, passive=True)
+                except Exception:
+                    # Queue not declared yet: nothing waiting
+                    QUEUE_DEPTH.set(0, (name,))
+                    continue
+                QUEUE_DEPTH.set(result.message_count, (name,))
+    except Exception:
+        logger.warning('queue depth probe failed', exc_info=True)
+
+
+REGISTRY.add_collector(probe_queue_depths)
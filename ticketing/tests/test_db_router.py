@@ -0,0 +1,108 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from ticketing import db_router
+from ticketing.db_router import pin_to_primary, read_from_replica
+from tickets.models import Category
+from users.models import User
+
+REPLICA = 'replica_test'
+
+
+@override_settings(
+    DATABASE_REPLICAS=[REPLICA],
+    CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'ticketing-router-tests'),
+    }},
+)
+class TwoDatabaseRoutingTests(TransactionTestCase):
+    """
+    The test database stands in for the primary and a second SQLite
+    database for the replica: a row is only visible where it was
+    actually read from.
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Registered for this class only, with its own migrated (never
+        # replicated) test database. The runner (and its system checks)
+        # never see the alias.
+        cls._databases = override_settings(DATABASES={
+            **settings.DATABASES,
+            REPLICA: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'replica_test.sqlite3'},
+        })
+        cls._databases.enable()
+        # Cleanups run last-in first-out: registered before super()
+        # adds the class overrides', this one undoes DATABASES last
+        cls.addClassCleanup(cls._remove_replica)
+        connections.settings = connections.configure_settings(None)
+        cls._replica_name = connections[REPLICA].settings_dict['NAME']
+        connections[REPLICA].creation.create_test_db(verbosity=0, autoclobber=True)
+        cls.databases = {'default', REPLICA}
+        super().setUpClass()
+
+    @classmethod
+    def _remove_replica(cls):
+        if REPLICA in connections.settings:
+            connections[REPLICA].creation.destroy_test_db(cls._replica_name, verbosity=0)
+            del connections[REPLICA]
+        cls._databases.disable()
+        connections.settings = connections.configure_settings(None)
+
+    def setUp(self):
+        # The file cache outlives the run: drop pins left by earlier tests
+        cache.clear()
+        db_router._unhealthy_until.clear()
+        db_router._healthy_until.clear()
+        self.user = User.objects.create_user(username='reader', password='pw', role='user')
+        self.category = Category.objects.create(name='Primary only')
+
+    def test_replica_scope_reads_from_replica(self):
+        with read_from_replica():
+            self.assertFalse(Category.objects.filter(pk=self.category.pk).exists())
+        self.assertTrue(Category.objects.filter(pk=self.category.pk).exists())
+
+    def test_writes_go_to_primary_inside_replica_scope(self):
+        with read_from_replica():
+            Category.objects.create(name='Written in scope')
+        self.assertTrue(Category.objects.filter(name='Written in scope').exists())
+        self.assertFalse(Category.objects.using(REPLICA).filter(name='Written in scope').exists())
+
+    def test_read_only_views_stick_to_primary_after_a_write(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        names = [c['name'] for c in client.get('/api/tickets/categories/').json()]
+        self.assertNotIn('Primary only', names)
+
+        pin_to_primary(self.user)
+        names = [c['name'] for c in client.get('/api/tickets/categories/').json()]
+        self.assertIn('Primary only', names)
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        with mock.patch.object(connections[REPLICA], 'ensure_connection', side_effect=OperationalError):
+            with read_from_replica():
+                self.assertTrue(Category.objects.filter(pk=self.category.pk).exists())
+        self.assertIn(REPLICA, db_router._unhealthy_until)
+
+    def test_health_check_result_is_reused(self):
+        self.assertTrue(db_router._replica_is_healthy(REPLICA))
+        # Within the check interval the replica is not probed again
+        with mock.patch.object(connections[REPLICA], 'ensure_connection', side_effect=OperationalError):
+            self.assertTrue(db_router._replica_is_healthy(REPLICA))
+            db_router._healthy_until.clear()
+            self.assertFalse(db_router._replica_is_healthy(REPLICA))
+
+    def test_process_local_cache_disables_replicas(self):
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}):
+            with read_from_replica():
+                self.assertTrue(Category.objects.filter(pk=self.category.pk).exists())
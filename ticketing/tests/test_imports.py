@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+_SCRIPT = '''
+import importlib, sys
+import django
+django.setup()
+importlib.import_module(sys.argv[1])
+print(' '.join(sorted({name.split('.')[0] for name in sys.modules})))
+'''
+
+
+_TIMING_SCRIPT = '''
+import importlib, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(setup_done - started, time.perf_counter() - setup_done)
+'''
+
+
+def _run(script, *args):
+    return subprocess.run(
+        [sys.executable, '-c', script, *args],
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE),
+        check=True,
+    ).stdout
+
+
+class WebWorkerImportTests(SimpleTestCase):
+    def test_url_conf_does_not_import_ml_packages(self):
+        """
+        What a web worker loads at boot, in a fresh interpreter.
+        """
+        loaded = set(_run(_SCRIPT, settings.ROOT_URLCONF).split())
+
+        self.assertIn('rest_framework', loaded)
+        self.assertEqual(loaded & set(settings.WEB_FORBIDDEN_IMPORTS), set())
+
+    def test_url_conf_import_time_is_within_budget(self):
+        """
+        The URL conf's import time against a bare django.setup() in the
+        same fresh interpreter; the fastest of three runs.
+        """
+        runs = [tuple(map(float, _run(_TIMING_SCRIPT, settings.ROOT_URLCONF).split())) for _ in range(3)]
+        setup, urls = min(runs, key=sum)
+
+        self.assertLessEqual(
+            urls, setup * settings.WEB_IMPORT_MAX_RATIO,
+            f'importing {settings.ROOT_URLCONF} took {urls * 1000:.0f} ms '
+            f'after a {setup * 1000:.0f} ms django.setup()',
+        )
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from django.test import TestCase, override_settings
+from django.urls import resolve
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ticketing.metrics import REQUEST_SERIALIZER_SECONDS
+from ticketing.middleware import _route_label
+from tickets.models import Ticket
+from users.models import User
+
+
+def _count(metric, labels):
+    return dict((tuple(k), v) for k, v in metric.dump()['values']).get(labels, [None, 0.0, 0])[2]
+
+
+class MetricsEndpointTests(TestCase):
+    def _scrape(self, authorization=None):
+        headers = {'HTTP_AUTHORIZATION': authorization} if authorization else {}
+        return self.client.get('/metrics', **headers)
+
+    @override_settings(METRICS_AUTH_TOKEN=None)
+    def test_requires_auth_without_a_configured_token(self):
+        self.assertEqual(self._scrape().status_code, 403)
+
+    @override_settings(METRICS_AUTH_TOKEN='scrape-secret')
+    def test_accepts_the_scraper_token(self):
+        self.assertEqual(self._scrape('Bearer wrong').status_code, 403)
+        self.assertEqual(self._scrape('Bearer scrape-secret').status_code, 200)
+
+    @override_settings(METRICS_AUTH_TOKEN=None)
+    def test_accepts_admins_only(self):
+        for role, status in (('user', 403), ('agent', 403), ('admin', 200)):
+            user = User.objects.create_user(username=role, password='pw', role=role)
+            self.assertEqual(self._scrape(f'Bearer {AccessToken.for_user(user)}').status_code, status, role)
+
+
+class SerializerTimingTests(TestCase):
+    def test_serializer_time_is_recorded_per_route(self):
+        user = User.objects.create_user(username='reporter', password='pw')
+        Ticket.objects.create(ticket_id='T-MET-1', title='Printer', description='Jammed.', created_by=user)
+        client = APIClient()
+        client.force_authenticate(user)
+        url = f'/api/tickets/tickets/{Ticket.objects.get().pk}/'
+        labels = (_route_label(SimpleNamespace(resolver_match=resolve(url))), 'GET')
+        before = _count(REQUEST_SERIALIZER_SECONDS, labels)
+
+        response = client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_count(REQUEST_SERIALIZER_SECONDS, labels), before + 1)
@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import resolve
+from rest_framework.test import APIClient
+
+from users.models import User
+from users.views import CustomTokenObtainPairSerializer
+
+RATE_LIMITS = {
+    'tickets-list': {
+        'methods': ('POST',),
+        'rates': {'user': (60, 2), 'admin': (60, 5)},
+    },
+}
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS=RATE_LIMITS, RATE_LIMIT_DEFAULT=None)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _client(self, user):
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def _statuses(self, client, count):
+        return [client.post('/api/tickets/tickets/', {}).status_code for _ in range(count)]
+
+    def test_list_reads_share_the_name_but_not_the_create_limit(self):
+        # Both list routes are named 'tickets-list'; the rule only covers POST
+        self.assertEqual(resolve('/api/tickets/tickets/list/').url_name, 'tickets-list')
+        client = self._client(User.objects.create_user(username='r', password='pw', role='user'))
+
+        statuses = [client.get('/api/tickets/tickets/list/').status_code for _ in range(5)]
+
+        self.assertEqual(statuses, [200] * 5)
+
+    def test_creates_are_limited_per_role_claim(self):
+        user = User.objects.create_user(username='u', password='pw', role='user')
+        admin = User.objects.create_user(username='a', password='pw', role='admin')
+
+        self.assertEqual(self._statuses(self._client(user), 3)[-1], 429)
+        self.assertNotIn(429, self._statuses(self._client(admin), 5))
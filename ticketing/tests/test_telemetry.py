@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.test import SimpleTestCase
+
+from ticketing import telemetry
+from ticketing.celery import app
+from ticketing.metrics import Registry
+
+
+@app.task(name='tests.telemetry.add')
+def add(a, b):
+    return a + b
+
+
+@app.task(name='tests.telemetry.explode')
+def explode():
+    raise KeyError('boom')
+
+
+def _value(metric, labels):
+    return dict((tuple(k), v) for k, v in metric.dump()['values']).get(labels)
+
+
+class EagerTaskTelemetryTests(SimpleTestCase):
+    """
+    Tasks run with apply() (the eager path) go through the same
+    prerun/postrun/failure signals a worker sends.
+    """
+
+    def test_success_records_runtime_and_outcome(self):
+        before = _value(telemetry.TASK_OUTCOMES, (add.name, 'success')) or 0
+
+        self.assertEqual(add.apply((2, 3)).get(), 5)
+
+        self.assertEqual(_value(telemetry.TASK_OUTCOMES, (add.name, 'success')), before + 1)
+        counts, total, count = _value(telemetry.TASK_RUNTIME, (add.name, 'SUCCESS'))
+        self.assertGreaterEqual(count, 1)
+        self.assertGreaterEqual(total, 0.0)
+
+    def test_failure_records_exception_type(self):
+        before = _value(telemetry.TASK_FAILURES, (explode.name, 'KeyError')) or 0
+
+        result = explode.apply()
+
+        self.assertTrue(result.failed())
+        self.assertEqual(_value(telemetry.TASK_FAILURES, (explode.name, 'KeyError')), before + 1)
+        self.assertGreaterEqual(_value(telemetry.TASK_OUTCOMES, (explode.name, 'failure')), 1)
+
+    def test_queue_wait_uses_publish_header(self):
+        headers = {}
+        telemetry._stamp_publish_time(sender=add.name, headers=headers)
+        self.assertIn(telemetry.PUBLISHED_AT_HEADER, headers)
+
+        add.apply((1, 1), headers=headers)
+
+        counts, total, count = _value(telemetry.TASK_QUEUE_WAIT, (add.name,))
+        self.assertGreaterEqual(count, 1)
+
+
+class MultiprocessDumpTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.registry = Registry()
+        self.counter = self.registry.counter('jobs_total', 'Jobs.', ('kind',))
+
+    def _files(self):
+        return sorted(os.listdir(self.directory))
+
+    def test_retire_moves_totals_into_aggregate(self):
+        self.counter.inc(('a',), 3)
+        self.registry.flush(self.directory, force=True)
+        self.registry.retire(self.directory)
+
+        self.assertNotIn(f'{os.getpid()}.json', self._files())
+        with open(os.path.join(self.directory, Registry.AGGREGATE)) as fh:
+            self.assertEqual(fh.read().count('"a"'), 1)
+        self.assertIn('jobs_total{kind="a"} 3', Registry().render(self.directory))
+
+    def test_scrape_folds_dumps_of_exited_processes(self):
+        # A process that flushed and died without retiring
+        exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                                capture_output=True, text=True, check=True)
+        pid = int(exited.stdout)
+        dump = {'jobs_total': {**self.counter.dump(), 'values': [[['b'], 2]]}}
+        with open(os.path.join(self.directory, f'{pid}.json'), 'w') as fh:
+            json.dump(dump, fh)
+
+        self.counter.inc(('b',), 1)
+        first = self.registry.render(self.directory)
+        second = self.registry.render(self.directory)
+
+        self.assertNotIn(f'{pid}.json', self._files())
+        self.assertIn('jobs_total{kind="b"} 3', first)
+        self.assertEqual(first, second)
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from .views import metrics_view
 
 # Main URL configuration of the project
 urlpatterns = [
@@ -13,11 +14,10 @@ urlpatterns = [
 
     # Ticketing system APIs (CRUD, analytics, background tasks)
     path('api/tickets/', include('tickets.urls')),
+
+    # Prometheus scrape endpoint (request/task metrics)
+    path(settings.METRICS_PATH, metrics_view, name='metrics'),
 ]
 
-# Serve media files during development
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT
-    )
+# Attachments are not served from MEDIA_URL, even during development:
+# they go through the authorized download endpoint (tickets.downloads)
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .metrics import REGISTRY
+
+
+# ---------------------------------------------------------
+# PROMETHEUS SCRAPE ENDPOINT
+# ---------------------------------------------------------
+def _may_scrape(request):
+    """
+    The scraper's bearer token (METRICS_AUTH_TOKEN) or an admin's JWT;
+    nobody else, including when no token is configured.
+    """
+    header = request.headers.get('Authorization', '')
+    token = getattr(settings, 'METRICS_AUTH_TOKEN', None)
+    if token and constant_time_compare(header, f'Bearer {token}'):
+        return True
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return authenticated is not None and authenticated[0].role == 'admin'
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Exposes process metrics in Prometheus text format.
+    Samples written by other processes (gunicorn workers, Celery
+    children) to METRICS_MULTIPROC_DIR are merged in.
+    Requires METRICS_AUTH_TOKEN as a Bearer token, or an admin's JWT.
+    """
+    if not _may_scrape(request):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        REGISTRY.render(getattr(settings, 'METRICS_MULTIPROC_DIR', None)),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
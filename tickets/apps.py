@@ -12,3 +12,8 @@ class TicketsConfig(AppConfig):
 
     # Name of the app (must match the app folder name)
     name = 'tickets'
+
+    def ready(self):
+        # Connects the signal handlers that record ticket events,
+        # keep the agent work queue in sync and feed latency sketches
+        from . import events, latency, workqueue  # noqa: F401
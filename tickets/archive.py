@@ -0,0 +1,136 @@
+# ---------------------------------------------------------
+# HOT / COLD TICKET TIERING
+# ---------------------------------------------------------
+# Tickets resolved or closed more than TICKET_ARCHIVE_AFTER_DAYS ago
+# are moved, in batches, out of the hot tables (Ticket, TicketActivity,
+# Attachment, MLPredictionHistory) into TicketArchive. The detail
+# endpoint falls back to the archive, so they remain readable.
+# Archives carry the month they were closed in (archive_month, indexed)
+# but the table is not partitioned.
+#
+# Attachment files stay where they are in storage: each attachment
+# row becomes an ArchivedAttachment with the same id, so the download
+# endpoint keeps serving it. Files are never deleted by archiving.
+import json
+import os
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedAttachment, Ticket, TicketArchive
+from .serializers import TicketSerializer
+from . import snapshot
+
+ARCHIVABLE_STATUSES = ('resolved', 'closed')
+
+
+def _document(ticket):
+    """
+    Ticket as served by the detail API, plus its prediction history.
+    """
+    data = dict(TicketSerializer(ticket).data)
+    data['predictions'] = [
+        {
+            'predicted_priority': p.predicted_priority,
+            'model_version': p.model_version,
+            'confidence_score': p.confidence_score,
+            'run_at': p.run_at,
+        }
+        for p in ticket.predictions.all()
+    ]
+    # Download links are signed when the document is served
+    data['attachments'] = [
+        {
+            'id': a.pk,
+            'file': None,
+            'name': os.path.basename(a.file.name),
+            'uploaded_at': a.uploaded_at,
+        }
+        for a in ticket.attachments.all()
+    ]
+    data['archived'] = True
+    return data
+
+
+def archive_batch(cutoff, batch_size=500):
+    """
+    Archives one batch of tickets closed before `cutoff`.
+    Returns the number of tickets moved.
+    """
+    with transaction.atomic():
+        tickets = list(
+            Ticket.objects.filter(
+                status__in=ARCHIVABLE_STATUSES,
+                # Last change approximates the closing time
+                updated_at__lt=cutoff,
+            )
+            .select_related('created_by', 'assigned_to', 'category')
+            .prefetch_related('activities__actor', 'attachments', 'predictions')
+            .order_by('id')[:batch_size]
+        )
+        if not tickets:
+            return 0
+
+        TicketArchive.objects.bulk_create([
+            TicketArchive(
+                ticket_pk=ticket.pk,
+                ticket_id=ticket.ticket_id,
+                status=ticket.status,
+                archive_month=ticket.updated_at.strftime('%Y-%m'),
+                closed_at=ticket.updated_at,
+                payload=zlib.compress(
+                    json.dumps(_document(ticket), cls=DjangoJSONEncoder).encode('utf-8'),
+                    level=6
+                ),
+            )
+            for ticket in tickets
+        ])
+
+        ArchivedAttachment.objects.bulk_create([
+            ArchivedAttachment(
+                id=a.pk,
+                archive_id=ticket.pk,
+                ticket_created_by_id=ticket.created_by_id,
+                file=a.file.name,
+                uploaded_at=a.uploaded_at,
+            )
+            for ticket in tickets
+            for a in ticket.attachments.all()
+        ])
+
+        # Cascades to activities, attachments (rows only, not files)
+        # and predictions
+        Ticket.objects.filter(id__in=[t.id for t in tickets]).delete()
+
+    # Deleted rows are only dropped from the snapshot by a full reload
+    snapshot.invalidate()
+    return len(tickets)
+
+
+def archive_closed_tickets(days, batch_size=500, max_batches=None):
+    """
+    Moves every eligible ticket in batches (one transaction per batch,
+    so locks stay short). Returns the total number archived.
+    """
+    cutoff = timezone.now() - timezone.timedelta(days=days)
+    total, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+    return total
+
+
+def get_archived(pk):
+    """
+    Returns the archived ticket document for an original ticket pk, or None.
+    """
+    try:
+        archived = TicketArchive.objects.filter(ticket_pk=pk).only('payload').first()
+    except (ValueError, TypeError):
+        return None
+    return archived.data if archived else None
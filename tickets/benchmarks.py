@@ -0,0 +1,85 @@
+# ---------------------------------------------------------
+# BENCHMARK HELPERS
+# ---------------------------------------------------------
+# Shared by the bench_* management commands: latency summaries
+# and JSON reports that can be diffed between commits.
+import json
+import math
+import platform
+import subprocess
+from datetime import datetime, timezone as dt_timezone
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies, total_seconds=None, **extra):
+    """
+    Builds a summary dict (milliseconds) from per-call latencies in seconds.
+    """
+    values = sorted(latencies)
+    total = total_seconds if total_seconds is not None else sum(values)
+    summary = {
+        'calls': len(values),
+        'throughput_per_sec': round(len(values) / total, 2) if total else 0.0,
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+    }
+    summary.update(extra)
+    return summary
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(path, suite, results):
+    """
+    Writes results with enough metadata to compare two runs.
+    """
+    report = {
+        'suite': suite,
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'generated_at': datetime.now(dt_timezone.utc).isoformat(),
+        'results': results,
+    }
+    with open(path, 'w') as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+    return report
+
+
+def compare_reports(baseline_path, results):
+    """
+    Yields (key, metric, old, new, change %) for every numeric metric
+    present in both the baseline file and the current results.
+    """
+    with open(baseline_path) as fh:
+        baseline = json.load(fh).get('results', {})
+
+    for key, current in results.items():
+        old = baseline.get(key)
+        if not isinstance(old, dict) or not isinstance(current, dict):
+            continue
+        for metric, new_value in current.items():
+            old_value = old.get(metric)
+            if not isinstance(new_value, (int, float)) or not isinstance(old_value, (int, float)):
+                continue
+            change = ((new_value - old_value) / old_value * 100) if old_value else 0.0
+            yield key, metric, old_value, new_value, round(change, 1)
@@ -0,0 +1,92 @@
+# ---------------------------------------------------------
+# BULK TICKET MUTATIONS
+# ---------------------------------------------------------
+# Applies one change set to many tickets with set-based UPDATEs.
+# Per-ticket signals are bypassed, so everything they would do
+# (events, status activities, work queue, latency sketches,
+# escalation matches) is written here in bulk, inside the same
+# transaction. Task messages (one notification, escalation firing)
+# are only queued once it commits.
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .events import TRACKED_FIELDS, write_events
+from .models import Ticket, TicketActivity, TicketEvent
+from . import latency, workqueue
+
+# Fields each role may change in bulk
+ALLOWED_FIELDS = {
+    'admin': {'status', 'priority', 'assigned_to', 'category'},
+    'agent': {'status', 'priority', 'assigned_to', 'category'},
+    'user': {'status'},
+}
+
+
+def editable_tickets(user):
+    """
+    Tickets the user may modify: admins any, agents their own or
+    unassigned ones, users the tickets they created.
+    """
+    if user.role == 'admin':
+        return Ticket.objects.all()
+    if user.role == 'agent':
+        return Ticket.objects.filter(Q(assigned_to=user) | Q(assigned_to__isnull=True))
+    return Ticket.objects.filter(created_by=user)
+
+
+def apply_changes(user, ticket_ids, changes, comment=''):
+    """
+    Applies `changes` (event keys -> new values) to the given tickets.
+    Permissions are checked again on the locked rows, so a ticket
+    reassigned since it was selected is skipped, not overwritten.
+    Returns the ids of the tickets that actually changed.
+    """
+    columns = {TRACKED_FIELDS[key]: value for key, value in changes.items()}
+    now = timezone.now()
+
+    with transaction.atomic():
+        rows = list(
+            editable_tickets(user).select_for_update()
+            .filter(id__in=ticket_ids)
+            .values('id', *columns)
+        )
+
+        events = []
+        for row in rows:
+            diff = {
+                key: [row[TRACKED_FIELDS[key]], value]
+                for key, value in changes.items()
+                if row[TRACKED_FIELDS[key]] != value
+            }
+            if diff:
+                events.append(TicketEvent(
+                    ticket_id=row['id'],
+                    kind=TicketEvent.CHANGED,
+                    actor_id=user.pk,
+                    changes=diff,
+                ))
+
+        changed = [event.ticket_id for event in events]
+        if not changed:
+            return []
+
+        Ticket.objects.filter(id__in=changed).update(updated_at=now, **columns)
+
+        # Events plus TicketActivity rows for status changes
+        write_events(events)
+        if comment:
+            latency.observe(TicketActivity.objects.bulk_create([
+                TicketActivity(ticket_id=ticket_id, actor=user, comment=comment)
+                for ticket_id in changed
+            ]))
+        workqueue.sync_tickets(changed)
+
+        transaction.on_commit(lambda: _notify(changed, changes))
+
+    return changed
+
+
+def _notify(ticket_ids, changes):
+    from .tasks import send_bulk_update_notification
+    send_bulk_update_notification.delay(ticket_ids, changes)
@@ -0,0 +1,221 @@
+# ---------------------------------------------------------
+# ATTACHMENT DOWNLOADS
+# ---------------------------------------------------------
+# Attachments are served by /api/tickets/attachments/<id>/download/
+# to users who may view the ticket (admins and agents any ticket,
+# users their own), including attachments of archived tickets. Ticket responses link to it with an expiring
+# signature, so browsers and media players (which cannot send the
+# JWT header) can fetch it and repeat downloads skip the permission
+# query.
+#
+# With ATTACHMENT_SENDFILE set, Django only authorizes: the front
+# proxy streams the file (nginx: X-Accel-Redirect to an internal
+# location aliasing MEDIA_ROOT; Apache/lighttpd: X-Sendfile) and
+# handles Range itself. Otherwise a FileResponse is returned, with
+# single-range requests, ETag and If-Modified-Since handled here.
+import mimetypes
+import os
+import re
+import time
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from .models import ArchivedAttachment, Attachment, Ticket
+
+_signer = signing.Signer(salt='tickets.attachment-download')
+
+_range = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+
+
+# ---------------------------------------------------------
+# PERMISSIONS
+# ---------------------------------------------------------
+def viewable_tickets(user):
+    """
+    Tickets whose attachments the user may download.
+    """
+    if user.role in ('admin', 'agent'):
+        return Ticket.objects.all()
+    return Ticket.objects.filter(created_by=user)
+
+
+def can_view(user, ticket):
+    """
+    viewable_tickets() for one loaded ticket, without a query.
+    """
+    return can_view_created_by(user, ticket.created_by_id)
+
+
+def can_view_created_by(user, created_by_id):
+    """
+    can_view() for a ticket known only by its creator's id.
+    """
+    return user.role in ('admin', 'agent') or created_by_id == user.pk
+
+
+# ---------------------------------------------------------
+# SIGNED URLS
+# ---------------------------------------------------------
+def url_window(now=None):
+    """
+    Current signing window. Links issued within one window expire
+    together, so ticket responses (and their ETags) stay stable for
+    ATTACHMENT_URL_MAX_AGE / 2 and every link lives at least that long.
+    """
+    return int(now or time.time()) // (settings.ATTACHMENT_URL_MAX_AGE // 2)
+
+
+def _signature(attachment_id, expires):
+    return _signer.signature(f'{attachment_id}:{expires}')
+
+
+def signed_url(attachment_id, request=None):
+    expires = (url_window() + 2) * (settings.ATTACHMENT_URL_MAX_AGE // 2)
+    url = reverse('attachment-download', args=[attachment_id]) + '?' + urlencode({
+        'expires': expires,
+        'signature': _signature(attachment_id, expires),
+    })
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def verify(attachment_id, expires, signature):
+    """
+    Seconds the link remains valid, or None if it is forged or expired.
+    """
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return None
+    remaining = expires - int(time.time())
+    if remaining <= 0 or not constant_time_compare(signature or '', _signature(attachment_id, expires)):
+        return None
+    return remaining
+
+
+# ---------------------------------------------------------
+# RESPONSES
+# ---------------------------------------------------------
+def _byte_range(header, size):
+    """
+    (start, end) inclusive for a single-range `Range` header, None to
+    serve the whole file (absent, malformed or multi-range), or
+    'unsatisfiable'.
+    """
+    match = _range.match(header.replace(' ', '')) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return 'unsatisfiable'
+    return start, end
+
+
+def _read(path, start, length):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve(request, attachment, max_age=0):
+    """
+    Response streaming the attachment's file (or handing it to the
+    proxy). `max_age`: how long the client may reuse it unvalidated.
+    """
+    path = attachment.file.path
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    etag = f'"{int(stat.st_mtime)}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    name = os.path.basename(attachment.file.name)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    def finish(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, max_age=max_age)
+        return response
+
+    cached = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if cached is not None:
+        return finish(cached)
+
+    as_attachment = bool(request.GET.get('download'))
+    sendfile = settings.ATTACHMENT_SENDFILE
+    if sendfile:
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.ATTACHMENT_ACCEL_PREFIX + quote(attachment.file.name)
+        else:
+            response['X-Sendfile'] = path
+        response['Content-Disposition'] = content_disposition_header(as_attachment, name)
+        return finish(response)
+
+    byte_range = _byte_range(request.META.get('HTTP_RANGE'), stat.st_size)
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if byte_range and if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+        # The client's partial copy is stale: send everything
+        byte_range = None
+
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return finish(response)
+
+    if byte_range is None:
+        response = FileResponse(
+            open(path, 'rb'), content_type=content_type, as_attachment=as_attachment, filename=name
+        )
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read(path, start, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Disposition'] = content_disposition_header(as_attachment, name)
+    response['Accept-Ranges'] = 'bytes'
+    return finish(response)
+
+
+def find(attachment_id, user=None):
+    """
+    The attachment, restricted to tickets `user` may view (None:
+    already authorized by a signed link). None if not found.
+    """
+    attachments = Attachment.objects.only('id', 'file', 'ticket_id')
+    if user is not None:
+        attachments = attachments.filter(ticket__in=viewable_tickets(user))
+    attachment = attachments.filter(id=attachment_id).first()
+    if attachment is not None:
+        return attachment
+
+    # Archiving keeps the id, so links issued before still resolve
+    archived = ArchivedAttachment.objects.only('id', 'file', 'ticket_created_by_id').filter(id=attachment_id)
+    if user is not None and user.role not in ('admin', 'agent'):
+        archived = archived.filter(ticket_created_by=user)
+    return archived.first()
@@ -0,0 +1,143 @@
+# ---------------------------------------------------------
+# NEAR-DUPLICATE TICKET DETECTION
+# ---------------------------------------------------------
+# Outages produce many almost identical tickets. New tickets are
+# checked against a MinHash-LSH index of recent open tickets; a
+# match is linked to the existing (parent) ticket instead of going
+# through notification and assignment again.
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .ml.dedup import DuplicateIndex
+from .models import Ticket, TicketActivity
+
+# Statuses that can act as the parent of a new duplicate
+ACTIVE_STATUSES = ('open', 'in_progress', 'waiting')
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _ticket_text(title, description):
+    return (title or '') + ' ' + (description or '')
+
+
+def _window_seconds():
+    return settings.DEDUP_WINDOW_HOURS * 3600
+
+
+def _recent_open_tickets(after_id=0):
+    """
+    Tickets that can become parents: active, not themselves duplicates,
+    created inside the detection window.
+    """
+    since = timezone.now() - timezone.timedelta(seconds=_window_seconds())
+    return (
+        Ticket.objects.filter(
+            id__gt=after_id,
+            status__in=ACTIVE_STATUSES,
+            parent__isnull=True,
+            created_at__gte=since,
+        )
+        .order_by('id')
+        .values_list('id', 'title', 'description', 'created_at')
+    )
+
+
+def build_index():
+    """
+    Builds a fresh index from the database.
+    """
+    index = DuplicateIndex(_window_seconds(), settings.DEDUP_SIMILARITY_THRESHOLD)
+    for pk, title, description, created_at in _recent_open_tickets().iterator(chunk_size=2000):
+        index.add(pk, _ticket_text(title, description), created_at.timestamp())
+    return index
+
+
+def rebuild_index():
+    """
+    Rebuilds the index from scratch and persists it so that workers
+    start warm after a restart.
+    """
+    global _index
+
+    index = build_index()
+    index.save(str(settings.DEDUP_INDEX_PATH))
+    with _index_lock:
+        _index = index
+    return len(index.lsh)
+
+
+def get_index():
+    """
+    Returns this process's index, loading the persisted copy (or
+    building one) on first use and catching up with tickets created
+    since, so every web worker sees the others' new tickets.
+    """
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = DuplicateIndex.load(
+                    str(settings.DEDUP_INDEX_PATH),
+                    _window_seconds(),
+                    settings.DEDUP_SIMILARITY_THRESHOLD,
+                )
+            except (OSError, EOFError, KeyError, ValueError):
+                _index = build_index()
+        index = _index
+
+    for pk, title, description, created_at in _recent_open_tickets(index.last_id):
+        index.add(pk, _ticket_text(title, description), created_at.timestamp())
+    index.prune(time.time())
+    return index
+
+
+def find_duplicate(ticket):
+    """
+    Returns the open parent ticket this ticket duplicates, or None.
+    """
+    if not settings.DEDUP_ENABLED:
+        return None
+
+    index = get_index()
+    matches = index.query(_ticket_text(ticket.title, ticket.description), exclude={ticket.id})
+
+    for candidate_id, _ in matches:
+        # The index can lag status changes; confirm against the DB
+        parent = Ticket.objects.filter(
+            id=candidate_id,
+            status__in=ACTIVE_STATUSES,
+            parent__isnull=True,
+        ).first()
+        if parent is not None:
+            return parent
+        index.discard(candidate_id)
+    return None
+
+
+def link_duplicate(ticket, parent):
+    """
+    Links a ticket to its parent incident, inheriting the parent's
+    assignee and priority so no separate assignment is needed.
+    """
+    ticket.parent = parent
+    ticket.assigned_to_id = parent.assigned_to_id
+    ticket.priority = parent.priority
+    ticket.save(update_fields=['parent', 'assigned_to', 'priority', 'updated_at'])
+
+    TicketActivity.objects.create(
+        ticket=ticket,
+        actor=None,
+        comment=f'Linked as duplicate of {parent.ticket_id}',
+        old_status='',
+        new_status=ticket.status
+    )
+
+    # Duplicates never act as parents themselves
+    if _index is not None:
+        _index.discard(ticket.id)
@@ -0,0 +1,506 @@
+# ---------------------------------------------------------
+# ESCALATION RULES
+# ---------------------------------------------------------
+# Active EscalationRules are compiled into one predicate table per
+# ticket field: for every value some condition mentions, a bitmask
+# (Python int, bit i = rule i) of the rules that accept that value,
+# plus a default mask for all other values. Matching a ticket is one
+# dict lookup and one AND per field. On a change only the rules with
+# a condition on a changed field are candidates; text conditions
+# (title/description contains) are checked last, for surviving rules.
+#
+# Matches become EscalationMatch rows due immediately, or at
+# created_at/updated_at + after_minutes for time-based rules. The
+# fire_escalations task (run on new due matches and every minute)
+# re-checks each due match against the current ticket, applies the
+# rule's actions and marks it fired: a rule fires once per ticket.
+# The resulting save is recorded like any other change (TicketEvent,
+# plus TicketActivity for a status change), with no actor.
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import EscalationMatch, EscalationRule, Ticket, TicketEvent
+from .workqueue import DONE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Condition field -> Ticket attribute
+FIELDS = {
+    'status': 'status',
+    'priority': 'priority',
+    'category': 'category_id',
+    'assigned_to': 'assigned_to_id',
+    'created_by': 'created_by_id',
+    'title': 'title',
+    'description': 'description',
+}
+CHOICE_FIELDS = {
+    'status': {value for value, _ in Ticket.STATUS_CHOICES},
+    'priority': {value for value, _ in Ticket.PRIORITY_CHOICES},
+}
+ID_FIELDS = ('category', 'assigned_to', 'created_by')
+NULLABLE_FIELDS = ('category', 'assigned_to')
+TEXT_FIELDS = ('title', 'description')
+
+OPERATORS = {
+    'eq': 'equals value',
+    'ne': 'differs from value',
+    'in': 'is one of value (a list)',
+    'not_in': 'is none of value (a list)',
+    'is_null': 'is empty (value true) or set (value false)',
+    'contains': 'contains value, ignoring case (title/description)',
+}
+
+# Action -> Ticket attribute
+ACTIONS = {
+    'assign_to': 'assigned_to_id',
+    'priority': 'priority',
+    'status': 'status',
+}
+
+# Ticket columns rules are evaluated against
+TICKET_VALUES = ('id', *FIELDS.values(), 'created_at', 'updated_at')
+
+
+# ---------------------------------------------------------
+# VALIDATION
+# ---------------------------------------------------------
+def _check_value(field, value):
+    if field in CHOICE_FIELDS:
+        if value not in CHOICE_FIELDS[field]:
+            raise ValueError(f"{field} must be one of {', '.join(sorted(CHOICE_FIELDS[field]))}")
+    elif not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f'{field} values must be ids (integers)')
+
+
+def validate_conditions(conditions):
+    """
+    Returns conditions normalized to {field, op, value} dicts;
+    raises ValueError describing the first invalid one.
+    """
+    if not isinstance(conditions, list):
+        raise ValueError('conditions must be a list')
+
+    normalized = []
+    for condition in conditions:
+        if not isinstance(condition, dict):
+            raise ValueError('each condition must be an object with field, op and value')
+        field, op, value = condition.get('field'), condition.get('op', 'eq'), condition.get('value')
+        if field not in FIELDS:
+            raise ValueError(f"unknown field {field!r}; choose from {', '.join(FIELDS)}")
+        if op not in OPERATORS:
+            raise ValueError(f"unknown op {op!r}; choose from {', '.join(OPERATORS)}")
+
+        if field in TEXT_FIELDS:
+            if op != 'contains' or not isinstance(value, str) or not value.strip():
+                raise ValueError(f'{field} supports only contains with a non-empty string')
+            value = value.strip()
+        elif op == 'contains':
+            raise ValueError(f'contains applies to {" and ".join(TEXT_FIELDS)} only')
+        elif op == 'is_null':
+            if field not in NULLABLE_FIELDS or not isinstance(value, bool):
+                raise ValueError(f"is_null takes true/false and applies to {', '.join(NULLABLE_FIELDS)}")
+        elif op in ('in', 'not_in'):
+            if not isinstance(value, list) or not value:
+                raise ValueError(f'{op} needs a non-empty list')
+            for item in value:
+                _check_value(field, item)
+            value = sorted(set(value))
+        else:
+            _check_value(field, value)
+
+        normalized.append({'field': field, 'op': op, 'value': value})
+    return normalized
+
+
+def validate_actions(actions):
+    """
+    Returns actions with known keys only; raises ValueError otherwise.
+    """
+    from users.models import User
+
+    if not isinstance(actions, dict) or not actions:
+        raise ValueError(f"actions must be a non-empty object with keys from {', '.join(ACTIONS)}")
+    unknown = sorted(set(actions) - set(ACTIONS))
+    if unknown:
+        raise ValueError(f"unknown actions: {', '.join(unknown)}; choose from {', '.join(ACTIONS)}")
+
+    for field in ('priority', 'status'):
+        if field in actions:
+            _check_value(field, actions[field])
+    if 'assign_to' in actions:
+        user_id = actions['assign_to']
+        _check_value('assign_to', user_id)
+        if not User.objects.filter(id=user_id, is_active=True, role__in=('agent', 'admin')).exists():
+            raise ValueError('assign_to must be an active agent or admin')
+    return dict(actions)
+
+
+# ---------------------------------------------------------
+# COMPILED RULES
+# ---------------------------------------------------------
+# Byte value -> positions of its set bits
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def _bits(mask):
+    """
+    Indices of the set bits of `mask`, lowest first.
+    """
+    if mask.bit_count() <= 16:
+        # Few matches: peel off the lowest bit
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+        return
+    # Many: clearing bits one at a time on a wide int is quadratic
+    for offset, byte in enumerate(mask.to_bytes((mask.bit_length() + 7) // 8, 'little')):
+        if byte:
+            for bit in _BYTE_BITS[byte]:
+                yield offset * 8 + bit
+
+
+class RuleSet:
+    """
+    Rules compiled for matching. `rules` need id, conditions,
+    time_field and after_minutes (validated conditions).
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.index = {rule.id: i for i, rule in enumerate(self.rules)}
+        self.all = (1 << len(self.rules)) - 1
+
+        # Rules with a condition on the field, and rules to reconsider
+        # on any change (their due time moves with updated_at)
+        self.touches = defaultdict(int)
+        self.every_change = 0
+        # Rule index -> [(attribute, lowercase needle)]
+        self.text = defaultdict(list)
+        self.text_mask = 0
+
+        # field -> {rule index: (allowed values or None for any, excluded values)}
+        accepts = defaultdict(dict)
+        for i, rule in enumerate(self.rules):
+            bit = 1 << i
+            if rule.after_minutes and rule.time_field == EscalationRule.UPDATED_AT:
+                self.every_change |= bit
+            for condition in rule.conditions:
+                field, op, value = condition['field'], condition['op'], condition['value']
+                self.touches[field] |= bit
+                if op == 'contains':
+                    self.text[i].append((FIELDS[field], value.lower()))
+                    self.text_mask |= bit
+                    continue
+
+                allowed, excluded = accepts[field].get(i, (None, frozenset()))
+                if op in ('eq', 'in') or (op == 'is_null' and value):
+                    values = {None} if op == 'is_null' else set(value if op == 'in' else [value])
+                    allowed = values if allowed is None else allowed & values
+                else:
+                    values = {None} if op == 'is_null' else set(value if op == 'not_in' else [value])
+                    excluded = excluded | values
+                accepts[field][i] = (allowed, excluded)
+
+        # [(attribute, {value: mask}, default mask)]
+        self.tables = []
+        for field, by_rule in accepts.items():
+            constrained = 0
+            for i in by_rule:
+                constrained |= 1 << i
+            default = self.all & ~constrained
+            for i, (allowed, _) in by_rule.items():
+                if allowed is None:
+                    default |= 1 << i
+
+            table = {}
+            for allowed, excluded in by_rule.values():
+                for value in (allowed or ()):
+                    table[value] = default
+                for value in excluded:
+                    table[value] = default
+            for i, (allowed, excluded) in by_rule.items():
+                bit = 1 << i
+                if allowed is None:
+                    for value in excluded:
+                        table[value] &= ~bit
+                else:
+                    for value in allowed - excluded:
+                        table[value] |= bit
+            self.tables.append((FIELDS[field], table, default))
+
+    def __len__(self):
+        return len(self.rules)
+
+    def candidates(self, changed_fields):
+        """
+        Mask of the rules a change of these fields can affect.
+        """
+        mask = self.every_change
+        for field in changed_fields:
+            mask |= self.touches.get(field, 0)
+        return mask
+
+    def match(self, ticket, mask=None):
+        """
+        Mask of the rules in `mask` (default: all) whose conditions the
+        ticket (a dict of TICKET_VALUES) meets.
+        """
+        mask = self.all if mask is None else mask
+        for attname, table, default in self.tables:
+            if not mask:
+                return 0
+            mask &= table.get(ticket[attname], default)
+
+        for i in _bits(mask & self.text_mask):
+            for attname, needle in self.text[i]:
+                if needle not in (ticket[attname] or '').lower():
+                    mask &= ~(1 << i)
+                    break
+        return mask
+
+    def matching(self, ticket, mask=None):
+        """
+        Rules (in definition order) whose conditions the ticket meets.
+        """
+        return [self.rules[i] for i in _bits(self.match(ticket, mask))]
+
+    @staticmethod
+    def due_at(rule, ticket, now):
+        if not rule.after_minutes:
+            return now
+        return ticket[rule.time_field] + timezone.timedelta(minutes=rule.after_minutes)
+
+
+# Per-process cache: (checked_at, signature, RuleSet)
+_compiled = None
+_lock = threading.Lock()
+
+
+def get_rules(force=False):
+    """
+    The compiled active rules. Rule edits are picked up within
+    ESCALATION_RULES_REFRESH_SECONDS (signature: count and latest
+    update of all rules), or on the next call after invalidate().
+    """
+    global _compiled
+    now = time.monotonic()
+    with _lock:
+        cached = _compiled
+    if cached and not force and now - cached[0] < settings.ESCALATION_RULES_REFRESH_SECONDS:
+        return cached[2]
+
+    signature = tuple(EscalationRule.objects.aggregate(count=Count('id'), latest=Max('updated_at')).values())
+    if cached and cached[1] == signature:
+        rules = cached[2]
+    else:
+        rules = RuleSet(
+            EscalationRule.objects.filter(is_active=True)
+            .order_by('id')
+            .only('id', 'name', 'conditions', 'time_field', 'after_minutes', 'actions')
+        )
+    with _lock:
+        _compiled = (now, signature, rules)
+    return rules
+
+
+def invalidate():
+    """
+    Makes this process recompile rules on next use.
+    """
+    global _compiled
+    with _lock:
+        _compiled = None
+
+
+# ---------------------------------------------------------
+# MATCHING AND SCHEDULING
+# ---------------------------------------------------------
+def _schedule(rules, tickets, masks=None):
+    """
+    Records matches of `rules` for ticket dicts (restricted to
+    masks[ticket id] if given), skipping rules already fired on the
+    ticket. Returns the ids of tickets with a match due now.
+    """
+    now = timezone.now()
+    found = []
+    for ticket in tickets:
+        mask = masks[ticket['id']] if masks is not None else None
+        found.extend((rule, ticket) for rule in rules.matching(ticket, mask))
+    if not found:
+        return set()
+
+    fired = set(
+        EscalationMatch.objects.filter(
+            ticket_id__in={ticket['id'] for _, ticket in found},
+            rule_id__in={rule.id for rule, _ in found},
+            fired_at__isnull=False,
+        ).values_list('rule_id', 'ticket_id')
+    )
+    matches = [
+        EscalationMatch(rule_id=rule.id, ticket_id=ticket['id'], due_at=rules.due_at(rule, ticket, now))
+        for rule, ticket in found
+        if (rule.id, ticket['id']) not in fired
+    ]
+    # Time-based rules anchored on updated_at move their due time
+    EscalationMatch.objects.bulk_create(
+        matches,
+        update_conflicts=True,
+        unique_fields=['rule', 'ticket'],
+        update_fields=['due_at'],
+        batch_size=1000
+    )
+    return {match.ticket_id for match in matches if match.due_at <= now}
+
+
+def _fire_soon(ticket_ids):
+    """
+    Queues firing once the current transaction commits, so workers
+    only see committed matches. The matches are already stored: if the
+    broker is unreachable the minutely fire_escalations run picks them
+    up, so the failure is logged rather than raised.
+    """
+    if not ticket_ids:
+        return
+    ticket_ids = sorted(ticket_ids)
+
+    def publish():
+        from .tasks import fire_escalations
+
+        try:
+            fire_escalations.delay(ticket_ids)
+        except Exception:
+            logger.exception('could not queue escalations for tickets %s', ticket_ids)
+
+    transaction.on_commit(publish)
+
+
+def evaluate(events):
+    """
+    Matches the tickets of newly written TicketEvents against the
+    rules their changes can affect. Returns the number of tickets
+    with an escalation due now (queued for firing).
+    """
+    rules = get_rules()
+    if not rules.rules:
+        return 0
+
+    masks = defaultdict(int)
+    for event in events:
+        if event.kind == TicketEvent.CREATED:
+            masks[event.ticket_id] = rules.all
+        else:
+            masks[event.ticket_id] |= rules.candidates(event.changes)
+    masks = {ticket_id: mask for ticket_id, mask in masks.items() if mask}
+    if not masks:
+        return 0
+
+    tickets = Ticket.objects.filter(id__in=masks).values(*TICKET_VALUES)
+    due = _schedule(rules, tickets, masks)
+    _fire_soon(due)
+    return len(due)
+
+
+def schedule_rule(rule, chunk_size=2000):
+    """
+    Matches one (new or edited) rule against every actionable ticket,
+    so time-based rules also cover tickets that do not change again.
+    Returns the number of tickets with an escalation due now.
+    """
+    rules = RuleSet([rule])
+    tickets = (
+        Ticket.objects.exclude(status__in=DONE_STATUSES)
+        .values(*TICKET_VALUES)
+        .iterator(chunk_size=chunk_size)
+    )
+    due, chunk = set(), []
+    for ticket in tickets:
+        chunk.append(ticket)
+        if len(chunk) >= chunk_size:
+            due |= _schedule(rules, chunk)
+            chunk = []
+    due |= _schedule(rules, chunk)
+    _fire_soon(due)
+    return len(due)
+
+
+# ---------------------------------------------------------
+# FIRING
+# ---------------------------------------------------------
+def _apply(rule, ticket):
+    """
+    Applies a rule's actions to a Ticket instance.
+    Returns the fields changed.
+    """
+    changed = []
+    for action, attname in ACTIONS.items():
+        if action in rule.actions and getattr(ticket, attname) != rule.actions[action]:
+            setattr(ticket, attname, rule.actions[action])
+            changed.append(attname)
+    return changed
+
+
+def fire(ticket_ids=None, batch_size=500):
+    """
+    Fires due matches (of the given tickets, or all) whose rule
+    still holds against the current ticket; matches that no longer
+    hold are dropped, not-yet-due ones rescheduled. Matches locked by
+    another run are skipped. Returns the number fired.
+    """
+    rules = get_rules()
+    fired_total = 0
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            due = (
+                EscalationMatch.objects.select_for_update(skip_locked=True)
+                .filter(fired_at__isnull=True, due_at__lte=now)
+            )
+            if ticket_ids is not None:
+                due = due.filter(ticket_id__in=ticket_ids)
+            due = list(due.order_by('due_at', 'id').values_list('id', 'rule_id', 'ticket_id')[:batch_size])
+            if not due:
+                break
+
+            if any(rule_id not in rules.index for _, rule_id, _ in due):
+                # A rule created since this process last compiled
+                rules = get_rules(force=True)
+            tickets = Ticket.objects.in_bulk({ticket_id for _, _, ticket_id in due})
+            fired, dropped, changed = [], [], defaultdict(list)
+            for match_id, rule_id, ticket_id in due:
+                ticket = tickets.get(ticket_id)
+                i = rules.index.get(rule_id)
+                if ticket is None or i is None:
+                    dropped.append(match_id)
+                    continue
+                rule = rules.rules[i]
+                values = {attname: getattr(ticket, attname) for attname in TICKET_VALUES}
+                if not rules.match(values, 1 << i):
+                    dropped.append(match_id)
+                    continue
+                due_at = rules.due_at(rule, values, now)
+                if due_at > now:
+                    EscalationMatch.objects.filter(id=match_id).update(due_at=due_at)
+                    continue
+
+                changed[ticket_id].extend(_apply(rule, ticket))
+                fired.append(match_id)
+
+            for ticket_id, fields in changed.items():
+                if fields:
+                    tickets[ticket_id].save(update_fields=[*set(fields), 'updated_at'])
+            EscalationMatch.objects.filter(id__in=fired).update(fired_at=now)
+            EscalationMatch.objects.filter(id__in=dropped).delete()
+
+        fired_total += len(fired)
+        if len(due) < batch_size:
+            break
+    return fired_total
@@ -0,0 +1,159 @@
+# ---------------------------------------------------------
+# CONDITIONAL GET FOR TICKET ENDPOINTS
+# ---------------------------------------------------------
+# A ticket response changes when the ticket row changes (updated_at)
+# or when activities/attachments are added or removed. One aggregate
+# query over those timestamps and counts yields the ETag, so an
+# unchanged ticket (or list) is answered with 304 before any object
+# is loaded or serialized. Attachment links depend on the user (only
+# viewers get signed ones) and on the signing window
+# (tickets.downloads), so both are part of the tag.
+#
+# Responses also embed category and user details, which carry no
+# modification timestamp: a change to one of the fields they show
+# (or a delete) replaces a token in the shared cache that every tag
+# includes. Other saves, such as logins or password changes, keep it.
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Func, Max, Subquery
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+from .downloads import url_window
+from .models import Attachment, Category, TicketActivity
+
+_RELATED_KEY = 'tickets:etag:related'
+
+# Fields of related rows that ticket responses show (TicketSerializer)
+_SHOWN_FIELDS = {
+    'tickets.Category': ('name', 'description'),
+    settings.AUTH_USER_MODEL: ('username', 'email', 'first_name', 'last_name', 'role'),
+}
+
+
+def _scalar(queryset, column, function):
+    """
+    Uncorrelated scalar subquery: SELECT <function>(column) FROM ...
+    """
+    return Subquery(
+        queryset.order_by()
+        .annotate(value=Func(F(column), function=function))
+        .values('value')[:1]
+    )
+
+
+def _related_token():
+    # A missing (evicted) token is replaced, which only invalidates tags
+    return cache.get_or_set(_RELATED_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def _bump_related():
+    cache.set(_RELATED_KEY, uuid.uuid4().hex, None)
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def _compare_shown_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Flags the instance when a shown field differs from the stored row;
+    new rows are in no response yet.
+    """
+    fields = [f for f in _SHOWN_FIELDS[sender._meta.label] if update_fields is None or f in update_fields]
+    instance._etag_shown_changed = False
+    if raw or instance._state.adding or not fields:
+        return
+    stored = sender._default_manager.filter(pk=instance.pk).values(*fields).first()
+    instance._etag_shown_changed = stored is not None and any(
+        stored[f] != getattr(instance, f) for f in fields
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def _related_saved(sender, instance, **kwargs):
+    if getattr(instance, '_etag_shown_changed', False):
+        _bump_related()
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def _related_deleted(sender, **kwargs):
+    _bump_related()
+
+
+def tickets_etag(queryset, user=None):
+    """
+    Strong ETag for the tickets in `queryset` as rendered by
+    TicketSerializer for `user`, or None if the queryset is empty.
+    """
+    ids = queryset.order_by().values('id')
+    activities = TicketActivity.objects.filter(ticket_id__in=ids)
+    attachments = Attachment.objects.filter(ticket_id__in=ids)
+
+    state = queryset.model.objects.filter(id__in=ids).aggregate(
+        count=Count('id'),
+        updated=Max('updated_at'),
+        activity_count=Max(_scalar(activities, 'id', 'COUNT')),
+        activity_last=Max(_scalar(activities, 'created_at', 'MAX')),
+        attachment_count=Max(_scalar(attachments, 'id', 'COUNT')),
+        attachment_last=Max(_scalar(attachments, 'uploaded_at', 'MAX')),
+    )
+    if not state['count']:
+        return None
+    state['links'] = (getattr(user, 'pk', None), url_window())
+    state['related'] = _related_token()
+
+    digest = hashlib.sha1(repr(sorted(state.items())).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(request, etag):
+    """
+    Returns a 304 response if the request's If-None-Match matches
+    `etag` (weak comparison, so gzip/brotli W/ tags match too), else None.
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header or etag is None:
+        return None
+
+    tags = parse_etags(header)
+    if '*' in tags or etag in (tag.removeprefix('W/') for tag in tags):
+        return Response(status=304, headers={'ETag': etag})
+    return None
+
+
+class TicketETagMixin:
+    """
+    Adds ETag / If-None-Match handling to ticket list and detail views.
+    """
+
+    def list(self, request, *args, **kwargs):
+        etag = tickets_etag(self.filter_queryset(self.get_queryset()), request.user)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        response = super().list(request, *args, **kwargs)
+        if etag is not None:
+            response['ETag'] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        try:
+            etag = tickets_etag(self.get_queryset().filter(**{self.lookup_field: kwargs[lookup]}), request.user)
+        except (ValueError, TypeError):
+            etag = None
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        response = super().retrieve(request, *args, **kwargs)
+        if etag is not None:
+            response['ETag'] = etag
+        return response
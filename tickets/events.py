@@ -0,0 +1,163 @@
+# ---------------------------------------------------------
+# TICKET EVENT LOG
+# ---------------------------------------------------------
+# Every Ticket save is diffed against the values the instance was
+# loaded with; changed tracked fields become a TicketEvent, inserted
+# in the same transaction as the save (a rolled-back transaction or
+# savepoint takes its events with it). Status changes are also
+# mirrored into TicketActivity for the existing history UI; events
+# are queued for webhook delivery (tickets.webhooks) and matched
+# against escalation rules (tickets.escalation) in that transaction
+# too. Only broker messages wait for the commit.
+import contextvars
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from ticketing.db_router import read_from_primary
+
+from .models import Ticket, TicketActivity, TicketEvent
+from . import escalation, latency, webhooks
+
+# Event payload key -> model attribute; every field an escalation
+# condition can test (tickets.escalation.FIELDS) must be tracked, or
+# rules on it are never re-evaluated when it changes
+TRACKED_FIELDS = {
+    'status': 'status',
+    'priority': 'priority',
+    'assigned_to': 'assigned_to_id',
+    'category': 'category_id',
+    'created_by': 'created_by_id',
+    'title': 'title',
+    'description': 'description',
+}
+
+_SNAPSHOT_ATTR = '_tracked_state'
+
+# User responsible for changes made in the current request/task
+_actor = contextvars.ContextVar('ticket_event_actor', default=None)
+
+
+@contextmanager
+def acting_as(user):
+    """
+    Attributes ticket changes made inside the block to `user`.
+    """
+    token = _actor.set(user if user is not None and user.is_authenticated else None)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+def _snapshot(instance):
+    # Deferred fields are absent from __dict__ and are not tracked
+    return {
+        key: instance.__dict__[attname]
+        for key, attname in TRACKED_FIELDS.items()
+        if attname in instance.__dict__
+    }
+
+
+@receiver(post_init, sender=Ticket)
+def _remember_state(sender, instance, **kwargs):
+    setattr(instance, _SNAPSHOT_ATTR, _snapshot(instance) if instance.pk else {})
+
+
+@receiver(post_save, sender=Ticket)
+def _record_changes(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+
+    before = getattr(instance, _SNAPSHOT_ATTR, {})
+    after = _snapshot(instance)
+    setattr(instance, _SNAPSHOT_ATTR, after)
+
+    if created:
+        changes = {key: [None, value] for key, value in after.items()}
+    else:
+        saved = {
+            key for key, attname in TRACKED_FIELDS.items()
+            if update_fields is None
+            or key in update_fields
+            or attname in update_fields
+        }
+        changes = {
+            key: [before[key], value]
+            for key, value in after.items()
+            if key in saved and key in before and before[key] != value
+        }
+        if not changes:
+            return
+
+    actor = _actor.get()
+    record(
+        instance.pk,
+        changes,
+        kind=TicketEvent.CREATED if created else TicketEvent.CHANGED,
+        actor_id=actor.pk if actor is not None else None,
+    )
+
+
+# ---------------------------------------------------------
+# INSERTS
+# ---------------------------------------------------------
+def record(ticket_id, changes, kind=TicketEvent.CHANGED, actor_id=None):
+    """
+    Writes an event in the current transaction, so it commits or rolls
+    back (with its savepoint) together with the change it describes.
+    """
+    write_events([TicketEvent(ticket_id=ticket_id, kind=kind, actor_id=actor_id, changes=changes)])
+
+
+def write_events(events, retries=3):
+    """
+    Assigns per-ticket sequence numbers and inserts events (plus
+    TicketActivity rows for status changes and webhook deliveries) in
+    one statement each, then observes durations and matches escalation
+    rules, all in the caller's transaction (or a new one).
+    Concurrent writers to the same ticket collide on the (ticket, seq)
+    constraint; the batch is then renumbered and retried.
+    """
+    activities = [
+        TicketActivity(
+            ticket_id=event.ticket_id,
+            actor_id=event.actor_id,
+            old_status=event.changes['status'][0] or '',
+            new_status=event.changes['status'][1],
+        )
+        for event in events
+        if event.kind == TicketEvent.CHANGED and 'status' in event.changes
+    ]
+
+    with transaction.atomic():
+        for attempt in range(retries):
+            with read_from_primary():
+                last = dict(
+                    TicketEvent.objects.filter(ticket_id__in={e.ticket_id for e in events})
+                    .values('ticket_id')
+                    .annotate(last=Max('seq'))
+                    .values_list('ticket_id', 'last')
+                )
+            for event in events:
+                last[event.ticket_id] = last.get(event.ticket_id, 0) + 1
+                event.seq = last[event.ticket_id]
+
+            try:
+                with transaction.atomic():
+                    TicketEvent.objects.bulk_create(events)
+                    TicketActivity.objects.bulk_create(activities)
+                    webhooks.enqueue(events)
+            except IntegrityError:
+                if attempt == retries - 1:
+                    raise
+            else:
+                break
+
+        # bulk_create skips post_save, so durations are observed here
+        latency.observe(activities)
+        # Firing is queued only once the transaction commits
+        escalation.evaluate(events)
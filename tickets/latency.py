@@ -0,0 +1,211 @@
+# ---------------------------------------------------------
+# RESOLUTION AND FIRST-RESPONSE PERCENTILES
+# ---------------------------------------------------------
+# As TicketActivity rows are written, two durations are observed:
+# - first response: creation -> first activity by someone other than
+#   the creator (claimed once via Ticket.first_response_at)
+# - resolution: creation -> each transition into resolved/closed
+# Each duration is added to the day's LatencySketch rows for the
+# ticket's agent, category, priority and for all tickets. Percentiles
+# over a date range merge those daily sketches.
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import LatencySketch, Ticket, TicketActivity
+from .sketch import DDSketch
+
+RESOLVED_STATUSES = ('resolved', 'closed')
+
+DIMENSIONS = ('all', 'agent', 'category', 'priority')
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _keys(ticket):
+    """
+    (dimension, key) rows a ticket's durations are counted under.
+    """
+    keys = [('all', ''), ('priority', ticket['priority'])]
+    if ticket['assigned_to_id'] is not None:
+        keys.append(('agent', str(ticket['assigned_to_id'])))
+    if ticket['category_id'] is not None:
+        keys.append(('category', str(ticket['category_id'])))
+    return keys
+
+
+def _is_resolution(activity):
+    return bool(
+        activity.old_status
+        and activity.old_status not in RESOLVED_STATUSES
+        and activity.new_status in RESOLVED_STATUSES
+    )
+
+
+def observe(activities):
+    """
+    Adds the durations completed by newly written activities.
+    """
+    activities = [a for a in activities if a.actor_id is not None or _is_resolution(a)]
+    if not activities:
+        return
+
+    tickets = {
+        row['id']: row
+        for row in Ticket.objects.filter(id__in={a.ticket_id for a in activities}).values(
+            'id', 'created_at', 'created_by_id', 'assigned_to_id',
+            'category_id', 'priority', 'first_response_at'
+        )
+    }
+
+    observations = []
+    for activity in sorted(activities, key=lambda a: a.created_at):
+        ticket = tickets.get(activity.ticket_id)
+        if ticket is None:
+            continue
+
+        if (
+            activity.actor_id is not None
+            and activity.actor_id != ticket['created_by_id']
+            and ticket['first_response_at'] is None
+        ):
+            # Conditional update: only the first responder's activity counts
+            claimed = Ticket.objects.filter(
+                id=ticket['id'], first_response_at__isnull=True
+            ).update(first_response_at=activity.created_at)
+            ticket['first_response_at'] = activity.created_at
+            if claimed:
+                observations.append((LatencySketch.FIRST_RESPONSE, ticket, activity.created_at))
+
+        if _is_resolution(activity):
+            observations.append((LatencySketch.RESOLUTION, ticket, activity.created_at))
+
+    add(observations)
+
+
+def _group(observations):
+    """
+    {(metric, dimension, day, key): DDSketch} for
+    (metric, ticket values, finished at) observations.
+    """
+    sketches = defaultdict(DDSketch)
+    for metric, ticket, finished_at in observations:
+        seconds = (finished_at - ticket['created_at']).total_seconds()
+        day = timezone.localdate(finished_at)
+        for dimension, key in _keys(ticket):
+            sketches[(metric, dimension, day, key)].add(max(seconds, 0))
+    return sketches
+
+
+def add(observations):
+    """
+    Merges observations into the stored daily sketches. Rows are
+    locked in key order, so concurrent writers never deadlock.
+    """
+    sketches = _group(observations)
+    if not sketches:
+        return
+
+    with transaction.atomic():
+        LatencySketch.objects.bulk_create(
+            [
+                LatencySketch(metric=metric, dimension=dimension, day=day, key=key)
+                for metric, dimension, day, key in sketches
+            ],
+            ignore_conflicts=True
+        )
+        for metric, dimension, day, key in sorted(sketches):
+            row = LatencySketch.objects.select_for_update().get(
+                metric=metric, dimension=dimension, day=day, key=key
+            )
+            merged = DDSketch.from_dict(row.sketch).merge(sketches[(metric, dimension, day, key)])
+            row.sketch, row.count = merged.to_dict(), merged.count
+            row.save(update_fields=['sketch', 'count'])
+
+
+@receiver(post_save, sender=TicketActivity)
+def _observe_on_save(sender, instance, created, raw=False, **kwargs):
+    # bulk_create()d activities are passed to observe() by their writers
+    if created and not raw:
+        observe([instance])
+
+
+def percentiles(metric, dimension='all', since=None, until=None, quantiles=QUANTILES):
+    """
+    {key: {'count': n, 'p50': seconds, ...}} over days since..until
+    (inclusive), merged from the daily sketches.
+    """
+    rows = LatencySketch.objects.filter(metric=metric, dimension=dimension)
+    if since is not None:
+        rows = rows.filter(day__gte=since)
+    if until is not None:
+        rows = rows.filter(day__lte=until)
+
+    merged = {}
+    for key, data in rows.values_list('key', 'sketch').iterator():
+        sketch = DDSketch.from_dict(data)
+        if key in merged:
+            merged[key].merge(sketch)
+        else:
+            merged[key] = sketch
+
+    return {
+        key: {
+            'count': sketch.count,
+            **{f'p{round(q * 100):g}': sketch.quantile(q) for q in quantiles},
+        }
+        for key, sketch in merged.items()
+    }
+
+
+def rebuild():
+    """
+    Recomputes every sketch and Ticket.first_response_at from the
+    activity history. Returns the number of observations.
+    """
+    tickets = {
+        row['id']: row
+        for row in Ticket.objects.values(
+            'id', 'created_at', 'created_by_id', 'assigned_to_id', 'category_id', 'priority'
+        ).iterator(chunk_size=5000)
+    }
+    activities = (
+        TicketActivity.objects.order_by('ticket_id', 'created_at', 'id')
+        .only('ticket_id', 'actor_id', 'old_status', 'new_status', 'created_at')
+        .iterator(chunk_size=5000)
+    )
+
+    observations, first_responses = [], {}
+    for activity in activities:
+        ticket = tickets.get(activity.ticket_id)
+        if ticket is None:
+            continue
+        if (
+            activity.actor_id is not None
+            and activity.actor_id != ticket['created_by_id']
+            and ticket['id'] not in first_responses
+        ):
+            first_responses[ticket['id']] = activity.created_at
+            observations.append((LatencySketch.FIRST_RESPONSE, ticket, activity.created_at))
+        if _is_resolution(activity):
+            observations.append((LatencySketch.RESOLUTION, ticket, activity.created_at))
+
+    with transaction.atomic():
+        LatencySketch.objects.all().delete()
+        Ticket.objects.filter(first_response_at__isnull=False).update(first_response_at=None)
+        Ticket.objects.bulk_update(
+            [Ticket(id=pk, first_response_at=at) for pk, at in first_responses.items()],
+            ['first_response_at'],
+            batch_size=1000
+        )
+        LatencySketch.objects.bulk_create([
+            LatencySketch(
+                metric=metric, dimension=dimension, day=day, key=key,
+                count=sketch.count, sketch=sketch.to_dict()
+            )
+            for (metric, dimension, day, key), sketch in _group(observations).items()
+        ], batch_size=1000)
+    return len(observations)
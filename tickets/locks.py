@@ -0,0 +1,167 @@
+# ---------------------------------------------------------
+# TASK LEASES (SINGLETON / DEDUPLICATED TASKS)
+# ---------------------------------------------------------
+# A lease is a lock with an owner (the Celery task id) and an expiry,
+# so a crashed worker can never hold it forever. Leases live in Redis
+# (SET NX EX) when the shared cache is Redis; otherwise, or if Redis
+# is unreachable, in the TaskLease table.
+import functools
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ticketing.shared_cache import redis_client
+
+from .models import TaskLease
+
+logger = logging.getLogger(__name__)
+
+# Deletes the key only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _lease_key(key):
+    return cache.make_key(f'lease:{key}')
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# ---------------------------------------------------------
+# DATABASE FALLBACK
+# ---------------------------------------------------------
+def _db_acquire(key, owner, ttl):
+    now = timezone.now()
+    expires_at = now + timezone.timedelta(seconds=ttl)
+    try:
+        with transaction.atomic():
+            TaskLease.objects.create(key=key, owner=owner, expires_at=expires_at)
+        return True
+    except IntegrityError:
+        # Re-entrant for the owner; otherwise take over an expired lease
+        return bool(
+            TaskLease.objects.filter(key=key)
+            .filter(Q(owner=owner) | Q(expires_at__lt=now))
+            .update(owner=owner, expires_at=expires_at)
+        )
+
+
+def _db_holder(key):
+    return (
+        TaskLease.objects.filter(key=key, expires_at__gte=timezone.now())
+        .values_list('owner', flat=True)
+        .first()
+    )
+
+
+def _db_release(key, owner):
+    TaskLease.objects.filter(key=key, owner=owner).delete()
+
+
+# ---------------------------------------------------------
+# PUBLIC API
+# ---------------------------------------------------------
+def acquire(key, owner, ttl=None):
+    """
+    Takes the lease on `key` for `owner` for `ttl` seconds.
+    Returns True if `owner` now holds it (re-acquiring refreshes it).
+    """
+    ttl = ttl or settings.TASK_LEASE_SECONDS
+    client = redis_client()
+    if client is not None:
+        try:
+            name = _lease_key(key)
+            if client.set(name, owner, nx=True, ex=ttl):
+                return True
+            if _decode(client.get(name)) == owner:
+                client.expire(name, ttl)
+                return True
+            return False
+        except Exception:
+            logger.warning('redis lease failed, using database (%s)', key, exc_info=True)
+    return _db_acquire(key, owner, ttl)
+
+
+def holder(key):
+    """
+    Returns the owner currently holding `key`, or None.
+    """
+    client = redis_client()
+    if client is not None:
+        try:
+            return _decode(client.get(_lease_key(key)))
+        except Exception:
+            logger.warning('redis lease lookup failed, using database (%s)', key, exc_info=True)
+    return _db_holder(key)
+
+
+def release(key, owner):
+    """
+    Releases `key` if `owner` still holds it.
+    """
+    client = redis_client()
+    if client is not None:
+        try:
+            client.eval(_RELEASE_SCRIPT, 1, _lease_key(key), owner)
+            return
+        except Exception:
+            logger.warning('redis lease release failed, using database (%s)', key, exc_info=True)
+    _db_release(key, owner)
+
+
+def singleton(key, ttl=None):
+    """
+    Task decorator (below @shared_task): at most one run per `key`.
+    A run finding the lease held by another task id returns without
+    doing anything. The lease is released when the run finishes.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            from celery import current_task
+
+            request_id = current_task.request.id if current_task else None
+            owner = request_id or uuid.uuid4().hex
+            if not acquire(key, owner, ttl):
+                return f'skipped: {key} already running ({holder(key)})'
+            try:
+                return func(*args, **kwargs)
+            finally:
+                release(key, owner)
+        return wrapper
+    return decorator
+
+
+def run_once(task, key, ttl=None, **options):
+    """
+    Queues `task` unless a run for `key` is queued or in progress.
+    The lease is taken at enqueue time under the new task id, so
+    concurrent triggers coalesce onto one run.
+    Returns (task id, started).
+    """
+    task_id = uuid.uuid4().hex
+    if not acquire(key, task_id, ttl):
+        current = holder(key)
+        if current is not None:
+            return current, False
+        # Released between the two calls: try once more
+        if not acquire(key, task_id, ttl):
+            return holder(key), False
+
+    try:
+        task.apply_async(task_id=task_id, **options)
+    except Exception:
+        release(key, task_id)
+        raise
+    return task_id, True
@@ -0,0 +1,180 @@
+# ---------------------------------------------------------
+# API BENCHMARK SUITE
+# ---------------------------------------------------------
+# Usage:
+#   python manage.py bench_api --sizes 10000,100000,1000000 \
+#       --output bench_api.json --compare previous.json
+#
+# For each dataset size the ticket table is topped up with
+# seed_tickets, then every scenario is driven through the Django
+# test client (full middleware + DRF stack) and throughput,
+# p50/p95/p99 latency and SQL query counts are recorded.
+#
+# Run it against a dedicated database - it writes data. Requests
+# carry the same JWT claims as a login (role included) and bypass the
+# rate limiter unless --rate-limit is given, so the create scenario
+# measures the API rather than 429 responses. Celery tasks run eagerly
+# (in-process, emails to the locmem backend), so no broker is needed.
+# List scenarios fetch one page (?limit=) and run at every size.
+import random
+import time
+from contextlib import ExitStack
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ticketing.celery import app
+from tickets.benchmarks import compare_reports, summarize, write_report
+from tickets.models import Category, Ticket
+from users.models import User
+from users.views import CustomTokenObtainPairSerializer
+
+
+# Rows per page in the list scenarios
+PAGE_SIZE = 50
+
+# name, method, path
+SCENARIOS = [
+    ('viewset_list', 'get', f'/api/tickets/tickets/?limit={PAGE_SIZE}'),
+    ('viewset_detail', 'get', '/api/tickets/tickets/{id}/'),
+    ('viewset_create', 'post', '/api/tickets/tickets/'),
+    ('list_filtered', 'get', f'/api/tickets/tickets/list/?status=open&priority=high&limit={PAGE_SIZE}'),
+    ('list_search', 'get', f'/api/tickets/tickets/list/?search=payment&limit={PAGE_SIZE}'),
+    ('analytics_volume', 'get', '/api/tickets/tickets/analytics/?action=volume_by_date'),
+    ('analytics_sla', 'get', '/api/tickets/tickets/analytics/?action=sla_breach_rate'),
+    ('analytics_agents', 'get', '/api/tickets/tickets/analytics/?action=agent_performance'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the ticket API at several dataset sizes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000',
+                            help='Comma separated ticket counts, e.g. 10000,100000')
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Requests per scenario')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--scenarios', default='',
+                            help='Comma separated subset of scenario names')
+        parser.add_argument('--no-seed', action='store_true',
+                            help='Use the data already in the database')
+        parser.add_argument('--output', default='bench_api.json')
+        parser.add_argument('--compare', default=None,
+                            help='Previous report to diff against')
+        parser.add_argument('--rate-limit', action='store_true',
+                            help='Keep the rate limiter on (writes will be throttled)')
+
+    def handle(self, *args, **opts):
+        with ExitStack() as stack:
+            if not opts['rate_limit']:
+                stack.enter_context(override_settings(RATE_LIMIT_ENABLED=False))
+            stack.enter_context(override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'))
+            eager = app.conf.task_always_eager
+            app.conf.task_always_eager = True
+            stack.callback(setattr, app.conf, 'task_always_eager', eager)
+            return self._run(opts)
+
+    def _run(self, opts):
+        sizes = [int(s) for s in opts['sizes'].split(',') if s.strip()]
+        wanted = {s for s in opts['scenarios'].split(',') if s}
+        scenarios = [s for s in SCENARIOS if not wanted or s[0] in wanted]
+
+        client = self._authenticated_client()
+        results = {}
+
+        for size in sizes:
+            if not opts['no_seed']:
+                missing = size - Ticket.objects.count()
+                if missing > 0:
+                    self.stdout.write(f'Seeding {missing} tickets...')
+                    call_command('seed_tickets', tickets=missing, stdout=self.stdout)
+
+            total = Ticket.objects.count()
+            self.stdout.write(self.style.MIGRATE_HEADING(f'Dataset: {total} tickets'))
+
+            for name, method, path in scenarios:
+                key = f'{name}@{size}'
+                results[key] = self._run_scenario(
+                    client, method, path, opts['requests'], opts['warmup']
+                )
+                r = results[key]
+                self.stdout.write(
+                    f'  {name:<20} {r["throughput_per_sec"]:>9.1f} req/s  '
+                    f'p50 {r["p50_ms"]:>8.2f}ms  p95 {r["p95_ms"]:>8.2f}ms  '
+                    f'p99 {r["p99_ms"]:>8.2f}ms  queries {r["queries_mean"]:.1f}'
+                )
+
+        write_report(opts['output'], 'api', results)
+        self.stdout.write(self.style.SUCCESS(f'Report written to {opts["output"]}'))
+
+        if opts['compare']:
+            for key, metric, old, new, change in compare_reports(opts['compare'], results):
+                self.stdout.write(f'  {key:<32} {metric:<20} {old:>10} -> {new:>10} ({change:+.1f}%)')
+
+    def _authenticated_client(self):
+        user, created = User.objects.get_or_create(
+            username='bench_admin',
+            defaults={'email': 'bench_admin@example.com', 'role': 'admin'}
+        )
+        if created:
+            user.set_password('password')
+            user.save()
+
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def _request_args(self, method, path):
+        if '{id}' in path:
+            # Random ticket so caches don't flatter the detail view
+            last = Ticket.objects.order_by('-id').values_list('id', flat=True).first() or 1
+            ticket_id = (
+                Ticket.objects.filter(id__gte=random.randint(1, last))
+                .order_by('id').values_list('id', flat=True).first() or last
+            )
+            path = path.format(id=ticket_id)
+
+        if method == 'post':
+            category = Category.objects.order_by('id').first()
+            return path, {
+                'title': 'Benchmark ticket server down',
+                'description': 'Synthetic ticket created by bench_api.',
+                'priority': 'low',
+                'category_id': category.id if category else '',
+            }
+        return path, None
+
+    def _run_scenario(self, client, method, path, n_requests, warmup):
+        call = getattr(client, method)
+
+        for _ in range(warmup):
+            target, data = self._request_args(method, path)
+            call(target, data) if data else call(target)
+
+        latencies, query_counts, statuses = [], [], {}
+        started = time.perf_counter()
+        for _ in range(n_requests):
+            target, data = self._request_args(method, path)
+            with ExitStack() as stack:
+                # Primary and replicas alike
+                captured = [
+                    stack.enter_context(CaptureQueriesContext(connections[alias]))
+                    for alias in connections
+                ]
+                t0 = time.perf_counter()
+                response = call(target, data) if data else call(target)
+                latencies.append(time.perf_counter() - t0)
+            query_counts.append(sum(len(ctx.captured_queries) for ctx in captured))
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+
+        return summarize(
+            latencies,
+            total_seconds=elapsed,
+            queries_mean=round(sum(query_counts) / len(query_counts), 2),
+            queries_max=max(query_counts),
+            status_codes={str(k): v for k, v in statuses.items()},
+        )
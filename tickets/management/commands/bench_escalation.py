@@ -0,0 +1,137 @@
+# ---------------------------------------------------------
+# ESCALATION RULE MATCHING BENCHMARK
+# ---------------------------------------------------------
+# Usage:
+#   python manage.py bench_escalation --rules 1000,5000 --updates 2000 \
+#       [--output bench_escalation.json] [--compare previous.json]
+#
+# Generates random rules (in memory, nothing is saved) over the
+# ticket fields, compiles them and matches sampled tickets as if one
+# tracked field had changed, which is what every ticket update does.
+# The same updates are checked rule by rule (the uncompiled baseline)
+# and any disagreement between the two is reported.
+import random
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from tickets.benchmarks import compare_reports, summarize, write_report
+from tickets.escalation import FIELDS, TICKET_VALUES, RuleSet
+from tickets.events import TRACKED_FIELDS
+from tickets.models import Category, EscalationRule, Ticket
+from users.models import User
+
+WORDS = ('outage', 'refund', 'invoice', 'password', 'vpn', 'slow', 'crash', 'urgent')
+
+
+def _random_rule(rule_id, rng, categories, agents):
+    choices = {
+        'status': [value for value, _ in Ticket.STATUS_CHOICES],
+        'priority': [value for value, _ in Ticket.PRIORITY_CHOICES],
+        'category': categories,
+        'assigned_to': agents,
+    }
+    conditions = []
+    for field in rng.sample(list(choices), rng.randint(1, 3)):
+        op = rng.choice(('eq', 'eq', 'eq', 'ne', 'in', 'not_in'))
+        if op in ('in', 'not_in'):
+            value = rng.sample(choices[field], min(2, len(choices[field])))
+        else:
+            value = rng.choice(choices[field])
+        conditions.append({'field': field, 'op': op, 'value': value})
+    if rng.random() < 0.2:
+        conditions.append({'field': 'title', 'op': 'contains', 'value': rng.choice(WORDS)})
+    return SimpleNamespace(
+        id=rule_id,
+        conditions=conditions,
+        time_field=rng.choice((EscalationRule.CREATED_AT, EscalationRule.UPDATED_AT)),
+        after_minutes=rng.choice((0, 0, 60, 120)),
+    )
+
+
+def _naive_match(rule, ticket):
+    for condition in rule.conditions:
+        op, value = condition['op'], condition['value']
+        actual = ticket[FIELDS[condition['field']]]
+        if op == 'eq' and actual != value:
+            return False
+        if op == 'ne' and actual == value:
+            return False
+        if op == 'in' and actual not in value:
+            return False
+        if op == 'not_in' and actual in value:
+            return False
+        if op == 'contains' and value.lower() not in (actual or '').lower():
+            return False
+    return True
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks compiled escalation rule matching against rule-by-rule evaluation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rules', default='100,1000,5000',
+                            help='Comma-separated rule counts')
+        parser.add_argument('--updates', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', default='bench_escalation.json')
+        parser.add_argument('--compare', default=None)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts['seed'])
+        categories = list(Category.objects.values_list('id', flat=True)) or [1]
+        agents = list(User.objects.filter(role='agent').values_list('id', flat=True)[:50]) or [1]
+        tickets = list(Ticket.objects.order_by('?').values(*TICKET_VALUES)[:opts['updates']])
+        if not tickets:
+            self.stderr.write('No tickets to match; run seed_tickets first.')
+            return
+        updates = [(rng.choice(tickets), [rng.choice(list(TRACKED_FIELDS))]) for _ in range(opts['updates'])]
+
+        results = {}
+        for count in [int(n) for n in opts['rules'].split(',')]:
+            rules = [_random_rule(i + 1, rng, categories, agents) for i in range(count)]
+
+            started = time.perf_counter()
+            compiled = RuleSet(rules)
+            compile_seconds = time.perf_counter() - started
+
+            compiled_latencies, naive_latencies, mismatches, matched = [], [], 0, 0
+            for ticket, changed in updates:
+                t0 = time.perf_counter()
+                found = compiled.matching(ticket, compiled.candidates(changed))
+                compiled_latencies.append(time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                touched = [
+                    rule for rule in rules
+                    if any(c['field'] in changed for c in rule.conditions)
+                    or (rule.after_minutes and rule.time_field == EscalationRule.UPDATED_AT)
+                ]
+                expected = [rule for rule in touched if _naive_match(rule, ticket)]
+                naive_latencies.append(time.perf_counter() - t0)
+
+                matched += len(found)
+                mismatches += [r.id for r in found] != [r.id for r in expected]
+
+            results[f'compiled_{count}'] = summarize(
+                compiled_latencies,
+                compile_ms=round(compile_seconds * 1000, 1),
+                matches_per_update=round(matched / len(updates), 2),
+                mismatches=mismatches,
+            )
+            results[f'naive_{count}'] = summarize(naive_latencies)
+
+        for key, summary in results.items():
+            self.stdout.write(
+                f"{key:<16} p50 {summary['p50_ms']:>8} ms  p99 {summary['p99_ms']:>8} ms"
+                + (f"  compile {summary['compile_ms']} ms, {summary['matches_per_update']} matches/update, "
+                   f"{summary['mismatches']} mismatches" if 'compile_ms' in summary else '')
+            )
+
+        write_report(opts['output'], 'escalation', results)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {opts['output']}"))
+
+        if opts['compare']:
+            for key, metric, old, new, change in compare_reports(opts['compare'], results):
+                self.stdout.write(f'{key:<16} {metric:<20} {old:>12} -> {new:>12} ({change:+.1f}%)')
@@ -0,0 +1,175 @@
+# ---------------------------------------------------------
+# ML MICROBENCHMARK SUITE
+# ---------------------------------------------------------
+# Usage:
+#   python manage.py bench_ml --corpus-sizes 100,1000,10000 \
+#       --output bench_ml.json --compare previous.json
+#
+# Measures latency, throughput and peak memory (tracemalloc) of
+# predict_priority and TFIDFUrgency.fit_on_texts/score_texts for
+# single and batch scoring across text lengths and corpus sizes,
+# plus accuracy on a labeled fixture set so that speedups can be
+# checked for quality regressions as well.
+import json
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from tickets.benchmarks import compare_reports, summarize, write_report
+from tickets.management.commands.seed_tickets import DETAILS, SUBJECTS, SYMPTOMS
+from tickets.ml.model import predict_priority
+from tickets.ml.tfidf_model import TFIDFUrgency, score_to_priority
+
+# Labeled tickets used for the accuracy check
+FIXTURE_PATH = Path(__file__).resolve().parents[2] / 'ml' / 'fixtures' / 'labeled_tickets.json'
+
+PRIORITIES = ('low', 'medium', 'high')
+
+
+def _measure(fn, repeat):
+    """
+    Runs fn `repeat` times; returns (latencies, total seconds, peak bytes).
+    Peak memory comes from one extra traced run so that tracemalloc
+    overhead does not distort the timings.
+    """
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return latencies, total, peak
+
+
+def _accuracy(expected, predicted):
+    """
+    Overall accuracy plus per-class recall.
+    """
+    correct = sum(e == p for e, p in zip(expected, predicted))
+    recall = {}
+    for label in PRIORITIES:
+        idx = [i for i, e in enumerate(expected) if e == label]
+        if idx:
+            recall[f'recall_{label}'] = round(
+                sum(predicted[i] == label for i in idx) / len(idx), 3
+            )
+    return {'accuracy': round(correct / len(expected), 3), 'samples': len(expected), **recall}
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks predict_priority and TFIDFUrgency (speed, memory, accuracy).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus-sizes', default='100,1000,10000')
+        parser.add_argument('--text-lengths', default='80,800,8000',
+                            help='Characters per text for single-text latency')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', default='bench_ml.json')
+        parser.add_argument('--compare', default=None)
+
+    def handle(self, *args, **opts):
+        self.rng = random.Random(opts['seed'])
+        repeat = opts['repeat']
+        results = {}
+
+        # -----------------------------
+        # Single-text latency by length
+        # -----------------------------
+        for length in (int(x) for x in opts['text_lengths'].split(',')):
+            text = self._text(length)
+            results[f'predict_priority.single@{length}c'] = self._summary(
+                lambda: predict_priority(text), repeat * 10
+            )
+
+            model = TFIDFUrgency()
+            model.fit_on_texts(self._corpus(1000))
+            results[f'tfidf.score_single@{length}c'] = self._summary(
+                lambda: model.score_texts([text]), repeat
+            )
+
+        # -----------------------------
+        # Fit / batch scoring by corpus size
+        # -----------------------------
+        for size in (int(x) for x in opts['corpus_sizes'].split(',')):
+            corpus = self._corpus(size)
+
+            results[f'predict_priority.batch@{size}'] = self._summary(
+                lambda: [predict_priority(t) for t in corpus],
+                max(repeat // 5, 1), items=size
+            )
+
+            results[f'tfidf.fit@{size}'] = self._summary(
+                lambda: TFIDFUrgency().fit_on_texts(corpus),
+                max(repeat // 5, 1), items=size
+            )
+
+            model = TFIDFUrgency()
+            model.fit_on_texts(corpus)
+            results[f'tfidf.score_batch@{size}'] = self._summary(
+                lambda: model.score_texts(corpus),
+                max(repeat // 5, 1), items=size
+            )
+
+        # -----------------------------
+        # Accuracy on labeled fixtures
+        # -----------------------------
+        results.update(self._quality())
+
+        for key, value in results.items():
+            self.stdout.write(f'  {key:<36} {json.dumps(value)}')
+
+        write_report(opts['output'], 'ml', results)
+        self.stdout.write(self.style.SUCCESS(f'Report written to {opts["output"]}'))
+
+        if opts['compare']:
+            for key, metric, old, new, change in compare_reports(opts['compare'], results):
+                self.stdout.write(f'  {key:<36} {metric:<20} {old:>10} -> {new:>10} ({change:+.1f}%)')
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    def _summary(self, fn, repeat, items=1):
+        latencies, total, peak = _measure(fn, repeat)
+        summary = summarize(latencies, total_seconds=total, peak_memory_kb=round(peak / 1024, 1))
+        if items > 1:
+            summary['items_per_sec'] = round(items * repeat / total, 1) if total else 0.0
+        return summary
+
+    def _text(self, length):
+        subject = self.rng.choice(SUBJECTS)
+        symptom, _ = self.rng.choice(SYMPTOMS)
+        text = f'{subject} {symptom}.'
+        while len(text) < length:
+            text += ' ' + self.rng.choice(DETAILS)
+        return text[:length]
+
+    def _corpus(self, size):
+        return [self._text(self.rng.randint(60, 400)) for _ in range(size)]
+
+    def _quality(self):
+        with open(FIXTURE_PATH) as fh:
+            rows = json.load(fh)
+
+        texts = [f"{r['title']} {r['description']}" for r in rows]
+        expected = [r['priority'] for r in rows]
+
+        rule_based = [predict_priority(t)[0] for t in texts]
+
+        model = TFIDFUrgency()
+        model.fit_on_texts(texts)
+        tfidf = [score_to_priority(s) for s in model.score_texts(texts)]
+
+        return {
+            'quality.predict_priority': _accuracy(expected, rule_based),
+            'quality.tfidf': _accuracy(expected, tfidf),
+        }
@@ -0,0 +1,180 @@
+# ---------------------------------------------------------
+# WEBHOOK DELIVERY BENCHMARK
+# ---------------------------------------------------------
+# Usage:
+#   python manage.py bench_webhooks --deliveries 20000 --endpoints 10 \
+#       [--latency-ms 20] [--failure-rate 0.05] \
+#       [--output bench_webhooks.json] [--compare previous.json]
+#
+# Starts a local stub HTTP server process (keep-alive, fixed response latency,
+# optional failure rate, HMAC verification), points temporary
+# endpoints at it, queues deliveries and drains them with the asyncio
+# worker. Reports deliveries/second, queue-to-delivery latency, peak
+# concurrent requests at the stub and signature failures. The
+# temporary endpoints and their deliveries are removed afterwards.
+import asyncio
+import hmac
+import multiprocessing
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets.benchmarks import compare_reports, summarize, write_report
+from tickets.models import WebhookDelivery, WebhookEndpoint
+from tickets.webhook_worker import WebhookWorker
+from tickets.webhooks import TICKET_CREATED, new_secret, sign
+
+
+class StubServer:
+    """
+    Minimal asyncio HTTP/1.1 receiver in a separate process, so it
+    does not compete with the worker for the GIL. Counters are shared.
+    """
+
+    def __init__(self, secrets_by_path, latency=0.0, failure_rate=0.0):
+        self.secrets_by_path = secrets_by_path
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._port = multiprocessing.Value('i', 0)
+        self._received = multiprocessing.Value('i', 0)
+        self._bad_signatures = multiprocessing.Value('i', 0)
+        self._peak = multiprocessing.Value('i', 0)
+        self._ready = multiprocessing.Event()
+        self._process = None
+
+    port = property(lambda self: self._port.value)
+    received = property(lambda self: self._received.value)
+    bad_signatures = property(lambda self: self._bad_signatures.value)
+    peak = property(lambda self: self._peak.value)
+
+    def _serve(self):
+        active = 0
+
+        async def handle(reader, writer):
+            nonlocal active
+            try:
+                while True:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                    lines = head.decode('latin-1').split('\r\n')
+                    path = lines[0].split(' ')[1]
+                    headers = {
+                        name.strip().lower(): value.strip()
+                        for name, _, value in (line.partition(':') for line in lines[1:] if line)
+                    }
+                    body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                    active += 1
+                    self._received.value += 1
+                    self._peak.value = max(self._peak.value, active)
+                    expected = sign(self.secrets_by_path.get(path, ''), headers.get('x-webhook-timestamp'), body)
+                    if not hmac.compare_digest(expected, headers.get('x-webhook-signature', '')):
+                        self._bad_signatures.value += 1
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    active -= 1
+
+                    status = b'500 Internal Server Error' if random.random() < self.failure_rate else b'200 OK'
+                    writer.write(b'HTTP/1.1 ' + status + b'\r\nContent-Length: 0\r\nConnection: keep-alive\r\n\r\n')
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+
+        async def main():
+            server = await asyncio.start_server(handle, '127.0.0.1', 0, backlog=4096)
+            self._port.value = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            async with server:
+                await server.serve_forever()
+
+        asyncio.run(main())
+
+    def start(self):
+        self._process = multiprocessing.Process(target=self._serve, daemon=True)
+        self._process.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        self._process.terminate()
+        self._process.join()
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks webhook delivery throughput against a local stub server.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--deliveries', type=int, default=20000)
+        parser.add_argument('--endpoints', type=int, default=10)
+        parser.add_argument('--latency-ms', type=float, default=20.0,
+                            help='Stub response latency')
+        parser.add_argument('--failure-rate', type=float, default=0.0,
+                            help='Share of requests the stub answers with 500')
+        parser.add_argument('--concurrency', type=int, default=None)
+        parser.add_argument('--output', default='bench_webhooks.json')
+        parser.add_argument('--compare', default=None)
+
+    def handle(self, *args, **opts):
+        secrets_by_path = {f'/hook/{i}': new_secret() for i in range(opts['endpoints'])}
+        stub = StubServer(secrets_by_path, opts['latency_ms'] / 1000, opts['failure_rate']).start()
+
+        endpoints = WebhookEndpoint.objects.bulk_create([
+            WebhookEndpoint(url=f'http://127.0.0.1:{stub.port}{path}', secret=secret, events=[TICKET_CREATED])
+            for path, secret in secrets_by_path.items()
+        ])
+        try:
+            now = timezone.now()
+            WebhookDelivery.objects.bulk_create([
+                WebhookDelivery(
+                    endpoint=endpoints[i % len(endpoints)],
+                    event=TICKET_CREATED,
+                    payload={'event': TICKET_CREATED, 'ticket': {'id': i, 'title': f'Bench ticket {i}'}},
+                    next_attempt_at=now,
+                )
+                for i in range(opts['deliveries'])
+            ], batch_size=2000)
+
+            worker = WebhookWorker(concurrency=opts['concurrency'])
+            started = time.perf_counter()
+            sent = asyncio.run(worker.run(drain=True))
+            elapsed = time.perf_counter() - started
+
+            deliveries = WebhookDelivery.objects.filter(endpoint__in=endpoints)
+            latencies = [
+                (delivered_at - created_at).total_seconds()
+                for created_at, delivered_at in deliveries.filter(status=WebhookDelivery.DELIVERED)
+                .values_list('created_at', 'delivered_at')
+            ]
+            results = {
+                'delivery': summarize(
+                    latencies,
+                    total_seconds=elapsed,
+                    requests=sent,
+                    requests_per_sec=round(sent / elapsed, 1) if elapsed else 0.0,
+                    pending=deliveries.filter(status=WebhookDelivery.PENDING).count(),
+                    failed=deliveries.filter(status=WebhookDelivery.FAILED).count(),
+                    peak_concurrent=stub.peak,
+                    bad_signatures=stub.bad_signatures,
+                ),
+            }
+        finally:
+            stub.stop()
+            WebhookEndpoint.objects.filter(id__in=[e.id for e in endpoints]).delete()
+
+        summary = results['delivery']
+        self.stdout.write(
+            f"{summary['calls']} delivered, {summary['pending']} pending, {summary['failed']} failed "
+            f"in {elapsed:.2f}s: {summary['throughput_per_sec']}/s, "
+            f"queue->delivered p50 {summary['p50_ms']} ms p99 {summary['p99_ms']} ms, "
+            f"peak {summary['peak_concurrent']} in flight, {summary['bad_signatures']} bad signatures"
+        )
+
+        write_report(opts['output'], 'webhooks', results)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {opts['output']}"))
+
+        if opts['compare']:
+            for key, metric, old, new, change in compare_reports(opts['compare'], results):
+                self.stdout.write(f'{key:<12} {metric:<20} {old:>12} -> {new:>12} ({change:+.1f}%)')
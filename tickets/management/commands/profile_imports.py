@@ -0,0 +1,86 @@
+# ---------------------------------------------------------
+# WEB WORKER IMPORT PROFILE
+# ---------------------------------------------------------
+# Usage:
+#   python manage.py profile_imports [--module ticketing.urls] \
+#       [--top 20] [--budget-ms 600] [--forbid sklearn,scipy,pandas]
+#
+# Imports what a web worker loads at boot (Django setup plus the URL
+# conf, i.e. every view) in a fresh interpreter under
+# `python -X importtime`, then prints the slowest modules. Fails when
+# a forbidden heavy package (ML libraries that only Celery tasks
+# need) gets imported. Timing depends on the machine and its load,
+# so exceeding the absolute budget is reported as a warning here;
+# ticketing/tests/test_imports.py asserts the forbidden imports and a
+# budget relative to a bare django.setup() (WEB_IMPORT_MAX_RATIO).
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+_SCRIPT = 'import django, importlib; django.setup(); importlib.import_module({module!r})'
+
+
+def _profile(module):
+    """
+    Returns [(module name, self µs, cumulative µs)] for one fresh import.
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _SCRIPT.format(module=module)],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode:
+        raise CommandError(f'importing {module} failed:\n{result.stderr[-2000:]}')
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Profiles web worker import time and rejects heavy ML imports.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default=settings.ROOT_URLCONF,
+                            help='Module imported after django.setup()')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs to take the fastest of')
+        parser.add_argument('--budget-ms', type=float,
+                            default=settings.WEB_IMPORT_BUDGET_MS)
+        parser.add_argument('--forbid', default=','.join(settings.WEB_FORBIDDEN_IMPORTS),
+                            help='Comma-separated top-level packages web workers must not import')
+
+    def handle(self, *args, **options):
+        runs = [_profile(options['module']) for _ in range(max(options['repeat'], 1))]
+        rows = min(runs, key=lambda run: sum(row[1] for row in run))
+        total_ms = sum(row[1] for row in rows) / 1000
+
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:options['top']]:
+            self.stdout.write(f'{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}')
+        self.stdout.write(f"\n{len(rows)} modules, {total_ms:.1f} ms total (budget {options['budget_ms']:.0f} ms)")
+
+        forbidden = {name.strip() for name in options['forbid'].split(',') if name.strip()}
+        loaded = sorted({
+            name.split('.')[0] for name, _, _ in rows
+            if name.split('.')[0] in forbidden
+        })
+
+        if total_ms > options['budget_ms']:
+            self.stdout.write(self.style.WARNING(
+                f"import time {total_ms:.1f} ms exceeds budget {options['budget_ms']:.0f} ms"
+            ))
+        if loaded:
+            raise CommandError(f"forbidden packages imported: {', '.join(loaded)}")
+
+        self.stdout.write(self.style.SUCCESS('No forbidden imports'))
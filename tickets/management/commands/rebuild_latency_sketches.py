@@ -0,0 +1,21 @@
+# ---------------------------------------------------------
+# REBUILD LATENCY SKETCHES
+# ---------------------------------------------------------
+# Usage:
+#   python manage.py rebuild_latency_sketches
+#
+# Recomputes the daily resolution/first-response sketches and
+# Ticket.first_response_at from TicketActivity history. Needed once
+# after deploying them (or after importing activities with
+# bulk_create); afterwards new activities keep them up to date.
+from django.core.management.base import BaseCommand
+
+from tickets.latency import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds resolution and first-response time sketches from ticket activity.'
+
+    def handle(self, *args, **options):
+        total = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{total} durations recorded'))
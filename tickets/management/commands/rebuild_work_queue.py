@@ -0,0 +1,20 @@
+# ---------------------------------------------------------
+# REBUILD AGENT WORK QUEUE
+# ---------------------------------------------------------
+# Usage:
+#   python manage.py rebuild_work_queue
+#
+# Recreates WorkQueueEntry rows from the ticket table. Needed once
+# after deploying the work queue, or after changing
+# WORK_QUEUE_SLA_HOURS; afterwards ticket saves keep it in sync.
+from django.core.management.base import BaseCommand
+
+from tickets.workqueue import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the agent work queue from current tickets.'
+
+    def handle(self, *args, **options):
+        total = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{total} tickets queued'))
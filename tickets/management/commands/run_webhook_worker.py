@@ -0,0 +1,49 @@
+# ---------------------------------------------------------
+# WEBHOOK DELIVERY WORKER
+# ---------------------------------------------------------
+# Usage:
+#   python manage.py run_webhook_worker [--concurrency 2000] \
+#       [--batch-size 1000] [--drain]
+#
+# Runs the asyncio delivery loop (tickets.webhook_worker) until
+# SIGTERM/SIGINT, which stop claiming new deliveries and let the ones
+# in flight finish. Several workers may run side by side: claims skip
+# rows another worker holds. --drain exits once nothing is due.
+import asyncio
+import signal
+
+from django.core.management.base import BaseCommand
+
+from tickets.webhook_worker import WebhookWorker
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued webhook events.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Requests in flight (default WEBHOOK_CONCURRENCY)')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when nothing is due')
+        parser.add_argument('--drain', action='store_true',
+                            help='Exit when no delivery is due')
+
+    def handle(self, *args, **options):
+        worker = WebhookWorker(
+            concurrency=options['concurrency'],
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval'],
+        )
+        sent = asyncio.run(self._run(worker, options['drain']))
+        self.stdout.write(self.style.SUCCESS(f'{sent} requests sent'))
+
+    async def _run(self, worker, drain):
+        task = asyncio.create_task(worker.run(drain=drain))
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, task.cancel)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            return worker.sent
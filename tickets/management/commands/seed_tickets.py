@@ -0,0 +1,308 @@
+# ---------------------------------------------------------
+# SYNTHETIC DATA SEEDER
+# ---------------------------------------------------------
+# Usage:
+#   python manage.py seed_tickets --tickets 100000
+#
+# Generates users/agents, categories, tickets with realistic text,
+# activities, ML predictions and attachment metadata using batched
+# bulk_create calls (one INSERT per model per batch). bulk_create
+# skips post_save, so the ticket event log, work queue entries and
+# latency sketches the signal handlers would maintain are written
+# here as well.
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from tickets import latency, workqueue
+from tickets.models import (
+    Attachment,
+    Category,
+    MLPredictionHistory,
+    Ticket,
+    TicketActivity,
+    TicketArchive,
+    TicketEvent,
+)
+from users.models import User
+
+
+CATEGORIES = [
+    ('IT', 'Laptops, accounts, internal tools'),
+    ('Billing', 'Invoices, refunds, payment issues'),
+    ('Network', 'VPN, Wi-Fi, connectivity'),
+    ('Security', 'Access requests and incidents'),
+    ('Mobile App', 'Android / iOS application'),
+    ('Web Portal', 'Customer web portal'),
+    ('Database', 'Reports and data issues'),
+    ('General', 'Anything else'),
+]
+
+# (subject, symptom, priority) building blocks for ticket text
+SUBJECTS = [
+    'Payment gateway', 'Checkout page', 'Login screen', 'VPN client',
+    'Mobile app', 'Invoice export', 'Customer portal', 'Email service',
+    'Dashboard', 'Report generator', 'Search page', 'File upload',
+    'Order history', 'Password reset', 'Notification service', 'API server',
+]
+SYMPTOMS = [
+    ('payment failed for multiple customers', 'high'),
+    ('server down since this morning', 'high'),
+    ('app crash on launch with exception', 'high'),
+    ('unable to login after update', 'high'),
+    ('data missing from last week', 'high'),
+    ('is very slow during peak hours', 'medium'),
+    ('shows intermittent timeout errors', 'medium'),
+    ('page not loading on first attempt', 'medium'),
+    ('has a minor issue with layout', 'medium'),
+    ('loading issue on older browsers', 'medium'),
+    ('needs a new field in the form', 'low'),
+    ('request to change notification settings', 'low'),
+    ('question about monthly usage', 'low'),
+    ('typo in the confirmation message', 'low'),
+]
+DETAILS = [
+    'Steps to reproduce are attached.',
+    'Several users in our team are affected.',
+    'This started after the latest release.',
+    'We tried clearing cache and restarting, no change.',
+    'Customer is waiting for an update.',
+    'Happens only on Chrome and Edge.',
+    'Logs show repeated errors around the same time.',
+    'Please advise on a workaround.',
+]
+STATUS_WEIGHTS = [
+    ('open', 30), ('in_progress', 20), ('waiting', 10),
+    ('resolved', 25), ('closed', 15),
+]
+ATTACHMENT_NAMES = ['screenshot.png', 'error_log.txt', 'export.csv', 'recording.mp4']
+
+
+@contextmanager
+def _manual_timestamps(*fields):
+    """
+    Temporarily disables auto_now/auto_now_add so generated
+    timestamps are kept instead of being overwritten by save().
+    """
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    try:
+        for f, _, _ in saved:
+            f.auto_now = f.auto_now_add = False
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Seeds synthetic users, categories, tickets, activities and predictions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--agents', type=int, default=20)
+        parser.add_argument('--days', type=int, default=365,
+                            help='Spread ticket creation over this many days')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts['seed'])
+        now = timezone.now()
+
+        categories = self._seed_categories()
+        users, agents = self._seed_users(opts['users'], opts['agents'])
+
+        # Continue numbering after any previously seeded tickets
+        offset = self._next_seed_number()
+        statuses, weights = zip(*STATUS_WEIGHTS)
+
+        fields = [
+            Ticket._meta.get_field('created_at'),
+            Ticket._meta.get_field('updated_at'),
+            TicketActivity._meta.get_field('created_at'),
+            TicketEvent._meta.get_field('created_at'),
+            MLPredictionHistory._meta.get_field('run_at'),
+            Attachment._meta.get_field('uploaded_at'),
+        ]
+
+        created = 0
+        with _manual_timestamps(*fields):
+            while created < opts['tickets']:
+                size = min(opts['batch_size'], opts['tickets'] - created)
+                with transaction.atomic():
+                    tickets = self._build_tickets(
+                        rng, size, offset + created, now, opts['days'],
+                        categories, users, agents, statuses, weights
+                    )
+                    Ticket.objects.bulk_create(tickets, batch_size=size)
+                    self._seed_related(rng, tickets, agents)
+                created += size
+                self.stdout.write(f'  {created}/{opts["tickets"]} tickets')
+
+        self.stdout.write(self.style.SUCCESS(f'Seeded {created} tickets'))
+
+    def _next_seed_number(self):
+        # Archived tickets keep their ids, so a count of live ones could reuse them
+        last = max(
+            (
+                model.objects.filter(ticket_id__startswith='SEED-')
+                .aggregate(last=Max('ticket_id'))['last'] or ''
+                for model in (Ticket, TicketArchive)
+            ),
+            default='',
+        )
+        return int(last[len('SEED-'):]) + 1 if last else 0
+
+    # -----------------------------
+    # Reference data
+    # -----------------------------
+    def _seed_categories(self):
+        existing = {c.name: c for c in Category.objects.all()}
+        missing = [
+            Category(name=name, description=desc)
+            for name, desc in CATEGORIES if name not in existing
+        ]
+        Category.objects.bulk_create(missing)
+        return list(Category.objects.all())
+
+    def _seed_users(self, n_users, n_agents):
+        # Hash once; every seeded account shares the same password
+        password = make_password('password')
+        accounts = [
+            User(username=f'seed_user_{i}', email=f'seed_user_{i}@example.com',
+                 password=password, role='user')
+            for i in range(n_users)
+        ] + [
+            User(username=f'seed_agent_{i}', email=f'seed_agent_{i}@example.com',
+                 password=password, role='agent')
+            for i in range(n_agents)
+        ]
+        User.objects.bulk_create(accounts, ignore_conflicts=True)
+
+        seeded = User.objects.filter(username__startswith='seed_')
+        users = list(seeded.filter(role='user').values_list('id', flat=True))
+        agents = list(seeded.filter(role='agent').values_list('id', flat=True))
+        return users, agents
+
+    # -----------------------------
+    # Tickets and related rows
+    # -----------------------------
+    def _build_tickets(self, rng, size, start, now, days, categories,
+                       users, agents, statuses, weights):
+        tickets = []
+        for i in range(size):
+            subject = rng.choice(SUBJECTS)
+            symptom, priority = rng.choice(SYMPTOMS)
+            status = rng.choices(statuses, weights)[0]
+            created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+
+            tickets.append(Ticket(
+                ticket_id=f'SEED-{start + i:012d}',
+                title=f'{subject} {symptom}'[:255],
+                description=' '.join(rng.sample(DETAILS, 2)) + f' {subject} {symptom}.',
+                category=rng.choice(categories),
+                priority=priority,
+                status=status,
+                created_by_id=rng.choice(users),
+                assigned_to_id=(
+                    rng.choice(agents) if agents and status != 'open' else None
+                ),
+                created_at=created_at,
+                updated_at=created_at + timedelta(minutes=rng.randint(0, 4320)),
+            ))
+        return tickets
+
+    def _seed_related(self, rng, tickets, agents):
+        activities, events, predictions, attachments = [], [], [], []
+
+        for ticket in tickets:
+            trail = []
+            # Status trail: open -> ... -> current status
+            if ticket.status != 'open':
+                at = ticket.created_at + timedelta(minutes=rng.randint(5, 600))
+                trail.append(TicketActivity(
+                    ticket=ticket,
+                    actor_id=ticket.assigned_to_id,
+                    comment='Picked up by agent',
+                    old_status='open',
+                    new_status='in_progress',
+                    created_at=at,
+                ))
+                if ticket.status in ('resolved', 'closed', 'waiting'):
+                    trail.append(TicketActivity(
+                        ticket=ticket,
+                        actor_id=ticket.assigned_to_id,
+                        comment='Status updated',
+                        old_status='in_progress',
+                        new_status=ticket.status,
+                        created_at=at + timedelta(minutes=rng.randint(10, 2880)),
+                    ))
+            activities.extend(trail)
+            events.extend(self._build_events(ticket, trail))
+
+            if rng.random() < 0.5:
+                predictions.append(MLPredictionHistory(
+                    ticket=ticket,
+                    predicted_priority=ticket.priority,
+                    confidence_score=round(rng.uniform(0.55, 0.95), 2),
+                    model_version='v1',
+                    run_at=ticket.created_at,
+                ))
+
+            if rng.random() < 0.1:
+                name = rng.choice(ATTACHMENT_NAMES)
+                attachments.append(Attachment(
+                    ticket=ticket,
+                    file=f'attachments/seed/{ticket.ticket_id}_{name}',
+                    uploaded_at=ticket.created_at,
+                ))
+
+        TicketActivity.objects.bulk_create(activities)
+        TicketEvent.objects.bulk_create(events)
+        MLPredictionHistory.objects.bulk_create(predictions)
+        Attachment.objects.bulk_create(attachments)
+
+        # What the post_save handlers would have done
+        workqueue.sync_tickets([ticket.pk for ticket in tickets])
+        latency.observe(activities)
+
+    def _build_events(self, ticket, trail):
+        """
+        The event log tickets.events would have recorded: creation
+        unassigned and open, then one change per status activity
+        (the first also assigning the agent).
+        """
+        events = [TicketEvent(
+            ticket=ticket,
+            seq=1,
+            kind=TicketEvent.CREATED,
+            changes={
+                'status': [None, 'open'],
+                'priority': [None, ticket.priority],
+                'assigned_to': [None, None],
+                'category': [None, ticket.category_id],
+                'created_by': [None, ticket.created_by_id],
+                'title': [None, ticket.title],
+                'description': [None, ticket.description],
+            },
+            created_at=ticket.created_at,
+        )]
+        for seq, activity in enumerate(trail, start=2):
+            changes = {'status': [activity.old_status, activity.new_status]}
+            if seq == 2 and ticket.assigned_to_id is not None:
+                changes['assigned_to'] = [None, ticket.assigned_to_id]
+            events.append(TicketEvent(
+                ticket=ticket,
+                seq=seq,
+                actor_id=activity.actor_id,
+                changes=changes,
+                created_at=activity.created_at,
+            ))
+        return events
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0002_ticket_parent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MLModelVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(default='priority', max_length=50)),
+                ('version', models.CharField(max_length=50, unique=True)),
+                ('path', models.CharField(max_length=400)),
+                ('metrics', models.JSONField(blank=True, default=dict)),
+                ('training_samples', models.IntegerField(default=0)),
+                ('is_active', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0003_mlmodelversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mlpredictionhistory',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.AddIndex(
+            model_name='mlpredictionhistory',
+            index=models.Index(fields=['content_hash'], name='tickets_mlp_content_7a5305_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mlpredictionhistory',
+            index=models.Index(fields=['ticket', 'model_version', 'run_at'], name='tickets_mlp_ticket__21cfe8_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0004_prediction_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_at', models.DateTimeField(db_index=True)),
+                ('label', models.IntegerField()),
+                ('size', models.IntegerField()),
+                ('keywords', models.JSONField(blank=True, default=list)),
+                ('cohesion', models.FloatField(default=0.0)),
+                ('first_seen', models.DateTimeField(blank=True, null=True)),
+                ('last_seen', models.DateTimeField(blank=True, null=True)),
+                ('representative', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tickets.ticket')),
+                ('tickets', models.ManyToManyField(blank=True, related_name='incident_clusters', to='tickets.ticket')),
+            ],
+        ),
+    ]
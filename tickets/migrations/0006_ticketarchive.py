@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_incidentcluster'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_pk', models.BigIntegerField(unique=True)),
+                ('ticket_id', models.CharField(max_length=20, unique=True)),
+                ('status', models.CharField(max_length=20)),
+                ('archive_month', models.CharField(max_length=7)),
+                ('closed_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.BinaryField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['archive_month', 'closed_at'], name='tickets_tic_archive_9f8ab6_idx')],
+            },
+        ),
+    ]
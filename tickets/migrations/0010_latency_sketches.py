@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_workqueueentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='first_response_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='LatencySketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('resolution', 'Resolution time'), ('first_response', 'First response time')], max_length=20)),
+                ('dimension', models.CharField(choices=[('all', 'All tickets'), ('agent', 'Agent'), ('category', 'Category'), ('priority', 'Priority')], max_length=10)),
+                ('key', models.CharField(blank=True, max_length=50)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('sketch', models.JSONField(default=dict)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('metric', 'dimension', 'day', 'key'), name='latency_sketch_key')],
+            },
+        ),
+    ]
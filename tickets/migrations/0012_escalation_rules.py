@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0011_webhooks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EscalationRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('conditions', models.JSONField(default=list)),
+                ('time_field', models.CharField(choices=[('created_at', 'Since created'), ('updated_at', 'Since last update')], default='created_at', max_length=10)),
+                ('after_minutes', models.PositiveIntegerField(default=0)),
+                ('actions', models.JSONField(default=dict)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EscalationMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_at', models.DateTimeField()),
+                ('fired_at', models.DateTimeField(blank=True, null=True)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tickets.ticket')),
+                ('rule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='tickets.escalationrule')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('fired_at__isnull', True)), fields=['due_at'], name='escalation_due')],
+                'constraints': [models.UniqueConstraint(fields=('rule', 'ticket'), name='escalation_match_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(title, description):
+    """
+    Lowercases and collapses whitespace so cosmetic edits
+    don't count as a text change.
+    """
+    text = (title or '') + ' ' + (description or '')
+    return _WHITESPACE.sub(' ', text).strip().lower()
+
+
+def content_hash(title, description, model_version):
+    """
+    Cache key for a prediction: normalized text + model version.
+    """
+    payload = f'{model_version}\x00{normalize_text(title, description)}'
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU mapping used in front of the DB lookup.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
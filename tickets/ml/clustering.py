@@ -0,0 +1,71 @@
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+from .tfidf_model import TFIDFUrgency
+
+
+def choose_k(n_samples, max_clusters=100):
+    """
+    Rule-of-thumb cluster count sqrt(n / 2), bounded to keep
+    mini-batch k-means fast on large windows.
+    """
+    return int(min(max(np.sqrt(n_samples / 2), 2), max_clusters, n_samples))
+
+
+def cluster_texts(texts, min_size=5, min_cohesion=0.3, max_clusters=100,
+                  n_keywords=5, random_state=0):
+    """
+    Clusters ticket texts on their (sparse, l2-normalised) TF-IDF vectors
+    with mini-batch k-means.
+
+    Returns a list of dicts, largest first:
+        label, members (indices into texts), keywords,
+        representative (index closest to the centroid), cohesion
+    Only clusters with at least `min_size` members whose mean cosine
+    similarity to the centroid reaches `min_cohesion` are kept, so
+    catch-all clusters of unrelated tickets are not reported.
+    """
+    if len(texts) < max(min_size, 2):
+        return []
+
+    model = TFIDFUrgency()
+    model.fit_on_texts(texts)
+    X = model.vectorizer.transform(texts)
+    terms = model.vectorizer.get_feature_names_out()
+
+    kmeans = MiniBatchKMeans(
+        n_clusters=choose_k(len(texts), max_clusters),
+        batch_size=4096,
+        n_init=3,
+        random_state=random_state,
+    )
+    labels = kmeans.fit_predict(X)
+
+    clusters = []
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        if len(members) < min_size:
+            continue
+
+        centroid = kmeans.cluster_centers_[label]
+        norm = np.linalg.norm(centroid)
+        if not norm:
+            continue
+
+        # Cosine similarity of each member to the centroid
+        sims = X[members] @ (centroid / norm)
+        cohesion = float(np.mean(sims))
+        if cohesion < min_cohesion:
+            continue
+
+        top_terms = np.argsort(centroid)[::-1][:n_keywords]
+        clusters.append({
+            'label': int(label),
+            'members': members.tolist(),
+            'keywords': [str(terms[i]) for i in top_terms if centroid[i] > 0],
+            'representative': int(members[int(np.argmax(sims))]),
+            'cohesion': round(cohesion, 4),
+        })
+
+    clusters.sort(key=lambda c: len(c['members']), reverse=True)
+    return clusters
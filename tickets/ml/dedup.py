@@ -0,0 +1,179 @@
+import os
+import pickle
+import threading
+import zlib
+
+import numpy as np
+
+from .text import tokenize
+
+# Prime just above 2**32: (a * h + b) stays below 2**64 for 32-bit hashes
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(2 ** 32 - 1)
+
+
+def shingles(text):
+    """
+    Unigram + bigram shingles built on the TF-IDF tokenizer.
+    """
+    tokens = tokenize(text)
+    grams = set(tokens)
+    grams.update(f'{a} {b}' for a, b in zip(tokens, tokens[1:]))
+    return grams
+
+
+class MinHashLSH:
+    """
+    MinHash signatures with banded locality-sensitive hashing.
+
+    Each ticket gets a `num_perm` signature; signatures are cut into
+    `bands` bands and stored in one hash table per band. Tickets that
+    share any band become candidates, and the fraction of equal
+    signature slots estimates their Jaccard similarity.
+    """
+
+    def __init__(self, num_perm=64, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # Same seed -> same permutations in every process
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+
+        self.tables = [{} for _ in range(bands)]
+        self.signatures = {}
+        self.created = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def signature(self, grams):
+        hashes = np.fromiter(
+            (zlib.crc32(g.encode('utf-8')) for g in grams),
+            dtype=np.uint64,
+            count=len(grams)
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return np.minimum(permuted.min(axis=0), _MAX_HASH).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key, grams, created_ts):
+        if not grams or key in self.signatures:
+            return
+        signature = self.signature(grams)
+        self.signatures[key] = signature
+        self.created[key] = created_ts
+        for band, band_key in self._band_keys(signature):
+            self.tables[band].setdefault(band_key, set()).add(key)
+
+    def remove(self, key):
+        signature = self.signatures.pop(key, None)
+        self.created.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in self._band_keys(signature):
+            bucket = self.tables[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.tables[band][band_key]
+
+    def query(self, grams, threshold, exclude=()):
+        """
+        Returns [(key, estimated similarity)] above threshold, best first.
+        """
+        if not grams:
+            return []
+        signature = self.signature(grams)
+
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self.tables[band].get(band_key, ()))
+        candidates.difference_update(exclude)
+
+        matches = []
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda m: (-m[1], m[0]))
+        return matches
+
+    def prune(self, older_than_ts):
+        for key in [k for k, ts in self.created.items() if ts < older_than_ts]:
+            self.remove(key)
+
+
+class DuplicateIndex:
+    """
+    Near-duplicate index over recent open tickets.
+
+    Kept in memory per process, persisted to disk so restarts start
+    warm, and caught up incrementally from the database (tickets with
+    an id above the highest one already indexed).
+    """
+
+    def __init__(self, window_seconds, threshold, num_perm=64, bands=16):
+        self.window_seconds = window_seconds
+        self.threshold = threshold
+        self.lsh = MinHashLSH(num_perm=num_perm, bands=bands)
+        self.last_id = 0
+        self.lock = threading.Lock()
+
+    def add(self, ticket_id, text, created_ts):
+        with self.lock:
+            self.lsh.add(ticket_id, shingles(text), created_ts)
+            self.last_id = max(self.last_id, ticket_id)
+
+    def discard(self, ticket_id):
+        with self.lock:
+            self.lsh.remove(ticket_id)
+
+    def query(self, text, exclude=()):
+        with self.lock:
+            return self.lsh.query(shingles(text), self.threshold, exclude)
+
+    def prune(self, now_ts):
+        with self.lock:
+            self.lsh.prune(now_ts - self.window_seconds)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with self.lock:
+            state = {
+                'num_perm': self.lsh.num_perm,
+                'bands': self.lsh.bands,
+                'signatures': self.lsh.signatures,
+                'created': self.lsh.created,
+                'last_id': self.last_id,
+            }
+            with open(tmp_path, 'wb') as fh:
+                pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, window_seconds, threshold):
+        """
+        Loads a saved index. Signatures are reused as-is, so a change
+        of num_perm/bands requires a rebuild.
+        """
+        with open(path, 'rb') as fh:
+            state = pickle.load(fh)
+
+        index = cls(window_seconds, threshold, state['num_perm'], state['bands'])
+        for key, signature in state['signatures'].items():
+            index.lsh.signatures[key] = signature
+            index.lsh.created[key] = state['created'][key]
+            for band, band_key in index.lsh._band_keys(signature):
+                index.lsh.tables[band].setdefault(band_key, set()).add(key)
+        index.last_id = state['last_id']
+        return index
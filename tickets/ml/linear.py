@@ -0,0 +1,114 @@
+import json
+import os
+
+import numpy as np
+
+from .text import tokenize
+
+# Files making up one model artifact directory
+TERMS_FILE = 'terms.npy'
+IDF_FILE = 'idf.npy'
+COEF_FILE = 'coef.npy'
+INTERCEPT_FILE = 'intercept.npy'
+META_FILE = 'meta.json'
+
+
+def save_linear_model(directory, terms, idf, coef, intercept, classes, meta):
+    """
+    Writes a TF-IDF + linear classifier artifact.
+
+    terms      : vocabulary (any order; stored sorted)
+    idf        : idf weight per term
+    coef       : (n_classes, n_terms) weights
+    intercept  : (n_classes,) biases
+    classes    : class labels in coef row order
+    meta       : extra metadata (version, metrics, ...)
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    terms = np.asarray(terms, dtype=str)
+    order = np.argsort(terms)
+
+    np.save(os.path.join(directory, TERMS_FILE), terms[order])
+    np.save(os.path.join(directory, IDF_FILE), np.asarray(idf, dtype=np.float32)[order])
+    # Stored term-major so a ticket's weights are a few contiguous rows
+    np.save(
+        os.path.join(directory, COEF_FILE),
+        np.ascontiguousarray(np.asarray(coef, dtype=np.float32)[:, order].T)
+    )
+    np.save(os.path.join(directory, INTERCEPT_FILE), np.asarray(intercept, dtype=np.float32))
+
+    with open(os.path.join(directory, META_FILE), 'w') as fh:
+        json.dump({**meta, 'classes': list(classes)}, fh, indent=2)
+
+
+class LinearTextModel:
+    """
+    Read-only TF-IDF + linear model backed by memory-mapped arrays.
+
+    The arrays are mapped, not read, so every worker process that
+    loads the same artifact shares one copy through the page cache.
+    Scoring a ticket is a sparse dot product: only the coefficient
+    rows of the terms present in the text are touched.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+        with open(os.path.join(directory, META_FILE)) as fh:
+            self.meta = json.load(fh)
+
+        self.version = self.meta['version']
+        self.classes = self.meta['classes']
+
+        self.terms = np.load(os.path.join(directory, TERMS_FILE), mmap_mode='r')
+        self.idf = np.load(os.path.join(directory, IDF_FILE), mmap_mode='r')
+        self.coef = np.load(os.path.join(directory, COEF_FILE), mmap_mode='r')
+        self.intercept = np.load(os.path.join(directory, INTERCEPT_FILE))
+
+    def vectorize(self, text):
+        """
+        Returns (term indices, l2-normalised tf-idf values) for a text,
+        matching TfidfVectorizer's default transform.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+
+        tokens, counts = np.unique(np.asarray(tokens, dtype=str), return_counts=True)
+        positions = np.searchsorted(self.terms, tokens)
+        positions = np.minimum(positions, len(self.terms) - 1)
+        known = self.terms[positions] == tokens
+
+        indices = positions[known]
+        values = counts[known] * self.idf[indices]
+        norm = np.sqrt(np.dot(values, values))
+        if norm:
+            values = values / norm
+        return indices, values.astype(np.float32)
+
+    def decision(self, text):
+        indices, values = self.vectorize(text)
+        return values @ self.coef[indices] + self.intercept
+
+    def decision_many(self, texts):
+        """
+        Class scores for a batch of texts, shape (n_texts, n_classes).
+        """
+        scores = np.empty((len(texts), len(self.classes)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            scores[row] = self.decision(text)
+        return scores
+
+    def predict(self, text):
+        """
+        Returns (label, confidence) using softmax over class scores.
+        """
+        scores = self.decision(text)
+        exp = np.exp(scores - scores.max())
+        probs = exp / exp.sum()
+        best = int(probs.argmax())
+        return self.classes[best], float(probs[best])
+
+    def predict_many(self, texts):
+        return [self.predict(text) for text in texts]
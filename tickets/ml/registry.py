@@ -0,0 +1,138 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache import LRUCache, content_hash, normalize_text
+from .linear import LinearTextModel
+from .model import predict_priority
+
+# Version recorded for the keyword fallback in tickets.ml.model
+RULE_BASED_VERSION = 'v1'
+
+# Per-process cache: model name -> (checked_at, LinearTextModel or None)
+_loaded = {}
+_lock = threading.Lock()
+
+# content hash -> (priority, confidence), in front of the DB lookup
+_predictions = None
+
+
+def register_version(name, version, path, metrics, training_samples, activate=True):
+    """
+    Records a trained artifact and optionally makes it the active one.
+    """
+    from tickets.models import MLModelVersion
+
+    with transaction.atomic():
+        entry = MLModelVersion.objects.create(
+            name=name,
+            version=version,
+            path=str(path),
+            metrics=metrics,
+            training_samples=training_samples,
+        )
+        if activate:
+            activate_version(entry.version)
+    return entry
+
+
+def activate_version(version):
+    """
+    Marks a version active and deactivates the others of that name.
+    Workers pick up the switch on their next refresh.
+    """
+    from tickets.models import MLModelVersion
+
+    with transaction.atomic():
+        entry = MLModelVersion.objects.select_for_update().get(version=version)
+        MLModelVersion.objects.filter(name=entry.name, is_active=True).update(is_active=False)
+        entry.is_active = True
+        entry.save(update_fields=['is_active'])
+    return entry
+
+
+def get_active_model(name='priority', force=False):
+    """
+    Returns the active model for this worker, or None if none is trained.
+
+    The registry row is re-checked at most every ML_REGISTRY_REFRESH_SECONDS
+    (or immediately with force=True); the artifact itself is
+    memory-mapped once per version and reused.
+    """
+    from tickets.models import MLModelVersion
+
+    refresh = getattr(settings, 'ML_REGISTRY_REFRESH_SECONDS', 60)
+    now = time.monotonic()
+
+    with _lock:
+        cached = _loaded.get(name)
+        if cached and not force and now - cached[0] < refresh:
+            return cached[1]
+
+    active = (
+        MLModelVersion.objects.filter(name=name, is_active=True)
+        .values_list('version', 'path')
+        .first()
+    )
+
+    model = None
+    if active is not None:
+        current = cached[1] if cached else None
+        if current is not None and current.version == active[0]:
+            model = current
+        else:
+            try:
+                model = LinearTextModel(active[1])
+            except (OSError, KeyError, ValueError):
+                model = None
+
+    with _lock:
+        _loaded[name] = (now, model)
+    return model
+
+
+def get_predictor(name='priority'):
+    """
+    Returns (model version, predict(text) -> (label, confidence)) for
+    the active trained model, or the keyword rules if none exists.
+    """
+    model = get_active_model(name)
+    if model is not None:
+        return model.version, model.predict
+    return RULE_BASED_VERSION, predict_priority
+
+
+def _prediction_cache():
+    global _predictions
+    if _predictions is None:
+        _predictions = LRUCache(getattr(settings, 'ML_PREDICTION_CACHE_SIZE', 10000))
+    return _predictions
+
+
+def predict_ticket_priority(title, description):
+    """
+    Predicts priority for a ticket's text.
+    Identical text already scored by the same model version is served
+    from the in-process LRU, then from prediction history, before the
+    model runs. Returns (priority, confidence, model version, content hash).
+    """
+    from tickets.models import MLPredictionHistory
+
+    version, predict = get_predictor()
+    key = content_hash(title, description, version)
+    cache = _prediction_cache()
+
+    cached = cache.get(key)
+    if cached is None:
+        cached = (
+            MLPredictionHistory.objects.filter(content_hash=key)
+            .values_list('predicted_priority', 'confidence_score')
+            .first()
+        )
+    if cached is None:
+        cached = predict(normalize_text(title, description))
+
+    cache.put(key, tuple(cached))
+    return cached[0], cached[1], version, key
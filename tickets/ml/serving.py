@@ -0,0 +1,60 @@
+import shutil
+
+from django.conf import settings
+from django.utils import timezone
+
+from .registry import get_active_model, register_version
+from .tfidf_model import MODEL_NAME, TFIDFUrgency
+
+
+def publish_urgency_model(texts):
+    """
+    Fits the TF-IDF urgency model once and publishes it as a
+    memory-mapped artifact. Every worker process maps the same files
+    read-only instead of fitting and holding a private copy.
+    """
+    from tickets.models import MLModelVersion
+
+    version = 'tfidf-' + timezone.now().strftime('%Y%m%d-%H%M%S-%f')
+    directory = settings.ML_MODEL_DIR / version
+    previous = (
+        MLModelVersion.objects.filter(name=MODEL_NAME, is_active=True)
+        .values_list('version', flat=True)
+        .first()
+    )
+
+    model = TFIDFUrgency()
+    model.fit_on_texts(texts)
+    model.export(directory, version)
+
+    register_version(
+        MODEL_NAME, version, directory,
+        metrics={'vocabulary_size': len(model.vectorizer.vocabulary_)},
+        training_samples=len(texts),
+    )
+    # Make this process see the new version right away
+    get_active_model(MODEL_NAME, force=True)
+
+    # The previous artifact stays for workers that have not refreshed
+    # yet; older ones (and failed publishes) go. Their registry rows
+    # remain for auditing.
+    keep = {version, previous}
+    for path in settings.ML_MODEL_DIR.glob('tfidf-*'):
+        if path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+    return version
+
+
+def get_urgency_model():
+    """
+    Returns the shared urgency model, or None if none is published.
+    """
+    return get_active_model(MODEL_NAME)
+
+
+def score_urgency(model, texts):
+    """
+    Urgency (cosine similarity to the urgent prototype) per text,
+    scored against the shared memory-mapped model.
+    """
+    return model.decision_many(texts)[:, 0]
@@ -1,5 +1,6 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+# scikit-learn is imported inside the methods that use it: this module
+# is imported by tickets.tasks (and so by web workers) for its constants
+from .text import tokenize  # noqa: F401  (re-exported)
 
 # Prototype text representing a highly urgent ticket
 URGENT_PROTOTYPE = (
@@ -7,6 +8,25 @@ URGENT_PROTOTYPE = (
     "data loss down not working immediate"
 )
 
+# Registry name of the published (shared) urgency model
+MODEL_NAME = 'urgency'
+
+# Similarity thresholds used to map urgency scores to priorities
+HIGH_THRESHOLD = 0.35
+MEDIUM_THRESHOLD = 0.18
+
+
+def score_to_priority(score, threshold_high=HIGH_THRESHOLD, threshold_med=MEDIUM_THRESHOLD):
+    """
+    Maps a cosine-similarity urgency score to a priority label.
+    """
+    if score >= threshold_high:
+        return 'high'
+    if score >= threshold_med:
+        return 'medium'
+    return 'low'
+
+
 class TFIDFUrgency:
     """
     TF-IDF based urgency scoring model.
@@ -15,6 +35,8 @@ class TFIDFUrgency:
     """
 
     def __init__(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
         # Initialize TF-IDF vectorizer
         self.vectorizer = TfidfVectorizer(
             stop_words='english',
@@ -41,6 +63,8 @@ class TFIDFUrgency:
         Calculate urgency score for each ticket
         based on cosine similarity with urgent prototype.
         """
+        from sklearn.metrics.pairwise import cosine_similarity
+
         if not self.fitted:
             self.fit_on_texts(texts)
 
@@ -62,21 +86,26 @@ class TFIDFUrgency:
 
         return sims
 
+    def export(self, directory, version):
+        """
+        Writes the fitted vectorizer and the urgent prototype vector as
+        a memory-mappable linear artifact (see tickets.ml.linear).
+        Both vectors are l2-normalised, so the artifact's single class
+        score equals the cosine similarity computed by score_texts.
+        """
+        import numpy as np
+        from .linear import save_linear_model
 
-# Singleton model instance (shared across calls)
-_model = TFIDFUrgency()
-
-
-def fit_model_on_tickets(texts):
-    """
-    Fit TF-IDF model on historical ticket descriptions.
-    """
-    _model.fit_on_texts(texts)
-
-
-def predict_scores_for_tickets(texts):
-    """
-    Predict urgency scores for new tickets.
-    Higher score = more urgent ticket.
-    """
-    return _model.score_texts(texts)
+        if not self.fitted:
+            self.fit_on_texts([])
+
+        proto = self.vectorizer.transform([URGENT_PROTOTYPE]).toarray()
+        save_linear_model(
+            directory,
+            terms=self.vectorizer.get_feature_names_out(),
+            idf=self.vectorizer.idf_,
+            coef=proto,
+            intercept=np.zeros(1),
+            classes=['urgency'],
+            meta={'version': version, 'prototype': URGENT_PROTOTYPE},
+        )
@@ -79,10 +79,22 @@ class Ticket(models.Model):
         blank=True
     )
 
+    # Parent incident when this ticket is a near-duplicate
+    parent = models.ForeignKey(
+        'self',
+        related_name='duplicates',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # First activity by someone other than the creator (tickets.latency)
+    first_response_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
         return f"{self.ticket_id} - {self.title}"
 
@@ -147,3 +159,415 @@ class MLPredictionHistory(models.Model):
     model_version = models.CharField(max_length=50, blank=True)
     confidence_score = models.FloatField(default=0.0)
     run_at = models.DateTimeField(auto_now_add=True)
+
+    # Hash of normalized title + description + model version;
+    # identical text scored by the same model is never rescored
+    content_hash = models.CharField(max_length=40, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['content_hash']),
+            models.Index(fields=['ticket', 'model_version', 'run_at']),
+        ]
+
+
+class MLModelVersion(models.Model):
+    """
+    Registry of trained model artifacts.
+    Exactly one version per model name is active and used
+    for inference; older versions are kept for auditing.
+    """
+    name = models.CharField(max_length=50, default='priority')
+    version = models.CharField(max_length=50, unique=True)
+    path = models.CharField(max_length=400)
+    metrics = models.JSONField(default=dict, blank=True)
+    training_samples = models.IntegerField(default=0)
+    is_active = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.version}{' (active)' if self.is_active else ''}"
+
+
+class IncidentCluster(models.Model):
+    """
+    Group of recent open tickets describing the same incident,
+    produced by the periodic clustering job. Each job run writes
+    a new set of clusters sharing the same run_at.
+    """
+    run_at = models.DateTimeField(db_index=True)
+    label = models.IntegerField()
+    size = models.IntegerField()
+    keywords = models.JSONField(default=list, blank=True)
+    cohesion = models.FloatField(default=0.0)
+    representative = models.ForeignKey(
+        Ticket,
+        related_name='+',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    tickets = models.ManyToManyField(
+        Ticket,
+        related_name='incident_clusters',
+        blank=True
+    )
+    first_seen = models.DateTimeField(null=True, blank=True)
+    last_seen = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.run_at:%Y-%m-%d %H:%M} #{self.label} ({self.size})"
+
+
+class TicketArchive(models.Model):
+    """
+    Cold storage for tickets closed/resolved long ago.
+    The full ticket (as returned by the detail API, plus predictions)
+    is kept as one compressed JSON document, keyed by the original
+    primary key. archive_month (the month it was closed) is an indexed
+    column for pruning/export by month; the table is not partitioned.
+    """
+    ticket_pk = models.BigIntegerField(unique=True)
+    ticket_id = models.CharField(max_length=20, unique=True)
+    status = models.CharField(max_length=20)
+    archive_month = models.CharField(max_length=7)  # 'YYYY-MM'
+    closed_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['archive_month', 'closed_at']),
+        ]
+
+    @property
+    def data(self):
+        """
+        Decompressed ticket document.
+        """
+        import json
+        import zlib
+        return json.loads(zlib.decompress(self.payload))
+
+    def __str__(self):
+        return f"{self.ticket_id} (archived {self.archive_month})"
+
+
+class ArchivedAttachment(models.Model):
+    """
+    Attachment of an archived ticket. Keeps the original Attachment
+    id (so download links stay valid) and its file, which is left in
+    storage; the ticket's creator is copied for download permissions.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    archive = models.ForeignKey(
+        TicketArchive,
+        to_field='ticket_pk',
+        related_name='attachments',
+        on_delete=models.CASCADE
+    )
+    ticket_created_by = models.ForeignKey(
+        User,
+        related_name='+',
+        on_delete=models.SET_NULL,
+        null=True
+    )
+    file = models.FileField(upload_to='attachments/')
+    uploaded_at = models.DateTimeField()
+
+
+class TicketEventQuerySet(models.QuerySet):
+    """
+    Refuses the set-based writes that would bypass TicketEvent.save().
+    """
+
+    def update(self, **kwargs):
+        raise ValueError('TicketEvent is append-only')
+
+    def delete(self):
+        raise ValueError('TicketEvent is append-only')
+
+
+class TicketEvent(models.Model):
+    """
+    Append-only log of ticket field changes, captured by a model diff
+    on every save (see tickets.events). `seq` numbers a ticket's events
+    from 1 so timelines are read off the (ticket, seq) index.
+
+    Events outlive their ticket (no FK constraint), so archived tickets
+    keep their history for SLA and resolution-time computations.
+    """
+    CREATED = 'created'
+    CHANGED = 'changed'
+    KIND_CHOICES = (
+        (CREATED, 'Created'),
+        (CHANGED, 'Changed'),
+    )
+
+    ticket = models.ForeignKey(
+        Ticket,
+        related_name='events',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False
+    )
+    seq = models.PositiveIntegerField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=CHANGED)
+    actor = models.ForeignKey(
+        User,
+        related_name='+',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    # Only the changed fields: {"status": ["open", "resolved"], ...}
+    changes = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = TicketEventQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ticket', 'seq'], name='ticket_event_seq'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('TicketEvent is append-only')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('TicketEvent is append-only')
+
+    def __str__(self):
+        return f"{self.ticket_id}#{self.seq} {self.kind}"
+
+
+class TaskLease(models.Model):
+    """
+    Database fallback for task leases (see tickets.locks) when no
+    Redis cache is configured. One row per held key; expired rows
+    may be taken over by the next acquirer.
+    """
+    key = models.CharField(max_length=200, unique=True)
+    owner = models.CharField(max_length=100)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.key} -> {self.owner}"
+
+
+class WorkQueueEntry(models.Model):
+    """
+    Actionable (not resolved/closed) tickets in the order agents
+    should work them: numeric priority rank, then SLA due time.
+    Maintained on every ticket save (see tickets.workqueue) so an
+    agent's next tickets are one index range scan away.
+
+    A claim is a short lease: a claimed entry is skipped by other
+    agents until `claimed_until` passes.
+    """
+    ticket = models.OneToOneField(
+        Ticket,
+        related_name='work_queue_entry',
+        on_delete=models.CASCADE
+    )
+    # Assignee, or null for the unassigned pool (where tickets of a
+    # deleted agent fall back to, like Ticket.assigned_to)
+    agent = models.ForeignKey(
+        User,
+        related_name='+',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    priority_rank = models.PositiveSmallIntegerField()  # 0 = most urgent
+    sla_due_at = models.DateTimeField()
+
+    claimed_by = models.ForeignKey(
+        User,
+        related_name='+',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    claimed_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['agent', 'priority_rank', 'sla_due_at'], name='work_queue_order'),
+        ]
+
+    def __str__(self):
+        return f"{self.ticket_id} (rank {self.priority_rank}, due {self.sla_due_at:%Y-%m-%d %H:%M})"
+
+
+class LatencySketch(models.Model):
+    """
+    One day of resolution or first-response times (seconds) for one
+    agent, category, priority or all tickets, as a DDSketch (see
+    tickets.sketch). Percentiles over a date range merge the range's
+    sketches instead of sorting tickets (see tickets.latency).
+    """
+    RESOLUTION = 'resolution'
+    FIRST_RESPONSE = 'first_response'
+    METRIC_CHOICES = (
+        (RESOLUTION, 'Resolution time'),
+        (FIRST_RESPONSE, 'First response time'),
+    )
+
+    DIMENSION_CHOICES = (
+        ('all', 'All tickets'),
+        ('agent', 'Agent'),
+        ('category', 'Category'),
+        ('priority', 'Priority'),
+    )
+
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    # Agent/category id or priority value; '' for 'all'
+    key = models.CharField(max_length=50, blank=True)
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    sketch = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'dimension', 'day', 'key'], name='latency_sketch_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.dimension}={self.key or '*'} {self.day} ({self.count})"
+
+
+class WebhookEndpoint(models.Model):
+    """
+    External URL notified of ticket events (see tickets.webhooks).
+    Bodies are signed with `secret` (HMAC-SHA256). Consecutive failures
+    open a circuit: no deliveries are attempted until `disabled_until`.
+    """
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=64)
+    # Event types to deliver, e.g. ["ticket.created", "ticket.resolved"]
+    events = models.JSONField(default=list)
+    is_active = models.BooleanField(default=True)
+    created_by = models.ForeignKey(
+        User,
+        related_name='+',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Circuit breaker
+    failure_count = models.PositiveIntegerField(default=0)
+    disabled_until = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.url
+
+
+class WebhookDelivery(models.Model):
+    """
+    One event to send to one endpoint. Pending deliveries form the
+    retry queue, ordered by `next_attempt_at`; a worker claiming a
+    delivery pushes `next_attempt_at` forward as a lease.
+    """
+    PENDING = 'pending'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (DELIVERED, 'Delivered'),
+        (FAILED, 'Failed'),
+    )
+
+    endpoint = models.ForeignKey(
+        WebhookEndpoint,
+        related_name='deliveries',
+        on_delete=models.CASCADE
+    )
+    event = models.CharField(max_length=40)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='webhook_retry_queue'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} -> {self.endpoint_id} ({self.status})"
+
+
+class EscalationRule(models.Model):
+    """
+    Admin-defined automation (see tickets.escalation): when a ticket
+    meets every condition, optionally for `after_minutes` since it was
+    created or last updated, the actions are applied to it once.
+
+    conditions: [{"field": "priority", "op": "eq", "value": "high"}, ...]
+    actions: {"assign_to": <user id>, "priority": ..., "status": ...}
+    """
+    CREATED_AT = 'created_at'
+    UPDATED_AT = 'updated_at'
+    TIME_FIELD_CHOICES = (
+        (CREATED_AT, 'Since created'),
+        (UPDATED_AT, 'Since last update'),
+    )
+
+    name = models.CharField(max_length=100)
+    conditions = models.JSONField(default=list)
+    time_field = models.CharField(max_length=10, choices=TIME_FIELD_CHOICES, default=CREATED_AT)
+    after_minutes = models.PositiveIntegerField(default=0)
+    actions = models.JSONField(default=dict)
+    is_active = models.BooleanField(default=True)
+    created_by = models.ForeignKey(
+        User,
+        related_name='+',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class EscalationMatch(models.Model):
+    """
+    A ticket meeting a rule's conditions. Unfired matches are the
+    escalation schedule, fired once `due_at` passes if the rule still
+    holds; fired ones stop the rule from firing on the ticket again.
+    """
+    rule = models.ForeignKey(
+        EscalationRule,
+        related_name='matches',
+        on_delete=models.CASCADE
+    )
+    ticket = models.ForeignKey(
+        Ticket,
+        related_name='+',
+        on_delete=models.CASCADE
+    )
+    due_at = models.DateTimeField()
+    fired_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rule', 'ticket'], name='escalation_match_key'),
+        ]
+        indexes = [
+            models.Index(fields=['due_at'], condition=models.Q(fired_at__isnull=True), name='escalation_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.rule_id} -> {self.ticket_id} (due {self.due_at:%Y-%m-%d %H:%M})"
@@ -1,12 +1,19 @@
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Category, Ticket, TicketActivity, Attachment, MLPredictionHistory
+from .models import (
+    Category, Ticket, TicketActivity, Attachment,
+    WebhookEndpoint, WebhookDelivery, EscalationRule, EscalationMatch
+)
+from .downloads import can_view, signed_url
+from users.models import User
 from users.serializers import UserSerializer
+from ticketing.metrics import TimedSerializerMixin
 
 
 # ---------------------------
 # CATEGORY SERIALIZER
 # ---------------------------
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializes ticket categories.
     Used for listing and displaying category details.
@@ -19,23 +26,27 @@ class CategorySerializer(serializers.ModelSerializer):
 # ---------------------------
 # ATTACHMENT SERIALIZER
 # ---------------------------
-class AttachmentSerializer(serializers.ModelSerializer):
+class AttachmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializes ticket attachments and returns
-    a downloadable file URL.
+    a download URL: signed (usable without the JWT header until it
+    expires) for users who may view the ticket.
     """
     file = serializers.SerializerMethodField()
 
     def get_file(self, obj):
         """
-        Builds absolute file URL if request context is available.
+        Builds absolute download URL if request context is available.
         """
         request = self.context.get('request')
-        if obj.file:
-            if request:
-                return request.build_absolute_uri(obj.file.url)
-            return obj.file.url
-        return None
+        if not obj.file:
+            return None
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and can_view(user, obj.ticket):
+            url = signed_url(obj.pk)
+        else:
+            url = reverse('attachment-download', args=[obj.pk])
+        return request.build_absolute_uri(url) if request else url
 
     class Meta:
         model = Attachment
@@ -45,7 +56,7 @@ class AttachmentSerializer(serializers.ModelSerializer):
 # ---------------------------
 # TICKET ACTIVITY SERIALIZER
 # ---------------------------
-class TicketActivitySerializer(serializers.ModelSerializer):
+class TicketActivitySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializes ticket activity logs
     like status changes and comments.
@@ -60,7 +71,7 @@ class TicketActivitySerializer(serializers.ModelSerializer):
 # ---------------------------
 # CREATE TICKET SERIALIZER (POST)
 # ---------------------------
-class CreateTicketSerializer(serializers.ModelSerializer):
+class CreateTicketSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer used only while creating tickets.
     Handles attachments and auto ticket ID generation.
@@ -98,7 +109,7 @@ class CreateTicketSerializer(serializers.ModelSerializer):
 # ---------------------------
 # MAIN TICKET SERIALIZER (GET)
 # ---------------------------
-class TicketSerializer(serializers.ModelSerializer):
+class TicketSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Full ticket serializer used for listing and viewing tickets.
     """
@@ -136,3 +147,133 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = "__all__"
+        read_only_fields = ['first_response_at']
+
+
+# ---------------------------
+# BULK UPDATE SERIALIZERS
+# ---------------------------
+class BulkChangesSerializer(serializers.Serializer):
+    """
+    Fields that can be changed on many tickets at once.
+    Only the keys present in the request are applied.
+    """
+    status = serializers.ChoiceField(choices=Ticket.STATUS_CHOICES, required=False)
+    priority = serializers.ChoiceField(choices=Ticket.PRIORITY_CHOICES, required=False)
+    assigned_to = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(role__in=['agent', 'admin']),
+        required=False,
+        allow_null=True
+    )
+    category = serializers.PrimaryKeyRelatedField(
+        queryset=Category.objects.all(),
+        required=False,
+        allow_null=True
+    )
+
+    def to_internal_value(self, data):
+        """
+        Returns event keys mapped to raw values (ids for relations).
+        """
+        values = super().to_internal_value(data)
+        return {
+            key: value.pk if isinstance(value, (User, Category)) else value
+            for key, value in values.items()
+        }
+
+
+class BulkUpdateSerializer(serializers.Serializer):
+    """
+    Selects tickets by explicit `ids` or by `filter` (TicketFilter
+    parameters) and describes the `changes` to apply.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filter = serializers.DictField(required=False)
+    changes = BulkChangesSerializer()
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide either ids or filter.')
+        if not attrs['changes']:
+            raise serializers.ValidationError({'changes': 'No changes given.'})
+        return attrs
+
+
+# ---------------------------
+# WEBHOOK SERIALIZERS
+# ---------------------------
+class WebhookEndpointSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Registered webhook endpoint. The signing secret is generated
+    on creation and returned so receivers can verify signatures.
+    """
+    class Meta:
+        model = WebhookEndpoint
+        fields = ['id', 'url', 'events', 'is_active', 'secret', 'created_at',
+                  'failure_count', 'disabled_until']
+        read_only_fields = ['secret', 'created_at', 'failure_count', 'disabled_until']
+
+    def validate_events(self, value):
+        from .webhooks import EVENT_TYPES
+
+        if not isinstance(value, list) or not value:
+            raise serializers.ValidationError('Provide a non-empty list of event types.')
+        unknown = sorted(set(value) - set(EVENT_TYPES))
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown event types: {', '.join(map(str, unknown))}; choose from {', '.join(EVENT_TYPES)}."
+            )
+        return sorted(set(value))
+
+
+class WebhookDeliverySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Delivery attempt history for an endpoint.
+    """
+    class Meta:
+        model = WebhookDelivery
+        fields = ['id', 'event', 'status', 'attempts', 'next_attempt_at', 'response_status',
+                  'last_error', 'created_at', 'delivered_at', 'payload']
+
+
+class EscalationRuleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Admin-defined escalation rule (see tickets.escalation for the
+    condition fields, operators and actions).
+    """
+    class Meta:
+        model = EscalationRule
+        fields = ['id', 'name', 'conditions', 'time_field', 'after_minutes', 'actions',
+                  'is_active', 'created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at']
+
+    def validate_conditions(self, value):
+        from .escalation import validate_conditions
+
+        try:
+            value = validate_conditions(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+        if not value:
+            raise serializers.ValidationError('Provide at least one condition.')
+        return value
+
+    def validate_actions(self, value):
+        from .escalation import validate_actions
+
+        try:
+            return validate_actions(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+
+
+class EscalationMatchSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Scheduled or fired escalation of one ticket.
+    """
+    ticket_id = serializers.CharField(source='ticket.ticket_id', read_only=True)
+
+    class Meta:
+        model = EscalationMatch
+        fields = ['id', 'ticket', 'ticket_id', 'due_at', 'fired_at']
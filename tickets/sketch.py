@@ -0,0 +1,86 @@
+# ---------------------------------------------------------
+# DDSKETCH (MERGEABLE QUANTILE SKETCH)
+# ---------------------------------------------------------
+# Values are counted in logarithmic buckets: bucket k holds values in
+# (gamma^(k-1), gamma^k] with gamma = (1 + a) / (1 - a), so any
+# quantile is returned within relative error `a`. Two sketches with
+# the same accuracy merge by adding bucket counts, which makes
+# per-day sketches combinable over any date range.
+import math
+
+# Default relative accuracy (1%) and bucket limit
+RELATIVE_ACCURACY = 0.01
+MAX_BINS = 2048
+
+# Values at or below this are counted as zero
+MIN_VALUE = 1e-9
+
+
+class DDSketch:
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, max_bins=MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value, weight=1):
+        if value <= MIN_VALUE:
+            self.zero_count += weight
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + weight
+        self.count += weight
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('cannot merge sketches with different accuracy')
+        for key, weight in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + weight
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        return self
+
+    def _collapse(self):
+        # Fold the lowest buckets into one: only the smallest values lose accuracy
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        self.bins[excess[-1]] = sum(self.bins.pop(key) for key in excess)
+
+    def quantile(self, q):
+        """
+        Value at quantile q (0..1), or None for an empty sketch.
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                # Midpoint of the bucket in relative terms
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {
+            'accuracy': self.relative_accuracy,
+            'zero': self.zero_count,
+            'bins': {str(key): weight for key, weight in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data.get('accuracy', RELATIVE_ACCURACY))
+        sketch.zero_count = data.get('zero', 0)
+        sketch.bins = {int(key): weight for key, weight in data.get('bins', {}).items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
@@ -0,0 +1,300 @@
+# ---------------------------------------------------------
+# IN-MEMORY COLUMNAR TICKET SNAPSHOT
+# ---------------------------------------------------------
+# Dashboard analytics run as NumPy reductions over a per-process copy
+# of ticket metadata (26 bytes per ticket) instead of SQL aggregates.
+# The snapshot is refreshed from rows whose updated_at moved past the
+# last one seen (at most every TICKET_SNAPSHOT_REFRESH_SECONDS) and
+# fully reloaded every TICKET_SNAPSHOT_RELOAD_SECONDS, which also
+# drops deleted/archived tickets. Deleting tickets calls invalidate(),
+# which replaces a generation token in the shared cache; every process
+# compares it at its next refresh and reloads. One thread per process
+# loads at a time while the others keep serving the previous
+# generation.
+import threading
+import time
+import uuid
+from datetime import datetime, time as dt_time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Ticket
+
+STATUSES = [value for value, _ in Ticket.STATUS_CHOICES]
+PRIORITIES = [value for value, _ in Ticket.PRIORITY_CHOICES]
+STATUS_CODE = {value: code for code, value in enumerate(STATUSES)}
+PRIORITY_CODE = {value: code for code, value in enumerate(PRIORITIES)}
+
+# Stored for a missing assignee/category or an unknown choice value
+NONE = -1
+
+_FIELDS = ('id', 'created_at', 'status', 'priority', 'assigned_to_id', 'category_id', 'updated_at')
+
+_GENERATION_KEY = 'tickets:snapshot:generation'
+
+
+def _shared_generation():
+    # A missing (evicted) token is replaced, which only forces a reload
+    return cache.get_or_set(_GENERATION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def _epoch(value):
+    return int(value.timestamp())
+
+
+class Columns:
+    """
+    One immutable generation of the snapshot: parallel arrays sorted by id.
+    """
+
+    def __init__(self, ids, created, status, priority, assigned, category):
+        self.ids = ids
+        self.created = created
+        self.status = status
+        self.priority = priority
+        self.assigned = assigned
+        self.category = category
+
+    @classmethod
+    def from_rows(cls, rows):
+        rows = sorted(rows)
+        n = len(rows)
+        return cls(
+            np.fromiter((r[0] for r in rows), dtype=np.int64, count=n),
+            np.fromiter((_epoch(r[1]) for r in rows), dtype=np.int64, count=n),
+            np.fromiter((STATUS_CODE.get(r[2], NONE) for r in rows), dtype=np.int8, count=n),
+            np.fromiter((PRIORITY_CODE.get(r[3], NONE) for r in rows), dtype=np.int8, count=n),
+            np.fromiter((NONE if r[4] is None else r[4] for r in rows), dtype=np.int32, count=n),
+            np.fromiter((NONE if r[5] is None else r[5] for r in rows), dtype=np.int32, count=n),
+        )
+
+    def merge(self, delta):
+        """
+        Returns a new generation with `delta` rows updated or appended.
+        """
+        positions = np.searchsorted(self.ids, delta.ids)
+        positions = np.minimum(positions, max(len(self.ids) - 1, 0))
+        known = (self.ids[positions] == delta.ids) if len(self.ids) else np.zeros(len(delta.ids), bool)
+
+        columns = ('created', 'status', 'priority', 'assigned', 'category')
+        merged = {name: getattr(self, name).copy() for name in columns}
+        for name in columns:
+            merged[name][positions[known]] = getattr(delta, name)[known]
+
+        ids = self.ids
+        if not known.all():
+            new = ~known
+            ids = np.concatenate([ids, delta.ids[new]])
+            for name in columns:
+                merged[name] = np.concatenate([merged[name], getattr(delta, name)[new]])
+            order = np.argsort(ids, kind='stable')
+            ids = ids[order]
+            for name in columns:
+                merged[name] = merged[name][order]
+
+        return Columns(ids, **merged)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.ids, self.created, self.status,
+                                      self.priority, self.assigned, self.category))
+
+
+class TicketSnapshot:
+    """
+    Per-process snapshot; `columns()` returns a fresh-enough generation.
+    """
+
+    def __init__(self):
+        self._columns = None
+        self._watermark = None
+        self._generation = None
+        self._refreshed_at = 0.0
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        # Held by the one thread loading; others serve the old columns
+        self._loading = threading.Lock()
+
+    def _fetch(self, since=None):
+        qs = Ticket.objects.order_by()
+        if since is not None:
+            # Re-read a window before the watermark: updated_at is set
+            # before commit, so slow transactions land "in the past"
+            overlap = getattr(settings, 'TICKET_SNAPSHOT_OVERLAP_SECONDS', 60)
+            qs = qs.filter(updated_at__gte=since - timezone.timedelta(seconds=overlap))
+        rows = list(qs.values_list(*_FIELDS).iterator(chunk_size=10000))
+        # Never beyond now, or rows with future timestamps would hide later changes
+        watermark = min(max((r[6] for r in rows), default=since or timezone.now()), timezone.now())
+        return [r[:6] for r in rows], watermark
+
+    def reload(self):
+        # Read first: an invalidation during the fetch triggers another reload
+        generation = _shared_generation()
+        rows, watermark = self._fetch()
+        with self._lock:
+            self._columns = Columns.from_rows(rows)
+            self._watermark = watermark
+            self._generation = generation
+            self._loaded_at = self._refreshed_at = time.monotonic()
+
+    def refresh(self):
+        rows, watermark = self._fetch(self._watermark)
+        with self._lock:
+            if rows:
+                self._columns = self._columns.merge(Columns.from_rows(rows))
+            self._watermark = watermark
+            self._refreshed_at = time.monotonic()
+
+    def invalidate(self):
+        """
+        Forces a reload here and, via the shared cache, in every process.
+        """
+        self._loaded_at = 0.0
+        cache.set(_GENERATION_KEY, uuid.uuid4().hex, None)
+
+    def _due(self):
+        """
+        'reload', 'refresh' or None.
+        """
+        now = time.monotonic()
+        reload_every = getattr(settings, 'TICKET_SNAPSHOT_RELOAD_SECONDS', 900)
+        refresh_every = getattr(settings, 'TICKET_SNAPSHOT_REFRESH_SECONDS', 5)
+
+        if self._columns is None or now - self._loaded_at >= reload_every:
+            return 'reload'
+        if now - self._refreshed_at >= refresh_every:
+            return 'reload' if _shared_generation() != self._generation else 'refresh'
+        return None
+
+    def _update(self):
+        due = self._due()
+        if due == 'reload':
+            self.reload()
+        elif due == 'refresh':
+            self.refresh()
+
+    def columns(self):
+        if self._columns is None:
+            # Nothing to serve yet: wait for the first load
+            with self._loading:
+                if self._columns is None:
+                    self.reload()
+            return self._columns
+
+        if self._due() is not None and self._loading.acquire(blocking=False):
+            try:
+                # Re-checked: another thread may have just finished
+                self._update()
+            finally:
+                self._loading.release()
+        return self._columns
+
+
+_snapshot = TicketSnapshot()
+
+
+def get_columns():
+    return _snapshot.columns()
+
+
+def invalidate():
+    """
+    Forces a full reload on next use (e.g. after tickets were deleted).
+    """
+    _snapshot.invalidate()
+
+
+# ---------------------------------------------------------
+# ANALYTICS
+# ---------------------------------------------------------
+def _local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, dt_time.min))
+
+
+def volume_by_date(days=30):
+    """
+    Tickets created per local calendar day since `days` days ago
+    (days without tickets are omitted).
+    """
+    cols = get_columns()
+    today = timezone.localdate()
+    start = today - timezone.timedelta(days=days)
+    dates = [start + timezone.timedelta(days=offset) for offset in range((today - start).days + 1)]
+    edges = np.array(
+        [_epoch(_local_midnight(d)) for d in dates]
+        + [_epoch(_local_midnight(today + timezone.timedelta(days=1)))],
+        dtype=np.int64
+    )
+
+    created = cols.created[(cols.created >= edges[0]) & (cols.created < edges[-1])]
+    counts = np.bincount(np.searchsorted(edges, created, side='right') - 1, minlength=len(dates))
+    return [
+        {'date': str(day), 'count': int(count)}
+        for day, count in zip(dates, counts)
+        if count
+    ]
+
+
+def sla_breach(hours=24):
+    """
+    (total tickets, tickets still open after `hours`).
+    """
+    cols = get_columns()
+    cutoff = _epoch(timezone.now() - timezone.timedelta(hours=hours))
+    breached = (cols.status == STATUS_CODE['open']) & (cols.created < cutoff)
+    return len(cols.ids), int(np.count_nonzero(breached))
+
+
+def resolved_per_agent():
+    """
+    {agent id: resolved/closed tickets}, most first.
+    """
+    cols = get_columns()
+    done = np.isin(cols.status, [STATUS_CODE['resolved'], STATUS_CODE['closed']])
+    assigned = cols.assigned[done & (cols.assigned != NONE)]
+    counts = np.bincount(assigned) if len(assigned) else np.zeros(0, dtype=np.int64)
+    agents = np.flatnonzero(counts)
+    order = np.argsort(-counts[agents], kind='stable')
+    return {int(agents[i]): int(counts[agents[i]]) for i in order}
+
+
+def _breakdown(cols, codes, size):
+    """
+    Ticket counts per code (rows) and status (columns).
+    Codes must be in range(size).
+    """
+    table = np.zeros((size, len(STATUSES)), dtype=np.int64)
+    valid = (codes >= 0) & (cols.status >= 0)
+    np.add.at(table, (codes[valid], cols.status[valid]), 1)
+    return table
+
+
+def _counts(row):
+    return {'total': int(row.sum()), **dict(zip(STATUSES, map(int, row)))}
+
+
+def by_priority():
+    """
+    Counts per priority, split by status.
+    """
+    cols = get_columns()
+    table = _breakdown(cols, cols.priority, len(PRIORITIES))
+    return [{'priority': priority, **_counts(row)} for priority, row in zip(PRIORITIES, table)]
+
+
+def by_category():
+    """
+    [(category id or None, counts split by status)], largest first.
+    """
+    cols = get_columns()
+    # Shift so NONE (-1, uncategorised) lands in row 0
+    codes = cols.category.astype(np.int64) + 1
+    table = _breakdown(cols, codes, int(codes.max(initial=0)) + 1)
+
+    totals = table.sum(axis=1)
+    rows = np.flatnonzero(totals)
+    rows = rows[np.argsort(-totals[rows], kind='stable')]
+    return [(None if row == 0 else int(row - 1), _counts(table[row])) for row in rows]
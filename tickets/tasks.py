@@ -1,8 +1,12 @@
 # CELERY & DJANGO IMPORTS
+import logging
+
 from celery import shared_task  # Allows defining reusable Celery background tasks
 
-from django.core.mail import send_mail  # Used to send notification emails
+from django.core.mail import send_mail, send_mass_mail  # Used to send notification emails
 from django.conf import settings        # Access project email settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
 
 # ---------------------------
 # APP MODELS
@@ -11,39 +15,80 @@ from .models import (
     Ticket,
     MLPredictionHistory,
     SLAReport,
-    TicketActivity
+    TicketActivity,
+    IncidentCluster
 )
 
 from users.models import User  # User model for agent assignment
+from ticketing.db_router import read_from_replica  # reporting reads
+from .locks import singleton  # at most one run of batch tasks
 
 # ---------------------------
 # ML MODELS
 # ---------------------------
-from .ml.model import predict_priority            # Rule-based ML prediction
+from .ml.registry import predict_ticket_priority  # Trained model, rule-based fallback
+from .ml.cache import content_hash
+from .ml.serving import get_urgency_model, publish_urgency_model, score_urgency
 from .ml.tfidf_model import (
-    fit_model_on_tickets,
-    predict_scores_for_tickets
+    HIGH_THRESHOLD,
+    MEDIUM_THRESHOLD,
+    score_to_priority
 )
 
+logger = logging.getLogger(__name__)
+
+# Broker message priority per ticket priority (Redis: 0 is served first)
+TICKET_TASK_PRIORITY = {'high': 0, 'medium': 3, 'low': 6}
+
+# Ack after the task finished and redeliver it if the worker died.
+# Only for tasks that are safe to run twice: emails, assignment and
+# report rows would be duplicated, so those keep the early ack.
+REDELIVER_ON_CRASH = {'acks_late': True, 'reject_on_worker_lost': True}
+
+
+def enqueue_for_ticket(task, ticket, *args, **kwargs):
+    """
+    Queues a per-ticket task so work for urgent tickets
+    overtakes work for routine ones in the same queue.
+    """
+    return task.apply_async(
+        (ticket.id, *args),
+        kwargs,
+        priority=TICKET_TASK_PRIORITY.get(ticket.priority, settings.CELERY_TASK_DEFAULT_PRIORITY)
+    )
+
 
 # =====================================================
 # PRIORITY PREDICTION TASK (RULE-BASED ML)
 # =====================================================
-@shared_task
+@shared_task(**REDELIVER_ON_CRASH)
 def enqueue_priority_prediction(ticket_id):
     """
-    Predicts ticket priority using keyword-based ML logic
-    and stores prediction history.
+    Predicts ticket priority using the active trained model
+    (keyword rules if none is registered) and stores prediction
+    history with the model version actually used.
+    Unchanged text (same content hash as the latest prediction by
+    the same model version) is skipped without writing history; a
+    newly activated model still rescores it.
     Runs asynchronously to avoid blocking API response.
     """
     try:
         ticket = Ticket.objects.get(id=ticket_id)
 
-        # Combine title + description for prediction
-        pred, score = predict_priority(
-            (ticket.title or '') + ' ' + (ticket.description or '')
+        # Predict from title + description (cached by content hash)
+        pred, score, version, text_hash = predict_ticket_priority(
+            ticket.title, ticket.description
         )
 
+        latest_hash = (
+            ticket.predictions.filter(model_version=version)
+            .order_by('-run_at')
+            .values_list('content_hash', flat=True)
+            .first()
+        )
+        if latest_hash == text_hash:
+            return 'unchanged'
+
         # Update ticket priority
         ticket.priority = pred
         ticket.save()
@@ -53,11 +98,14 @@ def enqueue_priority_prediction(ticket_id):
             ticket=ticket,
             predicted_priority=pred,
             confidence_score=score,
-            model_version='v1'
+            model_version=version,
+            content_hash=text_hash
         )
 
-    except Exception as e:
-        print('priority task error:', e)
+    except Exception:
+        # Re-raise so Celery records the failure (task telemetry)
+        logger.exception('priority task error (ticket %s)', ticket_id)
+        raise
 
 
 # =====================================================
@@ -86,8 +134,47 @@ def send_ticket_created_email(ticket_id):
             [ticket.created_by.email]
         )
 
-    except Exception as e:
-        print("Email sending failed:", e)
+    except Exception:
+        logger.exception('Email sending failed (ticket %s)', ticket_id)
+        raise
+
+
+# =====================================================
+# BULK UPDATE NOTIFICATION TASK
+# =====================================================
+@shared_task
+def send_bulk_update_notification(ticket_ids, changes):
+    """
+    Sends one email per ticket creator summarising all of their
+    tickets changed by a bulk update.
+    """
+    try:
+        by_creator = {}
+        tickets = (
+            Ticket.objects.filter(id__in=ticket_ids)
+            .select_related('created_by')
+            .only('ticket_id', 'title', 'created_by__email')
+        )
+        for ticket in tickets:
+            by_creator.setdefault(ticket.created_by.email, []).append(ticket)
+
+        summary = ', '.join(f'{key}: {value}' for key, value in changes.items())
+        messages = [
+            (
+                f"{len(tickets)} of your tickets were updated",
+                f"The following tickets were updated ({summary}):\n\n"
+                + '\n'.join(f"{t.ticket_id} - {t.title}" for t in tickets),
+                settings.DEFAULT_FROM_EMAIL,
+                [email],
+            )
+            for email, tickets in by_creator.items()
+            if email
+        ]
+        return send_mass_mail(messages)
+
+    except Exception:
+        logger.exception('bulk notification failed (%d tickets)', len(ticket_ids))
+        raise
 
 
 # =====================================================
@@ -121,14 +208,16 @@ def auto_assign_agent(ticket_id):
                 new_status=ticket.status
             )
 
-    except Exception as e:
-        print('auto assign error:', e)
+    except Exception:
+        logger.exception('auto assign error (ticket %s)', ticket_id)
+        raise
 
 
 # =====================================================
 # DAILY SLA REPORT TASK
 # =====================================================
 @shared_task
+@singleton('sla-report')
 def generate_daily_sla_report():
     """
     Generates daily SLA report containing
@@ -137,8 +226,9 @@ def generate_daily_sla_report():
     from django.utils import timezone
 
     today = timezone.now().date()
-    total = Ticket.objects.count()
-    breached = Ticket.objects.filter(status='open').count()
+    with read_from_replica():
+        total = Ticket.objects.count()
+        breached = Ticket.objects.filter(status='open').count()
 
     SLAReport.objects.create(
         report_date=today,
@@ -151,61 +241,243 @@ def generate_daily_sla_report():
 # =====================================================
 # TF-IDF BASED PRIORITY RANKING TASK
 # =====================================================
-@shared_task
-def run_tfidf_ranking(threshold_high=0.35, threshold_med=0.18, limit=1000):
+@shared_task(**REDELIVER_ON_CRASH)
+@singleton('tfidf-ranking')
+def run_tfidf_ranking(threshold_high=HIGH_THRESHOLD, threshold_med=MEDIUM_THRESHOLD, limit=1000):
     """
     Uses TF-IDF cosine similarity to rank ticket urgency.
     Assigns priority based on similarity score thresholds.
+    Scores against the shared, memory-mapped urgency model
+    (published by publish_tfidf_model) and skips tickets whose
+    text is unchanged since their last prediction by that model.
     """
     try:
-        # Fetch latest tickets
+        model = get_urgency_model()
+        if model is None:
+            # First run: publish a model fitted on the current window
+            publish_tfidf_model(limit=limit)
+            model = get_urgency_model()
+        version = model.version
+
+        # Fetch latest tickets with the hash of their last prediction
+        last_hash = (
+            MLPredictionHistory.objects.filter(
+                ticket=OuterRef('pk'),
+                model_version=version
+            )
+            .order_by('-run_at')
+            .values('content_hash')[:1]
+        )
         tickets = list(
-            Ticket.objects.all().order_by('-created_at')[:limit]
+            Ticket.objects.annotate(last_hash=Subquery(last_hash))
+            .order_by('-created_at')[:limit]
         )
 
-        # Prepare text corpus
-        texts = [
-            (t.title or '') + ' ' + (t.description or '')
-            for t in tickets
-        ]
-
-        if not texts:
+        if not tickets:
             return 'no tickets'
 
-        # Train TF-IDF model
-        fit_model_on_tickets(texts)
+        # Keep only tickets whose text changed since the last run
+        changed = []
+        for ticket in tickets:
+            text_hash = content_hash(ticket.title, ticket.description, version)
+            if ticket.last_hash != text_hash:
+                changed.append((ticket, text_hash))
 
-        # Predict urgency scores
-        scores = predict_scores_for_tickets(texts)
+        if not changed:
+            return f'processed 0 of {len(tickets)} tickets (unchanged)'
 
-        for ticket, score in zip(tickets, scores):
+        # Predict urgency scores for changed tickets only
+        scores = score_urgency(model, [
+            (t.title or '') + ' ' + (t.description or '')
+            for t, _ in changed
+        ])
 
-            # Skip manually assigned priorities
-            if ticket.priority in ['high', 'medium', 'low']:
-                continue
+        history = []
+        for (ticket, text_hash), score in zip(changed, scores):
 
             # Determine priority based on score
-            if score >= threshold_high:
-                pred = 'high'
-            elif score >= threshold_med:
-                pred = 'medium'
-            else:
-                pred = 'low'
-
-            # Save prediction history
-            MLPredictionHistory.objects.create(
+            pred = score_to_priority(score, threshold_high, threshold_med)
+
+            # Save prediction history (also marks this text as scored)
+            history.append(MLPredictionHistory(
                 ticket=ticket,
                 predicted_priority=pred,
                 confidence_score=float(score),
-                model_version='tfidf-v1'
-            )
+                model_version=version,
+                content_hash=text_hash
+            ))
+
+            # Skip manually assigned priorities
+            if ticket.priority in ['high', 'medium', 'low']:
+                continue
 
             # Update ticket priority
             ticket.priority = pred
             ticket.save()
 
-        return f'processed {len(tickets)} tickets'
+        MLPredictionHistory.objects.bulk_create(history)
+
+        return f'processed {len(changed)} of {len(tickets)} tickets'
+
+    except Exception:
+        logger.exception('tfidf ranking error')
+        raise
+
+
+# =====================================================
+# PUBLISH SHARED TF-IDF MODEL TASK
+# =====================================================
+@shared_task(**REDELIVER_ON_CRASH)
+@singleton('publish-tfidf-model')
+def publish_tfidf_model(limit=5000):
+    """
+    Fits the TF-IDF urgency model once on recent tickets and
+    publishes it as a memory-mapped artifact shared by all workers.
+    """
+    texts = [
+        (title or '') + ' ' + (description or '')
+        for title, description in (
+            Ticket.objects.order_by('-created_at')
+            .values_list('title', 'description')[:limit]
+        )
+    ]
+    return publish_urgency_model(texts)
+
+
+# =====================================================
+# NEAR-DUPLICATE INDEX REBUILD TASK
+# =====================================================
+@shared_task(**REDELIVER_ON_CRASH)
+@singleton('rebuild-duplicate-index')
+def rebuild_duplicate_index():
+    """
+    Rebuilds and persists the near-duplicate index so that
+    resolved tickets drop out and restarts load a fresh copy.
+    """
+    from .duplicates import rebuild_index
+
+    return f'indexed {rebuild_index()} tickets'
+
+
+# =====================================================
+# INCIDENT CLUSTERING TASK
+# =====================================================
+@shared_task(**REDELIVER_ON_CRASH)
+@singleton('cluster-incidents')
+def cluster_incidents(window_hours=None, limit=100000, min_size=None):
+    """
+    Clusters recent open tickets on their TF-IDF vectors
+    (mini-batch k-means) and stores clusters with keywords
+    so admins can spot ticket storms.
+    """
+    from django.utils import timezone
+    from .ml.clustering import cluster_texts
+
+    window_hours = window_hours or settings.INCIDENT_CLUSTER_WINDOW_HOURS
+    min_size = min_size or settings.INCIDENT_CLUSTER_MIN_SIZE
+
+    run_at = timezone.now()
+    with read_from_replica():
+        rows = list(
+            Ticket.objects.filter(
+                status='open',
+                created_at__gte=run_at - timezone.timedelta(hours=window_hours)
+            )
+            .order_by('-created_at')
+            .values_list('id', 'title', 'description', 'created_at')[:limit]
+        )
+
+    clusters = cluster_texts(
+        [(title or '') + ' ' + (description or '') for _, title, description, _ in rows],
+        min_size=min_size
+    )
+
+    # Readers see the previous run or this one complete, never a mix
+    Membership = IncidentCluster.tickets.through
+    memberships = []
+    with transaction.atomic():
+        for found in clusters:
+            created = [rows[i][3] for i in found['members']]
+            cluster = IncidentCluster.objects.create(
+                run_at=run_at,
+                label=found['label'],
+                size=len(found['members']),
+                keywords=found['keywords'],
+                cohesion=found['cohesion'],
+                representative_id=rows[found['representative']][0],
+                first_seen=min(created),
+                last_seen=max(created),
+            )
+            memberships.extend(
+                Membership(incidentcluster_id=cluster.id, ticket_id=rows[i][0])
+                for i in found['members']
+            )
+        Membership.objects.bulk_create(memberships, batch_size=5000)
+
+        # Keep only the most recent runs
+        keep = (
+            IncidentCluster.objects.values_list('run_at', flat=True)
+            .distinct().order_by('-run_at')[:settings.INCIDENT_CLUSTER_KEEP_RUNS]
+        )
+        IncidentCluster.objects.exclude(run_at__in=list(keep)).delete()
+
+    return f'{len(clusters)} clusters from {len(rows)} tickets'
+
+
+# =====================================================
+# ARCHIVE OLD CLOSED TICKETS TASK
+# =====================================================
+@shared_task(**REDELIVER_ON_CRASH)
+@singleton('archive-closed-tickets', ttl=3600)
+def archive_closed_tickets(days=None, batch_size=500):
+    """
+    Moves tickets resolved/closed more than `days` ago
+    (with their activities and predictions) to the archive.
+    """
+    from .archive import archive_closed_tickets as archive
+
+    days = days or settings.TICKET_ARCHIVE_AFTER_DAYS
+    return f'archived {archive(days, batch_size)} tickets'
+
+
+# =====================================================
+# ANALYTICS WAREHOUSE EXPORT TASK
+# =====================================================
+@shared_task(**REDELIVER_ON_CRASH)
+@singleton('export-warehouse', ttl=3600)
+def export_warehouse():
+    """
+    Rebuilds the Parquet analytics warehouse used by ad-hoc reports.
+    """
+    from .warehouse import export
+
+    counts = export()
+    return ', '.join(f'{rows} {name}' for name, rows in counts.items())
+
+
+# =====================================================
+# ESCALATION RULE TASKS
+# =====================================================
+@shared_task(**REDELIVER_ON_CRASH)
+def fire_escalations(ticket_ids=None):
+    """
+    Applies due escalations (of the given tickets, or all due ones).
+    Concurrent runs skip each other's matches, so no singleton lock.
+    """
+    from .escalation import fire
+
+    return f'fired {fire(ticket_ids)} escalations'
+
+
+@shared_task(**REDELIVER_ON_CRASH)
+def schedule_escalation_rule(rule_id):
+    """
+    Matches a new or edited rule against the actionable tickets.
+    """
+    from .escalation import schedule_rule
+    from .models import EscalationRule
 
-    except Exception as e:
-        print('tfidf ranking error:', e)
-        return str(e)
+    rule = EscalationRule.objects.filter(id=rule_id, is_active=True).first()
+    if rule is None:
+        return 'inactive'
+    return f'{schedule_rule(rule)} tickets due now'
@@ -0,0 +1,26 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import User
+
+
+class DateBoundTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pw', role='admin'))
+
+    def test_latency_and_reports_reject_the_same_malformed_dates(self):
+        for url, params in (
+            ('/api/tickets/tickets/analytics/', {'action': 'resolution_time'}),
+            ('/api/tickets/reports/', {'dataset': 'tickets'}),
+        ):
+            for name, value in (('since', '2026-13-01'), ('until', 'yesterday')):
+                response = self.client.get(url, {**params, name: value})
+                self.assertEqual(response.status_code, 400, url)
+                self.assertEqual(response.json(), {'detail': f'{name} must be a YYYY-MM-DD date'})
+
+    def test_latency_defaults_to_the_last_30_days(self):
+        response = self.client.get('/api/tickets/tickets/analytics/', {'action': 'resolution_time'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
@@ -0,0 +1,75 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tickets.archive import archive_closed_tickets, get_archived
+from tickets.models import ArchivedAttachment, Attachment, Ticket, TicketArchive
+from users.models import User
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), ATTACHMENT_SENDFILE='')
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', password='pw')
+        self.ticket = Ticket.objects.create(
+            ticket_id='T-ARCHIVE-1', title='Old outage', description='Long fixed.',
+            status='closed', created_by=self.user,
+        )
+        Ticket.objects.filter(pk=self.ticket.pk).update(
+            updated_at=timezone.now() - timezone.timedelta(days=400)
+        )
+        self.attachment = Attachment.objects.create(
+            ticket=self.ticket, file=SimpleUploadedFile('log.txt', b'stack trace')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_archived_attachments_stay_downloadable(self):
+        path = self.attachment.file.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(archive_closed_tickets(days=30), 1)
+
+        self.assertFalse(Ticket.objects.filter(pk=self.ticket.pk).exists())
+        self.assertTrue(os.path.exists(path))
+
+        response = self.client.get(f'/api/tickets/tickets/{self.ticket.pk}/')
+        [attachment] = response.json()['attachments']
+        self.assertEqual(attachment['id'], self.attachment.pk)
+        self.assertEqual(attachment['name'], os.path.basename(path))
+
+        # The signed link from the archived document, and the plain one
+        for url in (attachment['file'], f'/api/tickets/attachments/{self.attachment.pk}/download/'):
+            download = self.client.get(url)
+            self.assertEqual(download.status_code, 200, url)
+            self.assertEqual(b''.join(download.streaming_content), b'stack trace')
+
+    def test_archived_attachments_are_limited_to_viewers(self):
+        archive_closed_tickets(days=30)
+        stranger = User.objects.create_user(username='stranger', password='pw')
+        self.client.force_authenticate(stranger)
+
+        response = self.client.get(f'/api/tickets/attachments/{self.attachment.pk}/download/')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_a_failed_batch_keeps_rows_and_files(self):
+        path = self.attachment.file.path
+
+        with mock.patch.object(ArchivedAttachment.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                archive_closed_tickets(days=30)
+
+        self.assertTrue(Ticket.objects.filter(pk=self.ticket.pk).exists())
+        self.assertTrue(Attachment.objects.filter(pk=self.attachment.pk).exists())
+        self.assertFalse(TicketArchive.objects.exists())
+        self.assertTrue(os.path.exists(path))
+
+    def test_non_numeric_pk_is_not_found(self):
+        self.assertIsNone(get_archived('abc'))
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tickets import escalation, workqueue
+from tickets.bulk import apply_changes
+from tickets.models import EscalationRule, Ticket, WorkQueueEntry
+from users.models import User
+
+
+class BulkUpdateTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent', password='pw', role='agent')
+        self.other = User.objects.create_user(username='other', password='pw', role='agent')
+        self.tickets = [
+            Ticket.objects.create(
+                ticket_id=f'T-BULK-{i}', title='Mail bounce', description='550.',
+                created_by=self.agent, assigned_to=self.agent,
+            )
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent)
+
+    def _bulk(self, **data):
+        return self.client.post('/api/tickets/tickets/bulk/', data, format='json')
+
+    def test_claims_survive_a_bulk_update(self):
+        entry = workqueue.claim(self.agent)
+
+        response = self._bulk(ids=[t.pk for t in self.tickets], changes={'priority': 'high'})
+
+        self.assertEqual(response.json()['updated'], 3)
+        entry = WorkQueueEntry.objects.get(pk=entry.pk)
+        self.assertEqual(entry.claimed_by, self.agent)
+        self.assertEqual(entry.priority_rank, workqueue.PRIORITY_RANK['high'])
+
+    def test_resolving_in_bulk_removes_queue_entries(self):
+        self._bulk(ids=[self.tickets[0].pk], changes={'status': 'resolved'})
+
+        self.assertFalse(WorkQueueEntry.objects.filter(ticket=self.tickets[0]).exists())
+        self.assertEqual(WorkQueueEntry.objects.filter(ticket__in=self.tickets).count(), 2)
+
+    @override_settings(BULK_UPDATE_MAX_TICKETS=2)
+    def test_selection_over_the_limit_is_rejected(self):
+        response = self._bulk(filter={'status': 'open'}, changes={'priority': 'high'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Ticket.objects.filter(priority='high').exists())
+
+    def test_tickets_reassigned_after_selection_are_skipped(self):
+        ticket = self.tickets[0]
+        Ticket.objects.filter(pk=ticket.pk).update(assigned_to=self.other)
+
+        changed = apply_changes(self.agent, [ticket.pk], {'priority': 'high'})
+
+        self.assertEqual(changed, [])
+        self.assertEqual(Ticket.objects.get(pk=ticket.pk).priority, 'low')
+
+    def test_escalations_are_queued_only_after_commit(self):
+        EscalationRule.objects.create(
+            name='Urgent', conditions=[{'field': 'priority', 'op': 'eq', 'value': 'high'}],
+            actions={'status': 'in_progress'},
+        )
+        escalation.invalidate()
+        self.addCleanup(escalation.invalidate)
+        ids = [t.pk for t in self.tickets]
+
+        with mock.patch('tickets.tasks.fire_escalations.delay') as delay, \
+                mock.patch('tickets.tasks.send_bulk_update_notification.delay'):
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        apply_changes(self.agent, ids, {'priority': 'high'})
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+            delay.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    apply_changes(self.agent, ids, {'priority': 'high'})
+                    delay.assert_not_called()
+            delay.assert_called_once_with(ids)
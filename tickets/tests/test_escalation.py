@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from tickets import escalation
+from tickets.models import EscalationMatch, EscalationRule, Ticket, TicketActivity
+from users.models import User
+
+
+class EscalationTests(TestCase):
+    def setUp(self):
+        # Compiled rules are cached per process; later tests must not see these
+        self.addCleanup(escalation.invalidate)
+        self.user = User.objects.create_user(username='reporter', password='pw', role='user')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ticket = Ticket.objects.create(
+                ticket_id='T-ESC-1', title='Slow login', description='Takes a minute.', created_by=self.user,
+            )
+
+    def _rule(self, conditions, actions):
+        rule = EscalationRule.objects.create(
+            name='Escalate', conditions=escalation.validate_conditions(conditions), actions=actions,
+        )
+        escalation.invalidate()
+        return rule
+
+    def _save(self, **values):
+        """
+        Saves the change, then fires what it queued the way the
+        fire_escalations task would, without a broker.
+        """
+        ticket = Ticket.objects.get(pk=self.ticket.pk)
+        for name, value in values.items():
+            setattr(ticket, name, value)
+        with mock.patch('tickets.tasks.fire_escalations.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                ticket.save()
+        delay.assert_called_once_with([ticket.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            escalation.fire(*delay.call_args.args)
+        return Ticket.objects.get(pk=self.ticket.pk)
+
+    def test_text_and_creator_conditions_fire_on_change(self):
+        self._rule([{'field': 'title', 'op': 'contains', 'value': 'outage'}], {'priority': 'high'})
+        other = User.objects.create_user(username='vip', password='pw', role='user')
+        self._rule([{'field': 'created_by', 'op': 'eq', 'value': other.pk}], {'status': 'in_progress'})
+
+        ticket = self._save(title='Login outage')
+        self.assertEqual(ticket.priority, 'high')
+
+        ticket = self._save(created_by=other)
+        self.assertEqual(ticket.status, 'in_progress')
+        self.assertEqual(EscalationMatch.objects.filter(fired_at__isnull=False).count(), 2)
+
+    def test_firing_records_one_activity_per_status_change(self):
+        self._rule([{'field': 'priority', 'op': 'eq', 'value': 'high'}], {'status': 'in_progress'})
+
+        self._save(priority='high')
+
+        activities = TicketActivity.objects.filter(ticket=self.ticket)
+        self.assertEqual(
+            list(activities.values_list('old_status', 'new_status')),
+            [('open', 'in_progress')],
+        )
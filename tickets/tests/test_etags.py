@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tickets.models import Category, Ticket
+from users.models import User
+
+
+class TicketETagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', password='pw', role='agent')
+        self.category = Category.objects.create(name='Network')
+        self.ticket = Ticket.objects.create(
+            ticket_id='T-ETAG-1', title='Wi-Fi drops', description='Every hour.',
+            category=self.category, created_by=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/tickets/tickets/{self.ticket.pk}/'
+
+    def _revalidate(self):
+        etag = self.client.get(self.url)['ETag']
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_unchanged_ticket_is_not_modified(self):
+        self.assertEqual(self._revalidate(), 304)
+        self.assertEqual(self._revalidate(), 304)
+
+    def test_category_rename_changes_the_tag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.category.name = 'Wireless'
+        self.category.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['category']['name'], 'Wireless')
+
+    def test_user_change_changes_the_tag_but_login_does_not(self):
+        etag = self.client.get(self.url)['ETag']
+        self.user.last_login = self.user.date_joined
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.user.username = 'renamed'
+        self.user.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_saves_that_change_nothing_shown_keep_the_tag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.user.set_password('new-pw')
+        self.user.save()
+        self.category.save()
+        User.objects.create_user(username='newcomer', password='pw')
+        Category.objects.create(name='Billing')
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.user.role = 'admin'
+        self.user.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tickets import escalation
+from tickets.models import EscalationMatch, EscalationRule, Ticket, TicketEvent
+from users.models import User
+
+
+class TicketEventTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='agent', password='pw', role='agent')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ticket = Ticket.objects.create(
+                ticket_id='T-EVENTS-1', title='Printer on fire', description='Smoke.',
+                created_by=self.user,
+            )
+
+    def _changes(self):
+        return list(
+            TicketEvent.objects.filter(ticket=self.ticket).order_by('seq').values_list('kind', 'changes')
+        )
+
+    def test_events_of_a_rolled_back_savepoint_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.ticket.status = 'in_progress'
+                self.ticket.save()
+                try:
+                    with transaction.atomic():
+                        self.ticket.priority = 'high'
+                        self.ticket.save()
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                self.ticket.category = None
+                self.ticket.assigned_to = self.user
+                self.ticket.save()
+
+        changes = [c for kind, c in self._changes() if kind == TicketEvent.CHANGED]
+        self.assertEqual(changes, [
+            {'status': ['open', 'in_progress']},
+            {'assigned_to': [None, self.user.pk]},
+        ])
+
+    def test_events_of_a_released_savepoint_are_kept_in_order(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                with transaction.atomic():
+                    self.ticket.status = 'waiting'
+                    self.ticket.save()
+                self.ticket.priority = 'high'
+                self.ticket.save()
+
+        changes = [c for kind, c in self._changes() if kind == TicketEvent.CHANGED]
+        self.assertEqual(changes, [
+            {'status': ['open', 'waiting']},
+            {'priority': ['low', 'high']},
+        ])
+
+    def test_events_cannot_be_updated_or_deleted(self):
+        events = TicketEvent.objects.filter(ticket=self.ticket)
+        self.assertTrue(events.exists())
+        with self.assertRaises(ValueError):
+            events.update(changes={})
+        with self.assertRaises(ValueError):
+            events.delete()
+        with self.assertRaises(ValueError):
+            events.first().delete()
+
+    def test_deleting_the_actor_keeps_the_events(self):
+        other = User.objects.create_user(username='gone', password='pw')
+        TicketEvent.objects.create(ticket=self.ticket, seq=99, actor=other, changes={})
+
+        other.delete()
+
+        self.assertIsNone(TicketEvent.objects.get(ticket=self.ticket, seq=99).actor_id)
+
+    def test_timeline_with_non_numeric_id_is_not_found(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        self.assertEqual(client.get('/api/tickets/tickets/abc/timeline/').status_code, 404)
+        response = client.get(f'/api/tickets/tickets/{self.ticket.pk}/timeline/')
+        self.assertEqual([e['kind'] for e in response.json()], [TicketEvent.CREATED])
+
+    def test_events_are_written_in_the_saving_transaction(self):
+        with transaction.atomic():
+            self.ticket.status = 'waiting'
+            self.ticket.save()
+            # Visible before the commit, not inserted after it
+            self.assertTrue(TicketEvent.objects.filter(ticket=self.ticket, changes__has_key='status').exists())
+
+    def test_broker_outage_does_not_fail_a_committed_save(self):
+        EscalationRule.objects.create(
+            name='Urgent', conditions=[{'field': 'priority', 'op': 'eq', 'value': 'high'}],
+            actions={'status': 'in_progress'},
+        )
+        escalation.invalidate()
+        self.addCleanup(escalation.invalidate)
+
+        with mock.patch('tickets.tasks.fire_escalations.delay', side_effect=ConnectionError) as delay, \
+                self.assertLogs('tickets.escalation', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.ticket.priority = 'high'
+                self.ticket.save()
+
+        delay.assert_called_once_with([self.ticket.pk])
+        # Left for the minutely fire_escalations run
+        self.assertTrue(EscalationMatch.objects.filter(ticket=self.ticket, fired_at__isnull=True).exists())
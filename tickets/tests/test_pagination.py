@@ -0,0 +1,35 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tickets.models import Ticket
+from tickets.views import TicketPagination
+from users.models import User
+
+
+class TicketPaginationTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='reporter', password='pw')
+        for n in range(3):
+            Ticket.objects.create(
+                ticket_id=f'T-PAGE-{n}', title=f'Issue {n}', description='...', created_by=user,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_lists_are_unpaginated_without_a_limit(self):
+        for url in ('/api/tickets/tickets/', '/api/tickets/tickets/list/'):
+            self.assertEqual(len(self.client.get(url).json()), 3, url)
+
+    def test_limit_and_offset_page_the_lists(self):
+        for url in ('/api/tickets/tickets/', '/api/tickets/tickets/list/'):
+            page = self.client.get(url, {'limit': 2, 'offset': 2}).json()
+            self.assertEqual(page['count'], 3, url)
+            self.assertEqual([t['ticket_id'] for t in page['results']], ['T-PAGE-0'], url)
+
+    def test_limit_is_capped(self):
+        with mock.patch.object(TicketPagination, 'max_limit', 1):
+            page = self.client.get('/api/tickets/tickets/', {'limit': 50}).json()
+
+        self.assertEqual(len(page['results']), 1)
@@ -0,0 +1,35 @@
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from tickets.ml import registry
+from tickets.ml.serving import get_urgency_model, publish_urgency_model
+from tickets.models import MLModelVersion
+
+TEXTS = ['Server down, urgent', 'Printer out of paper', 'Cannot log in to VPN']
+
+
+class PublishUrgencyModelTests(TestCase):
+    def setUp(self):
+        override = override_settings(ML_MODEL_DIR=Path(tempfile.mkdtemp()))
+        override.enable()
+        self.addCleanup(override.disable)
+        # Loaded models are cached per process; later tests must not see these
+        self.addCleanup(registry._loaded.clear)
+
+    def _directories(self):
+        return sorted(path.name for path in settings.ML_MODEL_DIR.glob('tfidf-*'))
+
+    def test_only_the_current_and_previous_artifacts_are_kept(self):
+        first = publish_urgency_model(TEXTS)
+        second = publish_urgency_model(TEXTS)
+        self.assertEqual(self._directories(), [first, second])
+
+        third = publish_urgency_model(TEXTS)
+
+        self.assertEqual(self._directories(), [second, third])
+        self.assertEqual(get_urgency_model().version, third)
+        # Registry rows are kept for auditing
+        self.assertEqual(MLModelVersion.objects.filter(version__startswith='tfidf-').count(), 3)
@@ -0,0 +1,87 @@
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tickets import snapshot
+from tickets.models import Ticket
+from tickets.snapshot import TicketSnapshot
+from users.models import User
+
+
+@override_settings(TICKET_SNAPSHOT_REFRESH_SECONDS=0)
+class TicketSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='admin', password='pw', role='admin')
+        self.tickets = [
+            Ticket.objects.create(
+                ticket_id=f'T-SNAP-{i}', title='Slow VPN', description='Again.', created_by=self.user,
+            )
+            for i in range(2)
+        ]
+
+    def _ids(self, snap):
+        return sorted(snap.columns().ids.tolist())
+
+    def test_invalidation_reaches_other_processes(self):
+        # Two instances stand in for two processes sharing the cache
+        here, there = TicketSnapshot(), TicketSnapshot()
+        self.assertEqual(len(self._ids(there)), 2)
+
+        self.tickets[0].delete()
+        # A refresh alone cannot see a deleted row
+        self.assertEqual(len(self._ids(there)), 2)
+        here.invalidate()
+
+        self.assertEqual(self._ids(there), [self.tickets[1].pk])
+
+    def test_deleting_through_the_api_invalidates(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        snapshot.get_columns()
+
+        response = client.delete(f'/api/tickets/tickets/{self.tickets[0].pk}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(sorted(snapshot.get_columns().ids.tolist()), [self.tickets[1].pk])
+
+    def test_stale_generation_is_served_while_another_thread_loads(self):
+        snap = TicketSnapshot()
+        stale = snap.columns()
+        snap.invalidate()
+
+        loading, release = threading.Event(), threading.Event()
+        # Fetched up front: the test database is not shared with threads
+        fetched = snap._fetch()
+
+        def slow_fetch(since=None):
+            loading.set()
+            release.wait(5)
+            return fetched
+
+        with mock.patch.object(snap, '_fetch', side_effect=slow_fetch) as patched:
+            loader = threading.Thread(target=snap.columns)
+            loader.start()
+            loading.wait(5)
+            # Not blocked on, and not repeated by, the concurrent caller
+            self.assertIs(snap.columns(), stale)
+            release.set()
+            loader.join()
+
+            self.assertEqual(patched.call_count, 1)
+            self.assertIsNot(snap.columns(), stale)
+
+    @override_settings(TIME_ZONE='Pacific/Kiritimati')
+    def test_volume_window_uses_local_days(self):
+        # 02:00 on Jan 2 locally (UTC+14) is still Jan 1 in UTC
+        now = datetime(2026, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+        Ticket.objects.filter(pk=self.tickets[0].pk).update(created_at=now - timedelta(hours=1))
+        Ticket.objects.filter(pk=self.tickets[1].pk).update(created_at=now - timedelta(hours=8))
+        snapshot.invalidate()
+
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            self.assertEqual(snapshot.volume_by_date(days=0), [{'date': '2026-01-02', 'count': 1}])
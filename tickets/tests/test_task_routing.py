@@ -0,0 +1,75 @@
+import time
+
+from django.test import SimpleTestCase
+
+from ticketing.celery import app
+from tickets import tasks
+
+
+class InMemoryBrokerRoutingTests(SimpleTestCase):
+    """
+    Publishes through the real routing configuration to kombu's
+    in-memory transport and consumes the way the per-queue workers
+    in the Procfile do.
+    """
+
+    def setUp(self):
+        self.connection = app.connection_for_write('memory://')
+        self.addCleanup(self.connection.release)
+        # The memory transport is shared by every connection in the process
+        for queue in app.amqp.queues.values():
+            bound = queue(self.connection.default_channel)
+            bound.declare()
+            bound.purge()
+
+    def _publish(self, name, *args, **options):
+        app.send_task(name, args, connection=self.connection, ignore_result=True, **options)
+
+    def _depth(self, queue):
+        return self.connection.default_channel.queue_declare(queue=queue, passive=True).message_count
+
+    def _next_assignment(self):
+        """
+        Seconds until an assignment-only consumer receives its task.
+        """
+        started = time.perf_counter()
+        with self.connection.SimpleQueue(app.amqp.queues['assignment']) as queue:
+            message = queue.get(timeout=1)
+            message.ack()
+        self.assertEqual(message.headers['task'], 'tickets.tasks.auto_assign_agent')
+        return time.perf_counter() - started
+
+    def test_tasks_are_routed_to_their_queues(self):
+        routes = {
+            'tickets.tasks.auto_assign_agent': 'assignment',
+            'tickets.tasks.enqueue_priority_prediction': 'ml',
+            'tickets.tasks.run_tfidf_ranking': 'ml',
+            'tickets.tasks.send_ticket_created_email': 'notifications',
+            'tickets.tasks.generate_daily_sla_report': 'default',
+        }
+        for name in routes:
+            self._publish(name, 1)
+
+        for queue in set(routes.values()):
+            self.assertEqual(self._depth(queue), list(routes.values()).count(queue), queue)
+
+    def test_assignment_is_not_delayed_by_an_ml_backlog(self):
+        self._publish('tickets.tasks.auto_assign_agent', 1)
+        idle = self._next_assignment()
+
+        for i in range(2000):
+            self._publish('tickets.tasks.enqueue_priority_prediction', i)
+        self._publish('tickets.tasks.run_tfidf_ranking')
+        self._publish('tickets.tasks.auto_assign_agent', 2)
+        busy = self._next_assignment()
+
+        self.assertEqual(self._depth('ml'), 2001)
+        self.assertEqual(self._depth('assignment'), 0)
+        # Waits on its own queue only: no scan of the ML backlog
+        self.assertLess(busy, max(idle * 20, 0.05))
+
+    def test_only_idempotent_tasks_are_acked_late(self):
+        self.assertTrue(tasks.enqueue_priority_prediction.acks_late)
+        self.assertTrue(tasks.fire_escalations.reject_on_worker_lost)
+        self.assertFalse(tasks.send_ticket_created_email.acks_late)
+        self.assertFalse(tasks.auto_assign_agent.acks_late)
@@ -0,0 +1,73 @@
+import asyncio
+from unittest import mock
+
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from tickets.management.commands.bench_webhooks import StubServer
+from tickets.models import Ticket, TicketEvent, WebhookDelivery, WebhookEndpoint
+from tickets.webhook_worker import WebhookWorker
+from tickets.webhooks import TICKET_ASSIGNED, TICKET_CREATED, new_secret
+from users.models import User
+
+
+class WebhookDeliveryTests(TransactionTestCase):
+    """
+    Tickets saved through the ORM, delivered by the asyncio worker to
+    the benchmark's stub server, which verifies every signature.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='agent', password='pw', role='agent')
+        self.secrets = {'/hook/created': new_secret(), '/hook/assigned': new_secret()}
+        self.stub = StubServer(self.secrets).start()
+        self.addCleanup(self.stub.stop)
+
+    def _endpoint(self, path, events, secret=None):
+        return WebhookEndpoint.objects.create(
+            url=f'http://127.0.0.1:{self.stub.port}{path}',
+            secret=secret or self.secrets[path],
+            events=events,
+        )
+
+    def _create_ticket(self):
+        with transaction.atomic():
+            ticket = Ticket.objects.create(
+                ticket_id='T-HOOK-1', title='Badge reader down', description='Door 3.', created_by=self.user,
+            )
+            ticket.assigned_to = self.user
+            ticket.save()
+        return ticket
+
+    def test_signed_deliveries_reach_subscribed_endpoints(self):
+        created = self._endpoint('/hook/created', [TICKET_CREATED])
+        assigned = self._endpoint('/hook/assigned', [TICKET_ASSIGNED])
+        self._create_ticket()
+
+        sent = asyncio.run(WebhookWorker(concurrency=10).run(drain=True))
+
+        self.assertEqual(sent, 2)
+        self.assertEqual(self.stub.received, 2)
+        self.assertEqual(self.stub.bad_signatures, 0)
+        for endpoint, event in ((created, TICKET_CREATED), (assigned, TICKET_ASSIGNED)):
+            delivery = WebhookDelivery.objects.get(endpoint=endpoint)
+            self.assertEqual((delivery.event, delivery.status), (event, WebhookDelivery.DELIVERED))
+
+    def test_stub_rejects_a_wrong_secret(self):
+        self._endpoint('/hook/created', [TICKET_CREATED], secret=new_secret())
+        self._create_ticket()
+
+        asyncio.run(WebhookWorker(concurrency=10).run(drain=True))
+
+        self.assertEqual(self.stub.bad_signatures, 1)
+
+    def test_events_and_deliveries_are_written_together(self):
+        self._endpoint('/hook/created', [TICKET_CREATED])
+
+        with mock.patch.object(WebhookDelivery.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self._create_ticket()
+
+        # Events are written with the save, so the whole change rolls back
+        self.assertFalse(Ticket.objects.filter(ticket_id='T-HOOK-1').exists())
+        self.assertFalse(TicketEvent.objects.exists())
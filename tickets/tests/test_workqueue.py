@@ -0,0 +1,40 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tickets.models import Ticket, WorkQueueEntry
+from users.models import User
+
+
+class WorkQueueTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent', password='pw', role='agent')
+        self.reporter = User.objects.create_user(username='reporter', password='pw', role='user')
+        self.ticket = Ticket.objects.create(
+            ticket_id='T-QUEUE-1', title='VPN down', description='No tunnel.',
+            priority='high', created_by=self.reporter, assigned_to=self.agent,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent)
+
+    def test_claim_and_release(self):
+        claimed = self.client.post('/api/tickets/work-queue/claim/')
+        self.assertEqual(claimed.status_code, 200)
+
+        released = self.client.post(f'/api/tickets/work-queue/{self.ticket.pk}/release/')
+        self.assertEqual(released.status_code, 200)
+        self.assertIsNone(WorkQueueEntry.objects.get(ticket=self.ticket).claimed_by_id)
+
+    def test_release_with_non_numeric_id_is_not_found(self):
+        response = self.client.post('/api/tickets/work-queue/abc/release/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_deleting_an_agent_returns_their_tickets_to_the_pool(self):
+        self.agent.delete()
+
+        entry = WorkQueueEntry.objects.get(ticket=self.ticket)
+        self.assertIsNone(entry.agent_id)
+
+        other = User.objects.create_user(username='other', password='pw', role='agent')
+        self.client.force_authenticate(other)
+        claimed = self.client.post('/api/tickets/work-queue/claim/')
+        self.assertEqual(claimed.json()['id'], self.ticket.pk)
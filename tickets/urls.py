@@ -8,12 +8,22 @@ from django.urls import path, include
 # - TicketViewSet & CategoryViewSet: CRUD operations for tickets and categories
 # - TicketListView: Custom filtered ticket list view
 # - TicketAnalyticsView: Analytics endpoint for dashboard
+# - ReportView: Ad-hoc reports over the Parquet warehouse
+# - AttachmentDownloadView: Authorized attachment downloads
+# - WorkQueueViewSet: Agents' next work and claims
+# - WebhookEndpointViewSet: Admin-managed webhook endpoints
+# - EscalationRuleViewSet: Admin-defined escalation rules
 # - trigger_tfidf_ranking: Custom function to run TF-IDF ranking
 from .views import (
     TicketViewSet,
     CategoryViewSet,
     TicketListView,
     TicketAnalyticsView,
+    ReportView,
+    AttachmentDownloadView,
+    WorkQueueViewSet,
+    WebhookEndpointViewSet,
+    EscalationRuleViewSet,
     trigger_tfidf_ranking
 )
 
@@ -21,12 +31,21 @@ from .views import (
 router = DefaultRouter()
 router.register(r'tickets', TicketViewSet, basename='tickets')
 router.register(r'categories', CategoryViewSet, basename='categories')
+router.register(r'work-queue', WorkQueueViewSet, basename='work-queue')
+router.register(r'webhooks', WebhookEndpointViewSet, basename='webhooks')
+router.register(r'escalation-rules', EscalationRuleViewSet, basename='escalation-rules')
 
 # Define URL patterns
 urlpatterns = [
     # Custom analytics endpoint (placed first to avoid router override)
     path('tickets/analytics/', TicketAnalyticsView.as_view(), name='tickets-analytics'),
 
+    # Ad-hoc reports over the nightly warehouse export (admins)
+    path('reports/', ReportView.as_view(), name='reports'),
+
+    # Attachment files (ticket permission or signed link)
+    path('attachments/<int:pk>/download/', AttachmentDownloadView.as_view(), name='attachment-download'),
+
     # Custom ticket list view with optional filters (e.g., ?mine=true)
     path('tickets/list/', TicketListView.as_view(), name='tickets-list'),
 
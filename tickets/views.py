@@ -1,6 +1,11 @@
 # ---------------------------------------------------------
 # IMPORTS
 # ---------------------------------------------------------
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.urls import reverse
+
 # DRF core components for building API views and viewsets
 from rest_framework import viewsets, permissions, status, generics
 from rest_framework.decorators import action, api_view, permission_classes
@@ -9,33 +14,83 @@ from rest_framework.views import APIView
 
 # Django utilities
 from django.utils import timezone  # for datetime operations
-from django.db.models import Count  # aggregation
-from django.db.models.functions import TruncDate  # for truncating datetime to date
+from django.utils.dateparse import parse_date
 
-# DRF filtering and ordering
+# DRF filtering, ordering and pagination
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import LimitOffsetPagination
+
+# Replica routing for read-only requests
+from ticketing.db_router import ReplicaReadMixin, read_from_replica
 
 # Import tasks for asynchronous execution
-from .tasks import run_tfidf_ranking, send_ticket_created_email
+from .tasks import (
+    run_tfidf_ranking, send_ticket_created_email, enqueue_for_ticket, schedule_escalation_rule
+)
 
 # Import models and serializers
-from .models import Ticket, Category
-from .serializers import TicketSerializer, CreateTicketSerializer, CategorySerializer
+from .models import (
+    Ticket, Category, IncidentCluster, TicketEvent, WebhookDelivery, WebhookEndpoint, EscalationRule
+)
+from .serializers import (
+    TicketSerializer,
+    CreateTicketSerializer,
+    CategorySerializer,
+    BulkUpdateSerializer,
+    WebhookEndpointSerializer,
+    WebhookDeliverySerializer,
+    EscalationRuleSerializer,
+    EscalationMatchSerializer
+)
 from .filters import TicketFilter  # custom filter class for tickets
+from .duplicates import find_duplicate, link_duplicate
+from .archive import get_archived
+from .events import acting_as
+from .locks import run_once
+from . import workqueue
+from .bulk import ALLOWED_FIELDS, apply_changes, editable_tickets
+from .etags import TicketETagMixin
+from . import snapshot
+from . import warehouse
+from . import latency
+from . import webhooks
+from . import escalation
+from . import downloads
+from users.models import User
+
+
+# ---------------------------------------------------------
+# TICKET LIST PAGINATION
+# ---------------------------------------------------------
+class TicketPagination(LimitOffsetPagination):
+    """
+    Opt-in paging for ticket lists: ?limit=&offset= returns
+    {count, next, previous, results}; without ?limit= the full
+    list is returned as before.
+    """
+    max_limit = settings.TICKET_LIST_MAX_LIMIT
 
 
 # ---------------------------------------------------------
 # TICKET VIEWSET
 # ---------------------------------------------------------
-class TicketViewSet(viewsets.ModelViewSet):
+class TicketViewSet(ReplicaReadMixin, TicketETagMixin, viewsets.ModelViewSet):
     """
     CRUD operations for Tickets.
     - Uses different serializers for creation and other actions.
     - Sends async email when a ticket is created.
+    - Links near-duplicate tickets to an open parent incident.
+    - Serves archived tickets from cold storage on detail requests.
+    - Attributes changes to the requesting user in the event log
+      and exposes it through the `timeline` action.
+    - Applies one change set to many tickets through `bulk`.
+    - Answers unchanged list/detail requests with 304 (ETag).
+    - Pages the list with ?limit=&offset= (TicketPagination).
     """
     queryset = Ticket.objects.all().order_by('-created_at')
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TicketPagination
 
     def get_serializer_class(self):
         return CreateTicketSerializer if self.action == 'create' else TicketSerializer
@@ -48,20 +103,239 @@ class TicketViewSet(viewsets.ModelViewSet):
             context={'attachments': files}
         )
         serializer.is_valid(raise_exception=True)
-        ticket = serializer.save(created_by=request.user)
-        # Send email asynchronously after ticket creation
-        send_ticket_created_email.delay(ticket.id)
-        return Response(TicketSerializer(ticket).data, status=201)
+        with acting_as(request.user):
+            ticket = serializer.save(created_by=request.user)
+
+        # Near-duplicates of an open incident reuse its assignee and
+        # skip the notification work already done for the parent
+        parent = find_duplicate(ticket)
+        if parent is not None:
+            link_duplicate(ticket, parent)
+        else:
+            # Send email asynchronously after ticket creation
+            enqueue_for_ticket(send_ticket_created_email, ticket)
+        return Response(TicketSerializer(ticket, context=self.get_serializer_context()).data, status=201)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Long-closed tickets live in the archive
+            archived = get_archived(kwargs.get(self.lookup_field))
+            if archived is None:
+                raise
+            created_by = (archived.get('created_by') or {}).get('id')
+            for attachment in archived.get('attachments', []):
+                # As AttachmentSerializer: signed for users who may view it
+                if downloads.can_view_created_by(request.user, created_by):
+                    url = downloads.signed_url(attachment['id'])
+                else:
+                    url = reverse('attachment-download', args=[attachment['id']])
+                attachment['file'] = request.build_absolute_uri(url)
+            return Response(archived)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        # Deleted rows are only dropped from the snapshot by a full reload
+        snapshot.invalidate()
 
     def perform_update(self, serializer):
         # Automatically assign updated ticket to the current user
-        serializer.save(assigned_to=self.request.user)
+        with acting_as(self.request.user):
+            serializer.save(assigned_to=self.request.user)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Applies `changes` to the tickets selected by `ids` or by
+        `filter` (TicketFilter parameters) in one transaction.
+        Tickets the user may not edit are reported, not changed.
+        """
+        serializer = BulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        changes = data['changes']
+
+        denied_fields = set(changes) - ALLOWED_FIELDS.get(request.user.role, set())
+        if denied_fields:
+            return Response(
+                {'detail': f"Not allowed to change: {', '.join(sorted(denied_fields))}"},
+                status=403
+            )
+
+        limit = settings.BULK_UPDATE_MAX_TICKETS
+        too_many = Response(
+            {'detail': f'Matches more than {limit} tickets; the limit is {limit}.'},
+            status=400
+        )
+
+        allowed = editable_tickets(request.user)
+        if 'ids' in data:
+            requested = set(data['ids'])
+            if len(requested) > limit:
+                return too_many
+            selected = set(allowed.filter(id__in=requested).values_list('id', flat=True))
+            existing = set(Ticket.objects.filter(id__in=requested - selected).values_list('id', flat=True))
+            forbidden, missing = sorted(existing), sorted(requested - selected - existing)
+        else:
+            filterset = TicketFilter(data=data['filter'], queryset=allowed)
+            if not filterset.is_valid():
+                return Response({'filter': filterset.errors}, status=400)
+            # One row past the limit is enough to reject
+            selected = set(filterset.qs.values_list('id', flat=True)[:limit + 1])
+            if len(selected) > limit:
+                return too_many
+            forbidden, missing = [], []
+
+        changed = apply_changes(request.user, selected, changes, data['comment'])
+        return Response({
+            'matched': len(selected),
+            'updated': len(changed),
+            'forbidden': forbidden,
+            'missing': missing,
+        })
+
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """
+        Ticket events in order; `?after=<seq>` returns only newer ones.
+        Also available for archived tickets.
+        """
+        if not str(pk).isdigit():
+            return Response({'detail': 'Not found.'}, status=404)
+        try:
+            after = int(request.query_params.get('after', 0))
+        except ValueError:
+            return Response({'detail': 'after must be an integer'}, status=400)
+
+        events = (
+            TicketEvent.objects.filter(ticket_id=pk, seq__gt=after)
+            .order_by('seq')
+            .values('seq', 'kind', 'changes', 'actor_id', 'actor__username', 'created_at')[:500]
+        )
+        return Response([
+            {
+                'seq': event['seq'],
+                'kind': event['kind'],
+                'changes': event['changes'],
+                'actor': {
+                    'id': event['actor_id'],
+                    'username': event['actor__username'],
+                } if event['actor_id'] else None,
+                'created_at': event['created_at'],
+            }
+            for event in events
+        ])
+
+
+# ---------------------------------------------------------
+# ATTACHMENT DOWNLOADS
+# ---------------------------------------------------------
+class AttachmentDownloadView(APIView):
+    """
+    Serves an attachment to users who may view its ticket, or to
+    anyone holding a valid signed link (see tickets.downloads), which
+    skips authentication and the permission query. Supports Range,
+    ETag and If-Modified-Since; hands the transfer to the front proxy
+    when ATTACHMENT_SENDFILE is set.
+    """
+    # Authorization is the signature or the ticket permission below
+    permission_classes = [permissions.AllowAny]
+
+    def perform_authentication(self, request):
+        # Lazy: only unsigned requests need request.user
+        pass
+
+    def perform_content_negotiation(self, request, force=False):
+        # Media players send Accept headers no JSON renderer satisfies
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, pk):
+        if 'signature' in request.query_params:
+            max_age = downloads.verify(pk, request.query_params.get('expires'), request.query_params['signature'])
+            if max_age is None:
+                return Response({'detail': 'Download link is invalid or has expired.'}, status=403)
+            attachment = downloads.find(pk)
+        else:
+            if not request.user.is_authenticated:
+                self.permission_denied(request)
+            max_age = 0
+            attachment = downloads.find(pk, request.user)
+
+        response = downloads.serve(request, attachment, max_age) if attachment is not None else None
+        if response is None:
+            raise Http404
+        return response
+
+
+# ---------------------------------------------------------
+# AGENT WORK QUEUE
+# ---------------------------------------------------------
+class IsAgent(permissions.BasePermission):
+    """
+    Allows agents and admins only.
+    """
+
+    def has_permission(self, request, view):
+        return bool(
+            request.user
+            and request.user.is_authenticated
+            and request.user.role in ('agent', 'admin')
+        )
+
+
+def _work_item(entry):
+    ticket = entry.ticket
+    return {
+        'id': ticket.id,
+        'ticket_id': ticket.ticket_id,
+        'title': ticket.title,
+        'priority': ticket.priority,
+        'status': ticket.status,
+        'sla_due_at': entry.sla_due_at,
+        'claimed_until': entry.claimed_until,
+    }
+
+
+class WorkQueueViewSet(viewsets.ViewSet):
+    """
+    Agent work queue ordered by priority rank, then SLA due time.
+    - next → the agent's top N tickets (?limit=, default 10)
+    - claim → leases the most urgent ticket (own or unassigned)
+    - release → gives a claimed ticket back
+    """
+    permission_classes = [IsAgent]
+
+    @action(detail=False, methods=['get'])
+    def next(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 100)
+        except ValueError:
+            return Response({'detail': 'limit must be an integer'}, status=400)
+        entries = workqueue.next_entries(request.user, limit)
+        return Response([_work_item(entry) for entry in entries])
+
+    @action(detail=False, methods=['post'])
+    def claim(self, request):
+        with acting_as(request.user):
+            entry = workqueue.claim(request.user)
+        if entry is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(_work_item(entry))
+
+    @action(detail=True, methods=['post'])
+    def release(self, request, pk=None):
+        if not str(pk).isdigit():
+            return Response({'detail': 'Not found.'}, status=404)
+        if not workqueue.release(request.user, pk):
+            return Response({'detail': 'Not claimed by you.'}, status=404)
+        return Response({'status': 'released'})
 
 
 # ---------------------------------------------------------
 # CATEGORY VIEWSET
 # ---------------------------------------------------------
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     Read-only endpoints for ticket categories.
     """
@@ -73,15 +347,18 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
 # ---------------------------------------------------------
 # TICKET LIST VIEW WITH FILTERS
 # ---------------------------------------------------------
-class TicketListView(generics.ListAPIView):
+class TicketListView(ReplicaReadMixin, TicketETagMixin, generics.ListAPIView):
     """
     Custom filtered list view for tickets.
     Supports:
     - ?mine=true → tickets created by current user
     - ?assigned_to=me → tickets assigned to current user
+    Unchanged results are answered with 304 (ETag).
+    Pages with ?limit=&offset= (TicketPagination).
     """
     queryset = Ticket.objects.all().order_by('-created_at')
     serializer_class = TicketSerializer
+    pagination_class = TicketPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = TicketFilter
     ordering_fields = ['created_at', 'priority']
@@ -99,16 +376,41 @@ class TicketListView(generics.ListAPIView):
         return qs
 
 
+def _date_bounds(params, since=None, until=None):
+    """
+    {'since': date, 'until': date} from YYYY-MM-DD query params, falling
+    back to the given defaults; raises ValueError for a malformed date.
+    """
+    bounds = {}
+    for name, default in (('since', since), ('until', until)):
+        value = params.get(name)
+        try:
+            bounds[name] = parse_date(value) if value else default
+        except ValueError:
+            bounds[name] = None
+        if value and bounds[name] is None:
+            raise ValueError(f'{name} must be a YYYY-MM-DD date')
+    return bounds
+
+
 # ---------------------------------------------------------
 # TICKET ANALYTICS VIEW
 # ---------------------------------------------------------
-class TicketAnalyticsView(APIView):
+class TicketAnalyticsView(ReplicaReadMixin, APIView):
     """
     Provides ticket analytics for dashboards.
     Supports multiple actions via query param 'action':
     1. volume_by_date → number of tickets per day for last 30 days
     2. sla_breach_rate → percentage of open tickets >24hrs
     3. agent_performance → resolved tickets per agent
+    4. incident_clusters → ticket storms from the latest clustering run
+    5. by_category → tickets per category, split by status
+    6. by_priority → tickets per priority, split by status
+    7. resolution_time / first_response_time → p50/p90/p99 hours
+       (?by=all|agent|category|priority, ?since= / ?until= dates,
+       default the last 30 days), merged from daily sketches
+    Actions 1-3, 5 and 6 are computed from the in-memory ticket
+    snapshot (tickets.snapshot) rather than SQL aggregates.
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -119,30 +421,13 @@ class TicketAnalyticsView(APIView):
         # 1 — VOLUME LAST 30 DAYS
         # -----------------------------
         if action == "volume_by_date":
-            today = timezone.now().date()
-            start = today - timezone.timedelta(days=30)
-
-            qs = (
-                Ticket.objects.filter(created_at__date__gte=start)
-                .annotate(date=TruncDate("created_at"))
-                .values("date")
-                .annotate(count=Count("id"))
-                .order_by("date")
-            )
-
-            data = [{'date': str(row["date"]), 'count': row["count"]} for row in qs]
-            return Response(data)
+            return Response(snapshot.volume_by_date(days=30))
 
         # -----------------------------
         # 2 — SLA BREACH (open > 24 hrs)
         # -----------------------------
         if action == "sla_breach_rate":
-            now = timezone.now()
-            cutoff = now - timezone.timedelta(hours=24)
-
-            total = Ticket.objects.count()
-            breached = Ticket.objects.filter(status="open", created_at__lt=cutoff).count()
-
+            total, breached = snapshot.sla_breach(hours=24)
             rate = round((breached / total * 100), 2) if total else 0
 
             return Response({
@@ -155,26 +440,260 @@ class TicketAnalyticsView(APIView):
         # 3 — AGENT PERFORMANCE
         # -----------------------------
         if action == "agent_performance":
+            resolved = snapshot.resolved_per_agent()
+            names = dict(User.objects.filter(id__in=resolved).values_list("id", "username"))
+
+            data = [
+                {
+                    "agent": names.get(agent_id),
+                    "resolved": count
+                }
+                for agent_id, count in resolved.items()
+            ]
+
+            return Response(data)
+
+        # -----------------------------
+        # 4 — INCIDENT CLUSTERS
+        # -----------------------------
+        if action == "incident_clusters":
+            latest = IncidentCluster.objects.order_by("-run_at").values_list("run_at", flat=True).first()
+            if latest is None:
+                return Response({"run_at": None, "clusters": []})
+
             qs = (
-                Ticket.objects.filter(
-                    status__in=["resolved", "closed"],
-                    assigned_to__isnull=False
-                )
-                .values("assigned_to__username")
-                .annotate(resolved=Count("id"))
-                .order_by("-resolved")
+                IncidentCluster.objects.filter(run_at=latest)
+                .select_related("representative")
+                .order_by("-size")
             )
 
             data = [
                 {
-                    "agent": row["assigned_to__username"],
-                    "resolved": row["resolved"]
+                    "id": cluster.id,
+                    "size": cluster.size,
+                    "keywords": cluster.keywords,
+                    "cohesion": cluster.cohesion,
+                    "first_seen": cluster.first_seen,
+                    "last_seen": cluster.last_seen,
+                    "representative": {
+                        "id": cluster.representative.id,
+                        "ticket_id": cluster.representative.ticket_id,
+                        "title": cluster.representative.title,
+                    } if cluster.representative else None,
                 }
-                for row in qs
+                for cluster in qs
             ]
 
+            return Response({"run_at": latest, "clusters": data})
+
+        # -----------------------------
+        # 5 — BREAKDOWN BY CATEGORY
+        # -----------------------------
+        if action == "by_category":
+            rows = snapshot.by_category()
+            names = dict(Category.objects.values_list("id", "name"))
+
+            data = [
+                {"category_id": category_id, "category": names.get(category_id), **counts}
+                for category_id, counts in rows
+            ]
             return Response(data)
 
+        # -----------------------------
+        # 6 — BREAKDOWN BY PRIORITY
+        # -----------------------------
+        if action == "by_priority":
+            return Response(snapshot.by_priority())
+
+        # -----------------------------
+        # 7 — RESOLUTION / FIRST RESPONSE PERCENTILES
+        # -----------------------------
+        if action in ("resolution_time", "first_response_time"):
+            return self._latency(request, action.removesuffix("_time"))
+
+    def _latency(self, request, metric):
+        by = request.query_params.get("by", "all")
+        if by not in latency.DIMENSIONS:
+            return Response({'detail': f"by must be one of {', '.join(latency.DIMENSIONS)}"}, status=400)
+
+        today = timezone.localdate()
+        try:
+            bounds = _date_bounds(request.query_params, since=today - timezone.timedelta(days=30), until=today)
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=400)
+
+        results = latency.percentiles(metric, by, **bounds)
+        if by == "agent":
+            names = dict(User.objects.filter(id__in=results).values_list("id", "username"))
+        elif by == "category":
+            names = dict(Category.objects.filter(id__in=results).values_list("id", "name"))
+        else:
+            names = {}
+
+        data = [
+            {
+                by: names.get(int(key)) if names else (key or None),
+                "count": values.pop("count"),
+                **{
+                    f"{name}_hours": round(seconds / 3600, 2) if seconds is not None else None
+                    for name, seconds in values.items()
+                },
+            }
+            for key, values in results.items()
+        ]
+        data.sort(key=lambda row: -row["count"])
+        return Response({**{k: str(v) for k, v in bounds.items()}, "results": data})
+
+
+# ---------------------------------------------------------
+# AD-HOC REPORTS (PARQUET WAREHOUSE)
+# ---------------------------------------------------------
+class IsAdmin(permissions.BasePermission):
+    """
+    Allows admins only.
+    """
+
+    def has_permission(self, request, view):
+        return bool(
+            request.user
+            and request.user.is_authenticated
+            and request.user.role == 'admin'
+        )
+
+
+class ReportView(APIView):
+    """
+    Grouped aggregations over the nightly warehouse export
+    (tickets.warehouse); never queries the database.
+
+    Query params:
+    - dataset → tickets, activities or predictions
+    - group_by → comma-separated dimensions and/or day, week, month
+    - metrics → comma-separated count / <aggregation>:<column>
+      (e.g. count,mean:resolution_hours; default count)
+    - since / until → inclusive YYYY-MM-DD bounds
+    - <dimension>=a,b → keep rows whose dimension is a or b
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        params = request.query_params
+        dataset = params.get('dataset', 'tickets')
+        spec = warehouse.DATASETS.get(dataset)
+        if spec is None:
+            return Response({'detail': f"dataset must be one of {', '.join(warehouse.DATASETS)}"}, status=400)
+
+        try:
+            bounds = _date_bounds(params)
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=400)
+
+        def _list(value):
+            return [item.strip() for item in value.split(',') if item.strip()]
+
+        try:
+            rows, truncated = warehouse.query(
+                dataset,
+                group_by=_list(params.get('group_by', '')),
+                metrics=[warehouse.parse_metric(m) for m in _list(params.get('metrics', 'count'))],
+                where={column: _list(params[column]) for column in spec['dimensions'] if column in params},
+                **bounds
+            )
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=400)
+        except FileNotFoundError:
+            return Response({'detail': 'The warehouse has not been exported yet.'}, status=404)
+
+        return Response({
+            'dataset': dataset,
+            'exported_at': (warehouse.manifest() or {}).get('exported_at'),
+            'truncated': truncated,
+            'rows': rows,
+        })
+
+
+# ---------------------------------------------------------
+# WEBHOOK ENDPOINTS
+# ---------------------------------------------------------
+class WebhookEndpointViewSet(viewsets.ModelViewSet):
+    """
+    Admin management of webhook endpoints.
+    - deliveries → recent deliveries (?status=pending|delivered|failed)
+    - redeliver → requeues the given delivery ids, or all failed ones
+    - rotate_secret → issues a new signing secret
+    """
+    permission_classes = [IsAdmin]
+    serializer_class = WebhookEndpointSerializer
+    queryset = WebhookEndpoint.objects.order_by('id')
+
+    def perform_create(self, serializer):
+        serializer.save(secret=webhooks.new_secret(), created_by=self.request.user)
+
+    @action(detail=True, methods=['get'])
+    def deliveries(self, request, pk=None):
+        qs = self.get_object().deliveries.order_by('-id')
+        delivery_status = request.query_params.get('status')
+        if delivery_status:
+            qs = qs.filter(status=delivery_status)
+        return Response(WebhookDeliverySerializer(qs[:100], many=True).data)
+
+    @action(detail=True, methods=['post'])
+    def redeliver(self, request, pk=None):
+        qs = self.get_object().deliveries.all()
+        ids = request.data.get('ids')
+        if ids is None:
+            qs = qs.filter(status=WebhookDelivery.FAILED)
+        elif isinstance(ids, list) and all(isinstance(i, int) for i in ids):
+            qs = qs.filter(id__in=ids)
+        else:
+            return Response({'detail': 'ids must be a list of integers'}, status=400)
+        return Response({'requeued': webhooks.redeliver(qs.values_list('id', flat=True))})
+
+    @action(detail=True, methods=['post'])
+    def rotate_secret(self, request, pk=None):
+        endpoint = self.get_object()
+        endpoint.secret = webhooks.new_secret()
+        endpoint.save(update_fields=['secret'])
+        return Response(self.get_serializer(endpoint).data)
+
+
+# ---------------------------------------------------------
+# ESCALATION RULES
+# ---------------------------------------------------------
+class EscalationRuleViewSet(viewsets.ModelViewSet):
+    """
+    Admin management of escalation rules.
+    Saving a rule recompiles this process's rules and matches the
+    rule against actionable tickets in the background.
+    - matches → scheduled and fired escalations (?fired=true|false)
+    """
+    permission_classes = [IsAdmin]
+    serializer_class = EscalationRuleSerializer
+    queryset = EscalationRule.objects.order_by('id')
+
+    def _rules_changed(self, rule=None):
+        escalation.invalidate()
+        if rule is not None and rule.is_active:
+            transaction.on_commit(lambda: schedule_escalation_rule.delay(rule.id))
+
+    def perform_create(self, serializer):
+        self._rules_changed(serializer.save(created_by=self.request.user))
+
+    def perform_update(self, serializer):
+        self._rules_changed(serializer.save())
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        self._rules_changed()
+
+    @action(detail=True, methods=['get'])
+    def matches(self, request, pk=None):
+        qs = self.get_object().matches.select_related('ticket').order_by('-due_at')
+        fired = request.query_params.get('fired')
+        if fired in ('true', 'false'):
+            qs = qs.filter(fired_at__isnull=(fired == 'false'))
+        return Response(EscalationMatchSerializer(qs[:100], many=True).data)
+
 
 # ---------------------------------------------------------
 # TRIGGER TF-IDF RANKING (ASYNC)
@@ -184,9 +703,14 @@ class TicketAnalyticsView(APIView):
 def trigger_tfidf_ranking(request):
     """
     Triggers the TF-IDF ranking task asynchronously.
+    If a run is already queued or in progress, returns its task id
+    instead of starting another.
     """
-    run_tfidf_ranking.delay()
-    return Response({"status": "started"})
+    task_id, started = run_once(run_tfidf_ranking, 'tfidf-ranking')
+    return Response({
+        "status": "started" if started else "already_running",
+        "task_id": task_id
+    })
 
 
 # ---------------------------------------------------------
@@ -203,8 +727,10 @@ def sla_breach_rate(request):
     now = timezone.now()
     cutoff = now - timezone.timedelta(hours=24)
 
-    total = Ticket.objects.count()
-    breached = Ticket.objects.filter(status="open", created_at__lt=cutoff).count()
+    # Reporting query: served by a replica when one is configured
+    with read_from_replica():
+        total = Ticket.objects.count()
+        breached = Ticket.objects.filter(status="open", created_at__lt=cutoff).count()
 
     percent = round((breached / total * 100), 2) if total else 0
 
@@ -0,0 +1,407 @@
+# ---------------------------------------------------------
+# PARQUET ANALYTICS WAREHOUSE
+# ---------------------------------------------------------
+# A nightly task exports tickets (live and archived), activities and
+# predictions to Hive-partitioned Parquet datasets under WAREHOUSE_DIR
+# (one directory per dataset, partitioned by month). Each export gets
+# its own directory under exports/; manifest.json names the current one
+# and is replaced atomically, so a report reads either the previous or
+# the new export, never a mix. Ad-hoc reports run grouped aggregations
+# over those files, reading only the columns and month partitions a
+# query needs, so heavy analytics never touch the production database.
+#
+# pandas/pyarrow are imported inside functions: web workers only load
+# them when a report is actually requested (see profile_imports).
+import json
+import os
+import shutil
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from ticketing.db_router import read_from_replica
+from .models import Category, MLPredictionHistory, Ticket, TicketActivity, TicketArchive
+from users.models import User
+
+# Statuses after which a ticket counts as resolved
+RESOLVED_STATUSES = ('resolved', 'closed')
+
+# Rows per DataFrame written during an export
+EXPORT_CHUNK_ROWS = 50000
+
+# Per dataset: column dtypes (in order), the timestamp and month
+# partition columns, columns reports may group/filter by, and columns
+# they may aggregate
+DATASETS = {
+    'tickets': {
+        'columns': {
+            'id': 'Int64',
+            'ticket_id': 'string',
+            'status': 'string',
+            'priority': 'string',
+            'category_id': 'Int64',
+            'category': 'string',
+            'created_by_id': 'Int64',
+            'assigned_to_id': 'Int64',
+            'assigned_to': 'string',
+            'parent_id': 'Int64',
+            'created_at': 'datetime64[ns, UTC]',
+            'updated_at': 'datetime64[ns, UTC]',
+            'resolution_hours': 'float64',
+            'archived': 'bool',
+            'created_month': 'string',
+        },
+        'timestamp': 'created_at',
+        'partition': 'created_month',
+        'dimensions': ('status', 'priority', 'category', 'category_id',
+                       'assigned_to', 'assigned_to_id', 'created_by_id', 'archived'),
+        'measures': ('resolution_hours', 'id', 'assigned_to_id', 'created_by_id'),
+    },
+    'activities': {
+        'columns': {
+            'ticket_id': 'Int64',
+            'actor_id': 'Int64',
+            'old_status': 'string',
+            'new_status': 'string',
+            'has_comment': 'bool',
+            'created_at': 'datetime64[ns, UTC]',
+            'created_month': 'string',
+        },
+        'timestamp': 'created_at',
+        'partition': 'created_month',
+        'dimensions': ('actor_id', 'old_status', 'new_status', 'has_comment'),
+        'measures': ('ticket_id', 'actor_id'),
+    },
+    'predictions': {
+        'columns': {
+            'ticket_id': 'Int64',
+            'predicted_priority': 'string',
+            'model_version': 'string',
+            'confidence_score': 'float64',
+            'run_at': 'datetime64[ns, UTC]',
+            'run_month': 'string',
+        },
+        'timestamp': 'run_at',
+        'partition': 'run_month',
+        'dimensions': ('predicted_priority', 'model_version'),
+        'measures': ('confidence_score', 'ticket_id'),
+    },
+}
+
+# Derived from the dataset's timestamp, in the local time zone
+TIME_DIMENSIONS = ('day', 'week', 'month')
+
+AGGREGATIONS = ('sum', 'mean', 'min', 'max', 'median', 'nunique')
+
+
+# Under WAREHOUSE_DIR: one subdirectory per export
+EXPORTS_DIR = 'exports'
+
+
+def _root():
+    return settings.WAREHOUSE_DIR
+
+
+def _month(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y-%m')
+
+
+# ---------------------------------------------------------
+# EXPORT
+# ---------------------------------------------------------
+class _Writer:
+    """
+    Buffers rows for one dataset and appends them to its
+    partitioned directory in chunks.
+    """
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.columns = DATASETS[name]['columns']
+        self.rows = []
+        self.total = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= EXPORT_CHUNK_ROWS:
+            self.flush()
+
+    def flush(self):
+        import pandas as pd
+
+        if not self.rows:
+            return
+        frame = pd.DataFrame(self.rows, columns=list(self.columns)).astype(self.columns)
+        # Each call adds new uniquely named files to the partitions
+        frame.to_parquet(
+            self.path,
+            engine='pyarrow',
+            index=False,
+            partition_cols=[DATASETS[self.name]['partition']],
+            compression='zstd',
+        )
+        self.total += len(self.rows)
+        self.rows = []
+
+
+def _resolution_hours(status, created_at, updated_at):
+    # Last change approximates the closing time (as in tickets.archive)
+    if status not in RESOLVED_STATUSES:
+        return None
+    return (updated_at - created_at).total_seconds() / 3600
+
+
+def _export_live(writers, categories, usernames):
+    tickets = Ticket.objects.order_by().values_list(
+        'id', 'ticket_id', 'status', 'priority', 'category_id', 'created_by_id',
+        'assigned_to_id', 'parent_id', 'created_at', 'updated_at'
+    )
+    for (pk, ticket_id, status, priority, category_id, created_by_id,
+         assigned_to_id, parent_id, created_at, updated_at) in tickets.iterator(chunk_size=5000):
+        writers['tickets'].add((
+            pk, ticket_id, status, priority, category_id, categories.get(category_id),
+            created_by_id, assigned_to_id, usernames.get(assigned_to_id), parent_id,
+            created_at, updated_at, _resolution_hours(status, created_at, updated_at),
+            False, _month(created_at),
+        ))
+
+    activities = TicketActivity.objects.order_by().values_list(
+        'ticket_id', 'actor_id', 'old_status', 'new_status', 'comment', 'created_at'
+    )
+    for ticket_id, actor_id, old_status, new_status, comment, created_at in activities.iterator(chunk_size=5000):
+        writers['activities'].add((
+            ticket_id, actor_id, old_status, new_status, bool(comment),
+            created_at, _month(created_at),
+        ))
+
+    predictions = MLPredictionHistory.objects.order_by().values_list(
+        'ticket_id', 'predicted_priority', 'model_version', 'confidence_score', 'run_at'
+    )
+    for ticket_id, predicted, version, confidence, run_at in predictions.iterator(chunk_size=5000):
+        writers['predictions'].add((
+            ticket_id, predicted, version, confidence, run_at, _month(run_at),
+        ))
+
+
+def _export_archived(writers, categories):
+    """
+    Archived tickets are exported from their stored documents, so
+    history survives tickets leaving the hot tables.
+    """
+    from django.utils.dateparse import parse_datetime
+
+    for archived in TicketArchive.objects.order_by().iterator(chunk_size=500):
+        data = archived.data
+        created_at = parse_datetime(data['created_at'])
+        updated_at = parse_datetime(data['updated_at'])
+        category = data.get('category') or {}
+        assignee = data.get('assigned_to') or {}
+
+        writers['tickets'].add((
+            data['id'], data['ticket_id'], data['status'], data['priority'],
+            category.get('id'), category.get('name') or categories.get(category.get('id')),
+            (data.get('created_by') or {}).get('id'), assignee.get('id'), assignee.get('username'),
+            data.get('parent'), created_at, updated_at,
+            _resolution_hours(data['status'], created_at, updated_at),
+            True, _month(created_at),
+        ))
+        for activity in data.get('activities', []):
+            activity_at = parse_datetime(activity['created_at'])
+            writers['activities'].add((
+                data['id'], (activity.get('actor') or {}).get('id'),
+                activity.get('old_status', ''), activity.get('new_status', ''),
+                bool(activity.get('comment')), activity_at, _month(activity_at),
+            ))
+        for prediction in data.get('predictions', []):
+            run_at = parse_datetime(prediction['run_at'])
+            writers['predictions'].add((
+                data['id'], prediction['predicted_priority'], prediction['model_version'],
+                prediction['confidence_score'], run_at, _month(run_at),
+            ))
+
+
+def export():
+    """
+    Rebuilds every dataset from the database (a replica when one is
+    configured) into a new export directory, then points the manifest
+    at it. Returns {dataset: rows}.
+    """
+    root = _root()
+    exported_at = timezone.now()
+    directory = f"{EXPORTS_DIR}/{exported_at:%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    (root / directory).mkdir(parents=True)
+
+    writers = {name: _Writer(name, root / directory / name) for name in DATASETS}
+    with read_from_replica():
+        categories = dict(Category.objects.values_list('id', 'name'))
+        usernames = dict(
+            User.objects.filter(assigned_tickets__isnull=False)
+            .distinct().values_list('id', 'username')
+        )
+        _export_live(writers, categories, usernames)
+        _export_archived(writers, categories)
+    for writer in writers.values():
+        writer.flush()
+
+    counts = {name: writer.total for name, writer in writers.items()}
+    previous = (manifest() or {}).get('directory')
+    staged = root / f'manifest.json.{os.getpid()}'
+    staged.write_text(json.dumps({
+        'exported_at': exported_at.isoformat(),
+        'directory': directory,
+        'rows': counts,
+    }))
+    os.replace(staged, root / 'manifest.json')
+
+    # The previous export stays for reports that already read the old
+    # manifest; older ones (and failed exports) go
+    keep = {directory, previous}
+    for path in (root / EXPORTS_DIR).iterdir():
+        if f'{EXPORTS_DIR}/{path.name}' not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+    return counts
+
+
+def manifest():
+    """
+    {'exported_at': ..., 'directory': ..., 'rows': {...}} of the last
+    export, or None.
+    """
+    try:
+        return json.loads((_root() / 'manifest.json').read_text())
+    except FileNotFoundError:
+        return None
+
+
+# ---------------------------------------------------------
+# REPORTS
+# ---------------------------------------------------------
+def _utc(pd, value):
+    # Same type as the stored column, or pyarrow cannot compare them
+    return pd.Timestamp(value).tz_convert('UTC').as_unit('ns')
+
+
+def parse_metric(text):
+    """
+    'count' or '<aggregation>:<column>', e.g. 'mean:resolution_hours'.
+    """
+    if text == 'count':
+        return 'count', None
+    aggregation, _, column = text.partition(':')
+    return aggregation, column
+
+
+def _validate(spec, group_by, metrics, where):
+    allowed = set(spec['dimensions']) | set(TIME_DIMENSIONS)
+    for column in group_by:
+        if column not in allowed:
+            raise ValueError(f"cannot group by {column!r}; choose from {', '.join(sorted(allowed))}")
+    for column in where:
+        if column not in spec['dimensions']:
+            raise ValueError(f"cannot filter on {column!r}; choose from {', '.join(spec['dimensions'])}")
+    if not metrics:
+        raise ValueError('at least one metric is required')
+    for aggregation, column in metrics:
+        if aggregation == 'count':
+            continue
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"unknown aggregation {aggregation!r}; choose from count, {', '.join(AGGREGATIONS)}")
+        if column not in spec['measures']:
+            raise ValueError(f"cannot aggregate {column!r}; choose from {', '.join(spec['measures'])}")
+
+
+def _filter_value(dtype, value):
+    if dtype == 'bool':
+        return value.lower() in ('1', 'true', 'yes')
+    if dtype == 'Int64':
+        return int(value)
+    return value
+
+
+def query(dataset, group_by=(), metrics=(('count', None),), where=None, since=None, until=None, limit=None):
+    """
+    Grouped aggregation over one dataset.
+
+    - group_by: dimension columns and/or 'day' / 'week' / 'month'
+    - metrics: (aggregation, column) pairs, ('count', None) for rows
+    - where: {dimension: [values]} (values of a column are OR-ed)
+    - since / until: inclusive date bounds on the dataset's timestamp
+
+    Only referenced columns are read, and month partitions outside
+    since/until are skipped without being opened. A dataset the last
+    export wrote no rows for is queried as empty.
+    Returns (rows, truncated).
+    """
+    import pandas as pd
+
+    if dataset not in DATASETS:
+        raise ValueError(f"unknown dataset {dataset!r}; choose from {', '.join(DATASETS)}")
+    spec = DATASETS[dataset]
+    where = where or {}
+    group_by, metrics = list(group_by), list(metrics)
+    _validate(spec, group_by, metrics, where)
+
+    exported = manifest()
+    if exported is None or 'directory' not in exported:
+        raise FileNotFoundError(dataset)
+    path = _root() / exported['directory'] / dataset
+
+    timestamp, partition = spec['timestamp'], spec['partition']
+    dtypes = spec['columns']
+    tz = timezone.get_current_timezone()
+
+    filters = []
+    # Partitions are UTC months, so local day bounds map onto them safely
+    if since is not None:
+        start = timezone.make_aware(datetime.combine(since, time.min), tz)
+        filters += [(partition, '>=', _month(start)), (timestamp, '>=', _utc(pd, start))]
+    if until is not None:
+        end = timezone.make_aware(datetime.combine(until + timezone.timedelta(days=1), time.min), tz)
+        filters += [(partition, '<=', _month(end)), (timestamp, '<', _utc(pd, end))]
+    for column, values in where.items():
+        filters.append((column, 'in', [_filter_value(dtypes[column], value) for value in values]))
+
+    columns = {column for column in group_by if column not in TIME_DIMENSIONS}
+    columns |= {column for _, column in metrics if column}
+    columns |= set(where)
+    if any(column in TIME_DIMENSIONS for column in group_by):
+        columns.add(timestamp)
+    if not columns:
+        # count without grouping: the smallest column will do
+        columns.add(partition)
+
+    if path.exists():
+        frame = pd.read_parquet(path, engine='pyarrow', columns=sorted(columns), filters=filters or None)
+    else:
+        # No rows exported: no files were written
+        frame = pd.DataFrame({column: pd.Series(dtype=dtypes[column]) for column in sorted(columns)})
+
+    if any(column in TIME_DIMENSIONS for column in group_by):
+        local = frame[timestamp].dt.tz_convert(tz)
+        if 'day' in group_by:
+            frame['day'] = local.dt.strftime('%Y-%m-%d')
+        if 'week' in group_by:
+            frame['week'] = (local.dt.normalize() - pd.to_timedelta(local.dt.weekday, unit='D')).dt.strftime('%Y-%m-%d')
+        if 'month' in group_by:
+            frame['month'] = local.dt.strftime('%Y-%m')
+
+    names = [f'{aggregation}_{column}' if column else 'count' for aggregation, column in metrics]
+    if group_by:
+        grouped = frame.groupby(group_by, observed=True, dropna=False)
+        result = pd.DataFrame({
+            name: grouped.size() if aggregation == 'count' else grouped[column].agg(aggregation)
+            for name, (aggregation, column) in zip(names, metrics)
+        }).reset_index().sort_values(group_by)
+    else:
+        result = pd.DataFrame([{
+            name: len(frame) if aggregation == 'count' else frame[column].agg(aggregation)
+            for name, (aggregation, column) in zip(names, metrics)
+        }])
+
+    limit = limit or settings.WAREHOUSE_QUERY_MAX_ROWS
+    truncated = len(result) > limit
+    result = result.head(limit).astype(object)
+    # NaN/NA (empty groups, missing dimensions) -> null
+    return result.where(result.notna(), None).to_dict(orient='records'), truncated
@@ -0,0 +1,197 @@
+# ---------------------------------------------------------
+# ASYNCIO WEBHOOK WORKER
+# ---------------------------------------------------------
+# One process keeps thousands of deliveries in flight: one pooled
+# aiohttp session (keep-alive connections) sends concurrently, bounded
+# globally (tasks in flight) and per endpoint (semaphores). Database
+# work (claiming batches, recording outcomes) runs in a single worker
+# thread so the event loop never blocks on it.
+#
+# Each endpoint has a circuit breaker: after WEBHOOK_CIRCUIT_FAILURES
+# consecutive failures no more requests are sent to it for
+# WEBHOOK_CIRCUIT_OPEN_SECONDS, then one probe decides whether to
+# resume; its queued deliveries stay pending without using up
+# attempts. Failed deliveries are rescheduled with exponential
+# backoff (tickets.webhooks.backoff_seconds).
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+
+import aiohttp
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from . import webhooks
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `threshold` consecutive failures -> half-open
+    once `open_seconds` pass, when a single probe request decides
+    between closing and re-opening.
+    """
+
+    def __init__(self, failures=0, threshold=None, open_seconds=None):
+        self.failures = failures
+        self.threshold = threshold or settings.WEBHOOK_CIRCUIT_FAILURES
+        self.open_seconds = open_seconds or settings.WEBHOOK_CIRCUIT_OPEN_SECONDS
+        self.open_until = None  # aware datetime
+        self.probing = False
+        self.changed = False
+        if failures >= self.threshold:
+            # Tripped by an earlier run: start half-open
+            self.open_until = timezone.now()
+
+    def allows(self):
+        if self.open_until is None:
+            return True
+        if timezone.now() < self.open_until or self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def retry_at(self):
+        """
+        When a delivery refused by the open circuit should be tried again.
+        """
+        soon = timezone.now() + timezone.timedelta(seconds=1)
+        return max(self.open_until, soon) if self.open_until else soon
+
+    def success(self):
+        self.probing = False
+        if self.failures or self.open_until:
+            self.failures, self.open_until, self.changed = 0, None, True
+
+    def failure(self):
+        """
+        Counts a failure; returns True if it opened the circuit.
+        """
+        probed, self.probing = self.probing, False
+        self.failures += 1
+        self.changed = True
+        # Requests already in flight when it opened do not extend it
+        if self.failures >= self.threshold and (self.open_until is None or probed):
+            self.open_until = timezone.now() + timezone.timedelta(seconds=self.open_seconds)
+            return True
+        return False
+
+
+class WebhookWorker:
+    def __init__(self, concurrency=None, per_endpoint=None, batch_size=None, poll_interval=1.0):
+        self.concurrency = concurrency or settings.WEBHOOK_CONCURRENCY
+        self.per_endpoint = per_endpoint or settings.WEBHOOK_PER_ENDPOINT_CONCURRENCY
+        self.batch_size = batch_size or settings.WEBHOOK_BATCH_SIZE
+        self.poll_interval = poll_interval
+
+        self._endpoint_slots = defaultdict(lambda: asyncio.Semaphore(self.per_endpoint))
+        self._breakers = {}
+        self._results = []
+        self._in_flight = set()
+        self.sent = 0
+
+    def _session(self):
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=0),
+            timeout=aiohttp.ClientTimeout(total=settings.WEBHOOK_TIMEOUT_SECONDS),
+            headers={'User-Agent': 'ticketing-webhooks/1.0', 'Content-Type': 'application/json'},
+        )
+
+    def _breaker(self, endpoint_id, failures):
+        if endpoint_id not in self._breakers:
+            self._breakers[endpoint_id] = CircuitBreaker(failures)
+        return self._breakers[endpoint_id]
+
+    async def _send(self, session, delivery):
+        delivery_id, event, payload, attempts, endpoint_id, url, secret, failures = delivery
+        breaker = self._breaker(endpoint_id, failures)
+        async with self._endpoint_slots[endpoint_id]:
+            if not breaker.allows():
+                self._results.append((delivery_id, attempts, False, None, 'circuit open', breaker.retry_at()))
+                return
+
+            body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+            timestamp = int(time.time())
+            status_code, error = None, ''
+            try:
+                async with session.post(url, data=body, allow_redirects=False, headers={
+                    'X-Webhook-Id': str(delivery_id),
+                    'X-Webhook-Event': event,
+                    'X-Webhook-Timestamp': str(timestamp),
+                    'X-Webhook-Signature': webhooks.sign(secret, timestamp, body),
+                }) as response:
+                    # Drain the body so the connection returns to the pool
+                    await response.read()
+                    status_code = response.status
+                if not 200 <= status_code < 300:
+                    error = f'HTTP {status_code}'
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                error = f'{type(exc).__name__}: {exc}' if str(exc) else type(exc).__name__
+
+        self.sent += 1
+        if not error:
+            breaker.success()
+            self._results.append((delivery_id, attempts, True, status_code, '', None))
+        else:
+            if breaker.failure():
+                logger.warning('webhook endpoint %s: circuit open after %d failures (%s)',
+                               endpoint_id, breaker.failures, error)
+            retry_at = timezone.now() + timezone.timedelta(seconds=webhooks.backoff_seconds(attempts + 1))
+            self._results.append((delivery_id, attempts, True, status_code, error, retry_at))
+
+    async def _flush(self):
+        if not self._results:
+            return
+        results, self._results = self._results, []
+        breakers = {}
+        for endpoint_id, breaker in self._breakers.items():
+            if breaker.changed:
+                breakers[endpoint_id] = (breaker.failures, breaker.open_until)
+                breaker.changed = False
+        await sync_to_async(webhooks.record, thread_sensitive=True)(results, breakers)
+
+    async def _fill(self, session):
+        """
+        Claims as many due deliveries as there are free slots and
+        starts sending them. Returns the number started.
+        """
+        free = min(self.batch_size, self.concurrency - len(self._in_flight))
+        if free <= 0:
+            return 0
+        batch = await sync_to_async(webhooks.claim, thread_sensitive=True)(free)
+        for delivery in batch:
+            task = asyncio.create_task(self._send(session, delivery))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+        return len(batch)
+
+    async def run(self, drain=False):
+        """
+        Sends deliveries until cancelled, or (drain=True) until no
+        due delivery is left. Returns the number of requests sent.
+        """
+        async with self._session() as session:
+            try:
+                while True:
+                    started = await self._fill(session)
+                    await self._flush()
+                    if started:
+                        # Let sends progress before claiming more
+                        await asyncio.sleep(0)
+                        continue
+                    if self._in_flight:
+                        await asyncio.wait(self._in_flight, timeout=0.05)
+                        continue
+                    if drain:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+            finally:
+                if self._in_flight:
+                    await asyncio.wait(self._in_flight)
+                await self._flush()
+        return self.sent
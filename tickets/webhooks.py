@@ -0,0 +1,228 @@
+# ---------------------------------------------------------
+# WEBHOOKS
+# ---------------------------------------------------------
+# Ticket events written by tickets.events become WebhookDelivery rows
+# for every active endpoint subscribed to their type, in the same
+# transaction as the events. The asyncio worker (tickets.webhook_worker)
+# claims due deliveries in batches and sends them; this module holds
+# everything it does against the database, plus body signing.
+#
+# Receivers verify X-Webhook-Signature, which is
+#   sha256=HMAC-SHA256(secret, "<X-Webhook-Timestamp>.<raw body>")
+import hashlib
+import hmac
+import json
+import random
+import secrets
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Ticket, TicketEvent, WebhookDelivery, WebhookEndpoint
+
+TICKET_CREATED = 'ticket.created'
+TICKET_ASSIGNED = 'ticket.assigned'
+TICKET_RESOLVED = 'ticket.resolved'
+EVENT_TYPES = (TICKET_CREATED, TICKET_ASSIGNED, TICKET_RESOLVED)
+
+RESOLVED_STATUSES = ('resolved', 'closed')
+
+
+def new_secret():
+    return secrets.token_hex(32)
+
+
+def event_types(event):
+    """
+    Webhook event types a TicketEvent maps to.
+    """
+    if event.kind == TicketEvent.CREATED:
+        return [TICKET_CREATED]
+
+    types = []
+    if 'assigned_to' in event.changes and event.changes['assigned_to'][1] is not None:
+        types.append(TICKET_ASSIGNED)
+    if 'status' in event.changes:
+        old, new = event.changes['status']
+        if new in RESOLVED_STATUSES and old not in RESOLVED_STATUSES:
+            types.append(TICKET_RESOLVED)
+    return types
+
+
+def _ticket_data(ticket_ids):
+    rows = Ticket.objects.filter(id__in=ticket_ids).values(
+        'id', 'ticket_id', 'title', 'status', 'priority',
+        'assigned_to_id', 'assigned_to__username', 'category_id', 'category__name',
+        'created_at', 'updated_at'
+    )
+    return {
+        row['id']: {
+            'id': row['id'],
+            'ticket_id': row['ticket_id'],
+            'title': row['title'],
+            'status': row['status'],
+            'priority': row['priority'],
+            'assigned_to': {'id': row['assigned_to_id'], 'username': row['assigned_to__username']}
+            if row['assigned_to_id'] else None,
+            'category': {'id': row['category_id'], 'name': row['category__name']}
+            if row['category_id'] else None,
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+        for row in rows
+    }
+
+
+def enqueue(events):
+    """
+    Queues deliveries of saved TicketEvents to subscribed endpoints.
+    Returns the number of deliveries created.
+    """
+    matched = [(event, types) for event in events if (types := event_types(event))]
+    if not matched:
+        return 0
+
+    endpoints = list(WebhookEndpoint.objects.filter(is_active=True).only('id', 'events'))
+    if not endpoints:
+        return 0
+
+    tickets = _ticket_data({event.ticket_id for event, _ in matched})
+    now = timezone.now()
+    deliveries = []
+    for event, types in matched:
+        ticket = tickets.get(event.ticket_id)
+        if ticket is None:
+            continue
+        for event_type in types:
+            # Round-trip through JSON so datetimes are stored as strings
+            payload = json.loads(json.dumps({
+                'event': event_type,
+                'occurred_at': event.created_at or now,
+                'actor_id': event.actor_id,
+                'changes': event.changes,
+                'ticket': ticket,
+            }, cls=DjangoJSONEncoder))
+            deliveries.extend(
+                WebhookDelivery(endpoint_id=endpoint.id, event=event_type, payload=payload, next_attempt_at=now)
+                for endpoint in endpoints
+                if event_type in endpoint.events
+            )
+
+    WebhookDelivery.objects.bulk_create(deliveries, batch_size=1000)
+    return len(deliveries)
+
+
+def sign(secret, timestamp, body):
+    """
+    Signature header value for a raw request body (bytes).
+    """
+    message = str(timestamp).encode() + b'.' + body
+    return 'sha256=' + hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def backoff_seconds(attempts):
+    """
+    Delay before retry number `attempts`: exponential with +-20% jitter
+    so endpoints recovering from an outage are not hit in lockstep.
+    """
+    delay = min(settings.WEBHOOK_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.WEBHOOK_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+# ---------------------------------------------------------
+# WORKER DATABASE OPERATIONS
+# ---------------------------------------------------------
+def claim(limit, lease_seconds=None):
+    """
+    Leases up to `limit` due deliveries, oldest due first, skipping
+    endpoints whose circuit is open and rows other workers hold.
+    Returns [(delivery id, event, payload, attempts, endpoint id,
+    url, secret, endpoint failure count)].
+    """
+    lease_seconds = lease_seconds or settings.WEBHOOK_LEASE_SECONDS
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            WebhookDelivery.objects.select_for_update(skip_locked=True)
+            .filter(status=WebhookDelivery.PENDING, next_attempt_at__lte=now)
+            .filter(Q(endpoint__disabled_until__isnull=True) | Q(endpoint__disabled_until__lte=now))
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        # A crashed worker's deliveries become due again when this passes
+        WebhookDelivery.objects.filter(id__in=ids).update(
+            next_attempt_at=now + timezone.timedelta(seconds=lease_seconds)
+        )
+        return list(
+            WebhookDelivery.objects.filter(id__in=ids)
+            .order_by('id')
+            .values_list('id', 'event', 'payload', 'attempts',
+                         'endpoint_id', 'endpoint__url', 'endpoint__secret',
+                         'endpoint__failure_count')
+        )
+
+
+def record(results, breakers):
+    """
+    Stores send outcomes and endpoint circuit state.
+
+    results: [(delivery id, attempts before, attempted, status code or
+              None, error or '', retry at or None)]; a 2xx status means
+             delivered. Deliveries not attempted (circuit open) keep
+             their attempt count.
+    breakers: {endpoint id: (failure count, disabled until or None)}
+    """
+    now = timezone.now()
+    # Successes (the bulk) are set-based: one UPDATE per status code
+    delivered = defaultdict(list)
+    retried = []
+    for delivery_id, attempts, attempted, status_code, error, retry_at in results:
+        if status_code is not None and 200 <= status_code < 300:
+            delivered[status_code].append(delivery_id)
+            continue
+        attempts += attempted
+        retried.append(WebhookDelivery(
+            id=delivery_id,
+            attempts=attempts,
+            response_status=status_code,
+            last_error=error[:255],
+            next_attempt_at=retry_at or now,
+            status=WebhookDelivery.FAILED if attempts >= settings.WEBHOOK_MAX_ATTEMPTS else WebhookDelivery.PENDING,
+        ))
+
+    with transaction.atomic():
+        for status_code, ids in delivered.items():
+            WebhookDelivery.objects.filter(id__in=ids).update(
+                status=WebhookDelivery.DELIVERED,
+                attempts=F('attempts') + 1,
+                response_status=status_code,
+                last_error='',
+                delivered_at=now,
+            )
+        WebhookDelivery.objects.bulk_update(
+            retried,
+            ['status', 'attempts', 'response_status', 'last_error', 'next_attempt_at'],
+            batch_size=500
+        )
+        for endpoint_id, (failures, disabled_until) in breakers.items():
+            WebhookEndpoint.objects.filter(id=endpoint_id).update(
+                failure_count=failures, disabled_until=disabled_until
+            )
+
+
+def redeliver(delivery_ids):
+    """
+    Puts deliveries back at the head of the retry queue with a fresh
+    attempt budget. Returns the number requeued.
+    """
+    return WebhookDelivery.objects.filter(id__in=delivery_ids).update(
+        status=WebhookDelivery.PENDING,
+        next_attempt_at=timezone.now(),
+        attempts=0,
+    )
@@ -0,0 +1,164 @@
+# ---------------------------------------------------------
+# AGENT WORK QUEUE
+# ---------------------------------------------------------
+# WorkQueueEntry mirrors every actionable ticket with a numeric
+# priority rank and SLA due time. Entries are upserted on each ticket
+# save, so reads never sort strings or compute SLAs on the fly.
+# Claims use SELECT ... FOR UPDATE SKIP LOCKED plus a conditional
+# update, so concurrent agents never wait on or take the same entry.
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Ticket, WorkQueueEntry
+
+# Ticket.priority -> WorkQueueEntry.priority_rank (lower is more urgent)
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+# Statuses that need no more work
+DONE_STATUSES = ('resolved', 'closed')
+
+
+def _entry_fields(ticket):
+    hours = settings.WORK_QUEUE_SLA_HOURS.get(ticket.priority, max(settings.WORK_QUEUE_SLA_HOURS.values()))
+    return {
+        'agent_id': ticket.assigned_to_id,
+        'priority_rank': PRIORITY_RANK.get(ticket.priority, len(PRIORITY_RANK)),
+        'sla_due_at': ticket.created_at + timezone.timedelta(hours=hours),
+    }
+
+
+def sync_ticket(ticket):
+    """
+    Adds, updates or removes the ticket's queue entry.
+    """
+    if ticket.status in DONE_STATUSES:
+        WorkQueueEntry.objects.filter(ticket_id=ticket.pk).delete()
+        return
+
+    fields = _entry_fields(ticket)
+    updated = WorkQueueEntry.objects.filter(ticket_id=ticket.pk).update(**fields)
+    if not updated:
+        WorkQueueEntry.objects.create(ticket_id=ticket.pk, **fields)
+
+
+def sync_tickets(ticket_ids):
+    """
+    Set-based sync_ticket for many tickets (bulk updates).
+    Existing entries are updated in place, so claims on them survive.
+    """
+    tickets = (
+        Ticket.objects.filter(id__in=ticket_ids)
+        .exclude(status__in=DONE_STATUSES)
+        .only('id', 'priority', 'assigned_to_id', 'created_at')
+    )
+    fields = {ticket.pk: _entry_fields(ticket) for ticket in tickets}
+
+    # Done (or deleted) tickets leave the queue
+    WorkQueueEntry.objects.filter(ticket_id__in=set(ticket_ids) - set(fields)).delete()
+
+    entries = list(WorkQueueEntry.objects.filter(ticket_id__in=list(fields)))
+    for entry in entries:
+        for name, value in fields.pop(entry.ticket_id).items():
+            setattr(entry, name, value)
+    WorkQueueEntry.objects.bulk_update(entries, ['agent', 'priority_rank', 'sla_due_at'], batch_size=1000)
+    WorkQueueEntry.objects.bulk_create([
+        WorkQueueEntry(ticket_id=ticket_id, **entry_fields)
+        for ticket_id, entry_fields in fields.items()
+    ])
+
+
+@receiver(post_save, sender=Ticket)
+def _sync_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_ticket(instance)
+
+
+def rebuild():
+    """
+    Recreates all entries from the ticket table.
+    Returns the number of entries.
+    """
+    tickets = (
+        Ticket.objects.exclude(status__in=DONE_STATUSES)
+        .only('id', 'priority', 'assigned_to_id', 'created_at')
+        .iterator(chunk_size=2000)
+    )
+    with transaction.atomic():
+        WorkQueueEntry.objects.all().delete()
+        batch, total = [], 0
+        for ticket in tickets:
+            batch.append(WorkQueueEntry(ticket_id=ticket.pk, **_entry_fields(ticket)))
+            if len(batch) >= 2000:
+                WorkQueueEntry.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        WorkQueueEntry.objects.bulk_create(batch)
+    return total + len(batch)
+
+
+def _unclaimed(now):
+    return Q(claimed_until__isnull=True) | Q(claimed_until__lt=now)
+
+
+def next_entries(agent, limit=10):
+    """
+    The agent's most urgent unclaimed (or self-claimed) tickets.
+    """
+    now = timezone.now()
+    return (
+        WorkQueueEntry.objects.filter(agent=agent)
+        .filter(_unclaimed(now) | Q(claimed_by=agent))
+        .select_related('ticket')
+        .order_by('priority_rank', 'sla_due_at')[:limit]
+    )
+
+
+def claim(agent, lease_seconds=None, candidates=5):
+    """
+    Leases the most urgent entry assigned to `agent` or in the
+    unassigned pool (which assigns the ticket to `agent`). Rows locked
+    by another claimer are skipped, never waited on.
+    Returns the claimed entry or None.
+    """
+    lease_seconds = lease_seconds or settings.WORK_QUEUE_CLAIM_SECONDS
+    now = timezone.now()
+    until = now + timezone.timedelta(seconds=lease_seconds)
+
+    with transaction.atomic():
+        entries = list(
+            WorkQueueEntry.objects.select_for_update(skip_locked=True)
+            .filter(Q(agent=agent) | Q(agent__isnull=True))
+            .filter(_unclaimed(now))
+            .order_by('priority_rank', 'sla_due_at')[:candidates]
+        )
+        for entry in entries:
+            # Conditional update: loses cleanly if someone claimed it first
+            taken = (
+                WorkQueueEntry.objects.filter(pk=entry.pk)
+                .filter(_unclaimed(now))
+                .update(claimed_by=agent, claimed_until=until)
+            )
+            if taken:
+                entry.claimed_by, entry.claimed_until = agent, until
+                # Claiming from the unassigned pool takes the ticket
+                if entry.agent_id is None:
+                    ticket = entry.ticket
+                    ticket.assigned_to = agent
+                    ticket.save(update_fields=['assigned_to', 'updated_at'])
+                    entry.agent = agent
+                return entry
+    return None
+
+
+def release(agent, ticket_id):
+    """
+    Gives up the agent's claim on a ticket. Returns True if released.
+    """
+    return bool(
+        WorkQueueEntry.objects.filter(ticket_id=ticket_id, claimed_by=agent)
+        .update(claimed_by=None, claimed_until=None)
+    )
@@ -1,9 +1,10 @@
 # serializers.py
 from rest_framework import serializers
+from ticketing.metrics import TimedSerializerMixin
 from .models import User
 
 # Serializer for general User data retrieval
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for displaying User data.
     Returns id, username, email, first_name, last_name, and role.
@@ -14,7 +15,7 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 # Serializer for user registration
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for creating a new user.
     Handles password write-only and role assignment.